@@ -1,3 +1,5 @@
 from .cache_service import QuizCacheService
+from .lease_service import CacheLease, LeaseUnavailable
+from .version_service import CacheVersionService
 
-__all__ = ['QuizCacheService']
+__all__ = ['QuizCacheService', 'CacheLease', 'CacheVersionService', 'LeaseUnavailable']
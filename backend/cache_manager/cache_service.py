@@ -7,6 +7,7 @@ logger = logging.getLogger(__name__)
 
 class QuizCacheService:
     DEFAULT_TIMEOUT = getattr(settings, "QUIZ_NEXT_QUESTION_CACHE_TIMEOUT", 120)
+    SNAPSHOT_TIMEOUT = getattr(settings, "QUIZ_SNAPSHOT_CACHE_TIMEOUT", 3600)
 
     @staticmethod
     def get_cache_key(session_id: int) -> str:
@@ -43,3 +44,28 @@ class QuizCacheService:
     @staticmethod
     def clear_session_cache(session_id: int) -> None:
         QuizCacheService.delete_cached_question(session_id)
+
+    @staticmethod
+    def get_snapshot_cache_key(session_id: int) -> str:
+        return f'quiz_snapshot:{session_id}'
+
+    @staticmethod
+    def cache_snapshot(session_id: int, snapshot: dict) -> bool:
+        cache_key = QuizCacheService.get_snapshot_cache_key(session_id)
+        try:
+            cache.set(cache_key, snapshot, timeout=QuizCacheService.SNAPSHOT_TIMEOUT)
+            return True
+        except (OSError, RuntimeError, TypeError, ValueError) as e:
+            logger.exception(f"Failed to cache snapshot for session {session_id}: {e}")
+            return False
+
+    @staticmethod
+    def get_cached_snapshot(session_id: int):
+        return cache.get(QuizCacheService.get_snapshot_cache_key(session_id))
+
+    @staticmethod
+    def delete_cached_snapshots(session_ids) -> None:
+        keys = [QuizCacheService.get_snapshot_cache_key(session_id) for session_id in session_ids]
+        if keys:
+            cache.delete_many(keys)
+            logger.debug(f"Deleted {len(keys)} cached quiz snapshots")
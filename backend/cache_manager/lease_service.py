@@ -0,0 +1,87 @@
+import logging
+import time
+import uuid
+
+from django.core.cache import cache
+
+try:
+    from django_redis import get_redis_connection
+    from redis.exceptions import RedisError
+except ImportError:
+    get_redis_connection = None
+    RedisError = OSError
+
+logger = logging.getLogger(__name__)
+
+# Compare-and-delete in one step, so a holder whose TTL already ran out can
+# never delete the lease another worker has taken over since.
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _redis_connection():
+    # LocMem (tests, local runs) has no client; it keeps the get/delete fallback.
+    if get_redis_connection is None or not hasattr(cache, 'client'):
+        return None
+    return get_redis_connection('default')
+
+
+class LeaseUnavailable(RuntimeError):
+    pass
+
+
+class CacheLease:
+    # SET NX EX on Redis, so exactly one holder wins across threads, processes
+    # and nodes; the TTL frees leases of dead holders. The token is stored raw
+    # so the release script can compare it.
+
+    def __init__(self, name: str, ttl: int = 5, wait: float = 2.0, poll: float = 0.01):
+        self.key = f'lease:{name}'
+        self.ttl = ttl
+        self.wait = wait
+        self.poll = poll
+        self.token = None
+
+    def acquire(self) -> bool:
+        token = uuid.uuid4().hex
+        connection = _redis_connection()
+        deadline = time.monotonic() + self.wait
+        delay = self.poll
+        while True:
+            if connection is not None:
+                taken = connection.set(cache.make_key(self.key), token, nx=True, ex=self.ttl)
+            else:
+                taken = cache.add(self.key, token, timeout=self.ttl)
+            if taken:
+                self.token = token
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+    def release(self) -> None:
+        if self.token is None:
+            return
+        try:
+            connection = _redis_connection()
+            if connection is not None:
+                connection.eval(RELEASE_SCRIPT, 1, cache.make_key(self.key), self.token)
+            elif cache.get(self.key) == self.token:
+                cache.delete(self.key)
+        except (OSError, RuntimeError, RedisError) as e:
+            logger.warning(f"Failed to release lease {self.key}: {e}")
+        self.token = None
+
+    def __enter__(self):
+        if not self.acquire():
+            raise LeaseUnavailable(f"Lease {self.key} is held by another worker")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
@@ -0,0 +1,38 @@
+import logging
+import time
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class CacheVersionService:
+
+    @staticmethod
+    def get_version_key(scope: str) -> str:
+        return f'version:{scope}'
+
+    @staticmethod
+    def get_version(scope: str) -> int:
+        key = CacheVersionService.get_version_key(scope)
+        version = cache.get(key)
+        if version is None:
+            # Seed from the clock so a flushed cache never reissues an old validator.
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+        return version
+
+    @staticmethod
+    def bump_version(scope: str) -> None:
+        key = CacheVersionService.get_version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+        except (OSError, RuntimeError) as e:
+            logger.warning(f"Failed to bump cache version {scope}: {e}")
+
+    @staticmethod
+    def bump_versions(scopes) -> None:
+        for scope in scopes:
+            CacheVersionService.bump_version(scope)
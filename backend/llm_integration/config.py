@@ -1,4 +1,5 @@
 import os
+from decimal import Decimal
 
 
 class LLMConfig:
@@ -6,6 +7,47 @@ class LLMConfig:
     OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
     OPENAI_MAX_TOKENS = int(os.getenv("OPENAI_MAX_TOKENS", "500"))
     OPENAI_MAX_TOKENS_MULTIPLE = int(os.getenv("OPENAI_MAX_TOKENS_MULTIPLE", "2000"))
+    # Batch calls get room for every requested question, up to the model's output limit.
+    OPENAI_MAX_TOKENS_PER_QUESTION = int(os.getenv("OPENAI_MAX_TOKENS_PER_QUESTION", "350"))
+    OPENAI_MAX_OUTPUT_TOKENS = int(os.getenv("OPENAI_MAX_OUTPUT_TOKENS", "4096"))
+    # json_schema, json_object or text; unsupported modes are downgraded per model at runtime.
+    OPENAI_RESPONSE_FORMAT = os.getenv("OPENAI_RESPONSE_FORMAT", "json_schema")
+
+    OPENAI_RPM_LIMIT = int(os.getenv("OPENAI_RPM_LIMIT", "500"))
+    OPENAI_TPM_LIMIT = int(os.getenv("OPENAI_TPM_LIMIT", "200000"))
+    OPENAI_GOVERNOR_BURST_SECONDS = float(os.getenv("OPENAI_GOVERNOR_BURST_SECONDS", "5"))
+    OPENAI_GOVERNOR_MAX_WAIT_SECONDS = float(os.getenv("OPENAI_GOVERNOR_MAX_WAIT_SECONDS", "30"))
+
+    OPENAI_TIMEOUT_MIN_SECONDS = float(os.getenv("OPENAI_TIMEOUT_MIN_SECONDS", "10"))
+    OPENAI_TIMEOUT_MAX_SECONDS = float(os.getenv("OPENAI_TIMEOUT_MAX_SECONDS", "60"))
+    OPENAI_TIMEOUT_PERCENTILE = 95
+    OPENAI_TIMEOUT_MULTIPLIER = 2.0
+    OPENAI_LATENCY_SAMPLES = 200
+    OPENAI_LATENCY_MIN_SAMPLES = 20
+    OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+    OPENAI_RETRY_BASE_SECONDS = 0.5
+    OPENAI_RETRY_MAX_SECONDS = 4.0
+    OPENAI_BREAKER_FAILURE_THRESHOLD = int(os.getenv("OPENAI_BREAKER_FAILURE_THRESHOLD", "5"))
+    OPENAI_BREAKER_COOLDOWN_SECONDS = float(os.getenv("OPENAI_BREAKER_COOLDOWN_SECONDS", "30"))
+    OPENAI_HEDGE_ENABLED = os.getenv("OPENAI_HEDGE_ENABLED", "False") == "True"
+    OPENAI_HEDGE_PERCENTILE = 90
+
+    # Identical concurrent batch requests within the window share one call (0 disables).
+    OPENAI_COALESCE_WINDOW_SECONDS = float(os.getenv("OPENAI_COALESCE_WINDOW_SECONDS", "0.15"))
+    OPENAI_COALESCE_MAX_QUESTIONS = int(os.getenv("OPENAI_COALESCE_MAX_QUESTIONS", "10"))
+    OPENAI_COALESCE_WAIT_SECONDS = float(os.getenv("OPENAI_COALESCE_WAIT_SECONDS", "90"))
+    # A leader only waits for company if the same request was made this recently.
+    OPENAI_COALESCE_RECENT_SECONDS = float(os.getenv("OPENAI_COALESCE_RECENT_SECONDS", "30"))
+
+    # Input tokens (system + user) for a batch prompt; exclusion context is trimmed to fit.
+    PROMPT_TOKEN_BUDGET = int(os.getenv("OPENAI_PROMPT_TOKEN_BUDGET", "1800"))
+    PROMPT_EXCLUSION_K = int(os.getenv("OPENAI_PROMPT_EXCLUSION_K", "15"))
+    PROMPT_STEM_WORDS = 12
+
+    # USD per million tokens, used for the cost column of generation telemetry.
+    OPENAI_PRICE_INPUT_PER_1M = Decimal(os.getenv("OPENAI_PRICE_INPUT_PER_1M", "0.50"))
+    OPENAI_PRICE_CACHED_INPUT_PER_1M = Decimal(os.getenv("OPENAI_PRICE_CACHED_INPUT_PER_1M", "0.25"))
+    OPENAI_PRICE_OUTPUT_PER_1M = Decimal(os.getenv("OPENAI_PRICE_OUTPUT_PER_1M", "1.50"))
 
     EMBEDDINGS_MODEL = os.getenv("EMBEDDINGS_MODEL", "all-MiniLM-L6-v2")
 
@@ -25,9 +67,14 @@ class LLMConfig:
         }
 
     @classmethod
-    def get_openai_params_multiple(cls):
+    def max_questions_per_call(cls):
+        return max(1, cls.OPENAI_MAX_OUTPUT_TOKENS // cls.OPENAI_MAX_TOKENS_PER_QUESTION)
+
+    @classmethod
+    def get_openai_params_multiple(cls, count=0):
+        max_tokens = max(cls.OPENAI_MAX_TOKENS_MULTIPLE, count * cls.OPENAI_MAX_TOKENS_PER_QUESTION)
         return {
             'model': cls.OPENAI_MODEL,
             'temperature': cls.TEMPERATURE_MULTIPLE,
-            'max_tokens': cls.OPENAI_MAX_TOKENS_MULTIPLE
+            'max_tokens': min(max_tokens, cls.OPENAI_MAX_OUTPUT_TOKENS)
         }
@@ -1,8 +1,12 @@
 import logging
+import threading
 from .config import LLMConfig
 
 logger = logging.getLogger(__name__)
 
+_shared_service = None
+_shared_lock = threading.Lock()
+
 
 class EmbeddingsService:
     def __init__(self):
@@ -37,5 +41,25 @@ class EmbeddingsService:
             logger.error(f"Error encoding question: {e}")
             return None
 
+    def encode_questions(self, question_texts):
+        if not self.available or self.model is None:
+            return None
+
+        try:
+            return [embedding.tolist() for embedding in self.model.encode(list(question_texts))]
+        except (RuntimeError, ValueError, TypeError) as e:
+            logger.error(f"Error encoding questions: {e}")
+            return None
+
     def is_available(self):
         return self.available
+
+
+def get_embeddings_service():
+    # One model per process, shared by deduplication and prompt building.
+    global _shared_service
+    if _shared_service is None:
+        with _shared_lock:
+            if _shared_service is None:
+                _shared_service = EmbeddingsService()
+    return _shared_service
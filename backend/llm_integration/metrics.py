@@ -0,0 +1,22 @@
+from django.core.cache import cache
+
+COUNTER_KEY = 'llm_metrics:{}'
+COUNTER_TIMEOUT = 24 * 3600
+
+
+def increment(name, delta=1):
+    key = COUNTER_KEY.format(name)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, 0, timeout=COUNTER_TIMEOUT)
+        cache.incr(key, delta)
+
+
+def counters(names):
+    values = cache.get_many([COUNTER_KEY.format(name) for name in names])
+    return {name: values.get(COUNTER_KEY.format(name), 0) for name in names}
+
+
+def reset(names):
+    cache.delete_many([COUNTER_KEY.format(name) for name in names])
@@ -0,0 +1,150 @@
+import functools
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .config import LLMConfig
+from .embeddings_service import get_embeddings_service
+from .metrics import counters, increment
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+PROMPT_COUNTERS = [
+    f'prompt:{name}'
+    for name in (
+        'built',
+        'tokens',
+        'static_tokens',
+        'exclusions_offered',
+        'exclusions_included',
+        'provider_tokens',
+        'cached_tokens',
+    )
+]
+
+VECTOR_CACHE_SIZE = 4096
+_vector_cache = OrderedDict()
+_vector_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=8)
+def _encoding(model):
+    if tiktoken is None:
+        return None
+    # Both calls may download the BPE file; without network or TIKTOKEN_CACHE_DIR
+    # they fail, and the fallback result is cached so we do not retry per prompt.
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding('cl100k_base')
+    except (OSError, ValueError) as e:
+        logger.warning(f"Local tokenizer unavailable, estimating tokens from length: {e}")
+        return None
+
+
+def count_tokens(text, model=None):
+    encoding = _encoding(model or LLMConfig.OPENAI_MODEL)
+    if encoding is None:
+        # Same four-characters-per-token estimate the rate governor uses.
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text))
+
+
+def question_stem(text, max_words=None):
+    max_words = max_words or LLMConfig.PROMPT_STEM_WORDS
+    words = " ".join((text or "").split()).rstrip("?").split(" ")
+    stem = " ".join(words[:max_words])
+    return f"{stem}…" if len(words) > max_words else stem
+
+
+def _vectors(service, texts):
+    with _vector_lock:
+        missing = [text for text in texts if text not in _vector_cache]
+    if missing:
+        encoded = service.encode_questions(missing)
+        if encoded is None:
+            return None
+        with _vector_lock:
+            for text, vector in zip(missing, encoded):
+                _vector_cache[text] = np.asarray(vector, dtype=float)
+            while len(_vector_cache) > VECTOR_CACHE_SIZE:
+                _vector_cache.popitem(last=False)
+    with _vector_lock:
+        return [_vector_cache.get(text) for text in texts]
+
+
+def select_exclusions(query, texts, k):
+    # Most similar first: those are the questions the model is most likely to repeat.
+    candidates = list(dict.fromkeys(text for text in texts or [] if isinstance(text, str) and text.strip()))
+    if len(candidates) <= 1 or k <= 0:
+        return candidates[:max(k, 0)]
+
+    service = get_embeddings_service()
+    vectors = _vectors(service, [query, *candidates]) if service.is_available() else None
+    if vectors is None or any(vector is None for vector in vectors):
+        return candidates[::-1][:k]
+
+    query_vector, candidate_vectors = vectors[0], np.vstack(vectors[1:])
+    norms = np.linalg.norm(candidate_vectors, axis=1) * np.linalg.norm(query_vector)
+    scores = candidate_vectors @ query_vector / np.where(norms == 0, 1, norms)
+    return [candidates[i] for i in np.argsort(-scores, kind='stable')[:k]]
+
+
+def fit_lines(lines, budget, model=None):
+    fitted = []
+    used = 0
+    for line in lines:
+        cost = count_tokens(line + "\n", model)
+        if used + cost > budget:
+            break
+        fitted.append(line)
+        used += cost
+    return fitted
+
+
+def record_prompt(total_tokens, static_tokens, offered, included):
+    increment('prompt:built')
+    increment('prompt:tokens', total_tokens)
+    increment('prompt:static_tokens', static_tokens)
+    increment('prompt:exclusions_offered', offered)
+    increment('prompt:exclusions_included', included)
+
+
+def record_prompt_usage(usage):
+    prompt_tokens = getattr(usage, 'prompt_tokens', None)
+    if not isinstance(prompt_tokens, int):
+        return
+    cached = getattr(getattr(usage, 'prompt_tokens_details', None), 'cached_tokens', None)
+    increment('prompt:provider_tokens', prompt_tokens)
+    if isinstance(cached, int) and cached:
+        increment('prompt:cached_tokens', cached)
+
+
+def prompt_stats():
+    counts = counters(PROMPT_COUNTERS)
+
+    def counter(name):
+        return counts[f'prompt:{name}']
+
+    built = counter('built')
+    provider_tokens = counter('provider_tokens')
+    return {
+        'tokenizer': 'tiktoken' if _encoding(LLMConfig.OPENAI_MODEL) else 'estimate',
+        'token_budget': LLMConfig.PROMPT_TOKEN_BUDGET,
+        'prompts': built,
+        'avg_tokens': round(counter('tokens') / built, 1) if built else None,
+        'avg_static_tokens': round(counter('static_tokens') / built, 1) if built else None,
+        'exclusions_offered': counter('exclusions_offered'),
+        'exclusions_included': counter('exclusions_included'),
+        'provider_prompt_tokens': provider_tokens,
+        'cached_prompt_tokens': counter('cached_tokens'),
+        'cache_hit_ratio': round(counter('cached_tokens') / provider_tokens, 3) if provider_tokens else None,
+    }
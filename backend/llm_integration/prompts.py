@@ -1,3 +1,6 @@
+from .prompt_budget import count_tokens, fit_lines, question_stem
+
+
 class QuizPrompts:
     SYSTEM_PROMPT = """Tworzysz pytania quizowe po polsku. ZAWSZE zwracasz czysty JSON (bez komentarzy/tekstu).
 
@@ -156,6 +159,45 @@ Format JSON:
   "explanation": "krótkie wyjaśnienie"
 }}"""
 
+    # Static part of the batch prompt, placed before anything session-specific so the
+    # system prompt plus these rules form a byte-identical prefix for provider caching.
+    MULTIPLE_QUESTIONS_RULES = """DOPASOWANIE:
+- Każde pytanie musi być adekwatne do docelowego poziomu wiedzy podanego na końcu.
+- Trudność każdego pytania powinna odpowiadać poziomowi trudności podanemu na końcu.
+- W całym zestawie ma być wyczuwalny ten sam poziom trudności (bez losowego mieszania bardzo łatwych i bardzo trudnych pytań).
+
+RÓŻNORODNOŚĆ:
+- Każde pytanie musi dotyczyć INNEGO aspektu tematu (inne pojęcie, inny przypadek, inny szczegół).
+- Nie powtarzaj schematów typu: „zmień tylko liczby” – zmieniaj również aspekt merytoryczny.
+- Nie powtarzaj ani nie parafrazuj pytań z listy NIE POWTARZAJ (podane są skróty ich treści).
+
+WYMAGANIA DLA KAŻDEGO PYTANIA:
+- Jednoznaczne pytanie mające dokładnie jedną poprawną odpowiedź.
+- 4 odpowiedzi: 1 POPRAWNA + 3 BŁĘDNE (łudząco podobne, ten sam typ odpowiedzi).
+- Żadna z błędnych odpowiedzi nie może być poprawna.
+- Wyjaśnienie: maksymalnie 2 zdania, poprawne merytorycznie.
+- SPRAWDŹ logikę i poprawność merytoryczną pytania PRZED zwróceniem odpowiedzi.
+
+Format JSON – obiekt z tablicą pytań:
+{
+  "questions": [
+    {
+      "question": "pytanie 1",
+      "correct_answer": "poprawna 1",
+      "wrong_answers": ["błędna 1a", "błędna 1b", "błędna 1c"],
+      "explanation": "wyjaśnienie 1"
+    },
+    {
+      "question": "pytanie 2 (inny aspekt tematu)",
+      "correct_answer": "poprawna 2",
+      "wrong_answers": ["błędna 2a", "błędna 2b", "błędna 2c"],
+      "explanation": "wyjaśnienie 2"
+    }
+  ]
+}"""
+
+    EXCLUSION_HEADER = "\n\n=== NIE POWTARZAJ (ani nie parafrazuj) TYCH PYTAŃ ===\n"
+
     @staticmethod
     def build_multiple_questions_prompt(
             topic,
@@ -163,52 +205,28 @@ Format JSON:
             count,
             subtopic=None,
             knowledge_level='high_school',
-            existing_questions=None
+            existing_questions=None,
+            token_budget=None,
     ):
         difficulty_desc = QuizPrompts.get_difficulty_description(difficulty)
         detailed_level = QuizPrompts.get_detailed_level_description(knowledge_level, difficulty)
         subtopic_info = f"\n- Podtemat: {subtopic}" if subtopic else ""
 
-        context_info = ""
-        if existing_questions and len(existing_questions) > 0:
-            context_info = "\n\n=== NIE POWTARZAJ TYCH PYTAŃ ===\n"
-            for i, q in enumerate(existing_questions[:15], 1):
-                context_info += f"{i}. {q}\n"
-            context_info += "\n=== Generuj NOWE, CAŁKOWICIE RÓŻNE pytania (zero parafraz, zero podobnych przykładów, zero tych samych liczb) ===\n"
+        prompt = f"""{QuizPrompts.MULTIPLE_QUESTIONS_RULES}
 
-        return f"""Wygeneruj {count} RÓŻNYCH pytań quizowych:
+Wygeneruj {count} RÓŻNYCH pytań quizowych:
 - Temat główny: {topic}{subtopic_info}
 - Docelowy poziom ucznia/wiedzy: {detailed_level}
-- Poziom trudności: {difficulty} ({difficulty_desc}){context_info}
-
-DOPASOWANIE:
-- Każde pytanie musi być adekwatne do poziomu "{detailed_level}".
-- Trudność każdego pytania powinna odpowiadać poziomowi "{difficulty}".
-- W całym zestawie ma być wyczuwalny ten sam poziom trudności (bez losowego mieszania bardzo łatwych i bardzo trudnych pytań).
-
-RÓŻNORODNOŚĆ:
-- Każde pytanie musi dotyczyć INNEGO aspektu tematu (inne pojęcie, inny przypadek, inny szczegół).
-- Nie powtarzaj schematów typu: „zmień tylko liczby” – zmieniaj również aspekt merytoryczny.
-
-WYMAGANIA DLA KAŻDEGO PYTANIA:
-- Jednoznaczne pytanie mające dokładnie jedną poprawną odpowiedź.
-- 4 odpowiedzi: 1 POPRAWNA + 3 BŁĘDNE (łudząco podobne, ten sam typ odpowiedzi).
-- Żadna z błędnych odpowiedzi nie może być poprawna.
-- Wyjaśnienie: maksymalnie 2 zdania, poprawne merytorycznie.
-- SPRAWDŹ logikę i poprawność merytoryczną pytania PRZED zwróceniem odpowiedzi.
-
-Format JSON – tablica {count} pytań:
-[
-  {{
-    "question": "pytanie 1",
-    "correct_answer": "poprawna 1",
-    "wrong_answers": ["błędna 1a", "błędna 1b", "błędna 1c"],
-    "explanation": "wyjaśnienie 1"
-  }},
-  {{
-    "question": "pytanie 2 (inny aspekt tematu)",
-    "correct_answer": "poprawna 2",
-    "wrong_answers": ["błędna 2a", "błędna 2b", "błędna 2c"],
-    "explanation": "wyjaśnienie 2"
-  }}
-]"""
+- Poziom trudności: {difficulty} ({difficulty_desc})"""
+
+        if not existing_questions:
+            return prompt
+
+        # existing_questions come most relevant first; whatever does not fit the budget is dropped.
+        lines = [f"- {question_stem(q)}" for q in existing_questions]
+        if token_budget is not None:
+            header_tokens = count_tokens(prompt) + count_tokens(QuizPrompts.EXCLUSION_HEADER)
+            lines = fit_lines(lines, token_budget - header_tokens)
+        if not lines:
+            return prompt
+        return f"{prompt}{QuizPrompts.EXCLUSION_HEADER}" + "\n".join(lines)
@@ -1,25 +1,48 @@
+import functools
 import json
 import logging
 import re
+import time
 import unicodedata
-from openai import OpenAI, OpenAIError
+from openai import BadRequestError, OpenAI, OpenAIError, RateLimitError
 from .config import LLMConfig
+from .prompt_budget import count_tokens, question_stem, record_prompt, record_prompt_usage, select_exclusions
 from .prompts import QuizPrompts
+from .rate_governor import RateGovernor, estimate_tokens
+from .resilience import ProviderUnavailable, ResilientCaller
+from .single_flight import SingleFlight, flight_key
+from .structured_output import (
+    TEXT,
+    batch_schema,
+    downgrade,
+    output_mode,
+    question_schema,
+    record_output,
+    response_format,
+    response_tokens,
+    unwrap_questions,
+)
+from .telemetry import note_rejection, note_returned, record_request
 
 logger = logging.getLogger(__name__)
 
 
 class QuestionGenerator:
+    REQUIRED_KEYS = ("question", "correct_answer", "wrong_answers", "explanation")
 
     def __init__(self):
         self.client = None
+        self.governor = RateGovernor()
+        self.resilience = ResilientCaller()
+        self.single_flight = SingleFlight()
 
         if not LLMConfig.is_openai_available():
             logger.warning("OPENAI_API_KEY not set - question generation disabled")
             return
 
         try:
-            self.client = OpenAI(api_key=LLMConfig.OPENAI_API_KEY)
+            # Retries and deadlines are handled by ResilientCaller.
+            self.client = OpenAI(api_key=LLMConfig.OPENAI_API_KEY, max_retries=0)
             logger.info("OpenAI client initialized successfully")
         except ImportError:
             logger.warning("openai package not installed - question generation disabled")
@@ -39,8 +62,22 @@ class QuestionGenerator:
         difficulty_text = self._normalize_difficulty(difficulty)
 
         if self.client is None:
-            raise RuntimeError("Question generation unavailable: OpenAI client not initialized")
+            raise ProviderUnavailable("Question generation unavailable: OpenAI client not initialized")
 
+        return self.single_flight.run(
+            flight_key(topic, difficulty_text, subtopic, knowledge_level, existing_questions),
+            count,
+            lambda total: self._generate_multiple(
+                topic,
+                difficulty_text,
+                total,
+                subtopic,
+                knowledge_level,
+                existing_questions,
+            ),
+        )
+
+    def _generate_multiple(self, topic, difficulty_text, count, subtopic, knowledge_level, existing_questions):
         try:
             context_msg = (
                 f" (with context of {len(existing_questions)} existing)"
@@ -91,7 +128,7 @@ class QuestionGenerator:
         difficulty_text = self._normalize_difficulty(difficulty)
 
         if self.client is None:
-            raise RuntimeError("Question generation unavailable: OpenAI client not initialized")
+            raise ProviderUnavailable("Question generation unavailable: OpenAI client not initialized")
 
         try:
             logger.info(
@@ -122,23 +159,47 @@ class QuestionGenerator:
             knowledge_level='high_school',
             existing_questions=None,
     ):
+        system_prompt = QuizPrompts.SYSTEM_PROMPT_DIVERSE
+        exclusions = select_exclusions(
+            " ".join(filter(None, [topic, subtopic, difficulty])),
+            existing_questions,
+            LLMConfig.PROMPT_EXCLUSION_K,
+        )
         user_prompt = QuizPrompts.build_multiple_questions_prompt(
-            topic, difficulty, count, subtopic, knowledge_level, existing_questions
+            topic,
+            difficulty,
+            count,
+            subtopic,
+            knowledge_level,
+            exclusions,
+            token_budget=LLMConfig.PROMPT_TOKEN_BUDGET - count_tokens(system_prompt),
         )
+        self._report_prompt(system_prompt, user_prompt, existing_questions, exclusions)
 
-        response = self.client.chat.completions.create(
+        response, mode = self._structured_completion(
             messages=[
-                {"role": "system", "content": QuizPrompts.SYSTEM_PROMPT_DIVERSE},
+                {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
-            **LLMConfig.get_openai_params_multiple()
+            params=LLMConfig.get_openai_params_multiple(count),
+            schema_name="quiz_questions",
+            schema=batch_schema(self.REQUIRED_KEYS),
         )
 
-        content = response.choices[0].message.content.strip()
-        content = self._clean_json_response(content)
-        questions_data = json.loads(content)
-
-        questions_data = self._validate_multiple_questions(questions_data, count)
+        record_output("batches")
+        record_prompt_usage(getattr(response, "usage", None))
+        try:
+            try:
+                questions_data = unwrap_questions(self._parse_content(response, mode))
+            except json.JSONDecodeError as e:
+                # A truncated or chatty batch is as useless as one with no valid items.
+                note_rejection("unparseable")
+                raise ValueError(f"No valid questions returned by model: {e}") from e
+            questions_data = self._validate_multiple_questions(questions_data, count)
+        except ValueError:
+            record_output("batch_failures")
+            record_output("wasted_tokens", response_tokens(response))
+            raise
 
         logger.info(
             "Generated %s diverse AI questions successfully",
@@ -151,23 +212,91 @@ class QuestionGenerator:
             topic, difficulty, subtopic, knowledge_level
         )
 
-        response = self.client.chat.completions.create(
+        response, mode = self._structured_completion(
             messages=[
                 {"role": "system", "content": QuizPrompts.SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ],
-            **LLMConfig.get_openai_params_single()
+            params=LLMConfig.get_openai_params_single(),
+            schema_name="quiz_question",
+            schema=question_schema(self.REQUIRED_KEYS),
         )
 
-        content = response.choices[0].message.content.strip()
-        content = self._clean_json_response(content)
-        question_data = json.loads(content)
-
-        self._validate_single_question(question_data)
+        note_returned(1)
+        try:
+            question_data = self._parse_content(response, mode)
+            self._validate_single_question(question_data)
+        except ValueError as e:
+            record_output("wasted_tokens", response_tokens(response))
+            note_rejection("unparseable" if isinstance(e, json.JSONDecodeError) else "validation")
+            raise
 
         logger.info("AI question generated successfully")
         return question_data
 
+    def _report_prompt(self, system_prompt, user_prompt, existing_questions, exclusions):
+        total_tokens = count_tokens(system_prompt) + count_tokens(user_prompt)
+        included = sum(1 for question in exclusions if question_stem(question) in user_prompt)
+        record_prompt(total_tokens, self._static_prefix_tokens(), len(existing_questions or []), included)
+        logger.debug(
+            "Batch prompt: %s tokens (static prefix %s), %s/%s exclusions included",
+            total_tokens,
+            self._static_prefix_tokens(),
+            included,
+            len(existing_questions or []),
+        )
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _static_prefix_tokens():
+        return count_tokens(QuizPrompts.SYSTEM_PROMPT_DIVERSE) + count_tokens(QuizPrompts.MULTIPLE_QUESTIONS_RULES)
+
+    def _structured_completion(self, messages, params, schema_name, schema):
+        model = params["model"]
+        mode = output_mode(model)
+        while True:
+            output_format = response_format(mode, schema_name, schema)
+            request_params = dict(params, response_format=output_format) if output_format else params
+            try:
+                return self._create_completion(messages, request_params), mode
+            except BadRequestError as e:
+                mode = downgrade(model, mode, e)
+                if mode is None:
+                    raise
+
+    def _parse_content(self, response, mode):
+        content = (response.choices[0].message.content or "").strip()
+        if mode == TEXT:
+            content = self._clean_json_response(content)
+        return json.loads(content)
+
+    def _create_completion(self, messages, params):
+        started = time.monotonic()
+        response = self.resilience.call(
+            lambda timeout: self._governed_completion(messages, params, timeout)
+        )
+        record_request(response, time.monotonic() - started)
+        return response
+
+    def _governed_completion(self, messages, params, timeout):
+        with self.governor.slot(estimate_tokens(messages, params['max_tokens'])) as reservation:
+            try:
+                response = self.client.chat.completions.create(
+                    messages=messages, timeout=timeout, **params
+                )
+            except RateLimitError as e:
+                self.governor.throttle(self._retry_after(e))
+                raise
+            reservation.settle(getattr(response, 'usage', None))
+        return response
+
+    def _retry_after(self, error):
+        headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+        try:
+            return float(headers.get('retry-after', LLMConfig.OPENAI_GOVERNOR_BURST_SECONDS))
+        except (TypeError, ValueError):
+            return LLMConfig.OPENAI_GOVERNOR_BURST_SECONDS
+
     def _clean_json_response(self, content):
         content = content.strip()
         if content.startswith("```json"):
@@ -187,13 +316,9 @@ class QuestionGenerator:
         return content.strip()
 
     def _validate_single_question(self, question_data):
-        required_keys = [
-            "question",
-            "correct_answer",
-            "wrong_answers",
-            "explanation",
-        ]
-        if not all(key in question_data for key in required_keys):
+        if not isinstance(question_data, dict):
+            raise ValueError(f"Expected question object, got: {type(question_data)}")
+        if not all(key in question_data for key in self.REQUIRED_KEYS):
             raise ValueError(f"Missing required keys in response. Got: {question_data.keys()}")
 
         question_text = question_data["question"]
@@ -247,6 +372,7 @@ class QuestionGenerator:
                 f"Expected list of questions, got: {type(questions_data)}"
             )
 
+        note_returned(len(questions_data))
         if len(questions_data) != expected_count:
             logger.warning(f"Requested {expected_count} questions but got {len(questions_data)}")
 
@@ -256,6 +382,7 @@ class QuestionGenerator:
                 self._validate_single_question(q_data)
                 valid_questions.append(q_data)
             except ValueError as e:
+                note_rejection("validation")
                 logger.warning("Rejected malformed question #%s: %s", i + 1, e)
 
         if not valid_questions:
@@ -276,6 +403,7 @@ class QuestionGenerator:
         max_attempts = max(target * 4, target + 3)
         attempts = 0
         generated = []
+        record_output("fallback_runs")
 
         existing_keys = {
             self._normalize_question_text(text)
@@ -286,6 +414,7 @@ class QuestionGenerator:
 
         while len(generated) < target and attempts < max_attempts:
             attempts += 1
+            record_output("fallback_calls")
             try:
                 question_data = self._generate_ai_question(
                     topic=topic,
@@ -0,0 +1,206 @@
+import logging
+import time
+from contextlib import contextmanager
+
+from django.core.cache import cache
+
+from cache_manager import CacheLease, LeaseUnavailable
+
+from .config import LLMConfig
+from .resilience import ProviderUnavailable
+
+logger = logging.getLogger(__name__)
+
+STATE_KEY = 'llm_governor:state'
+STATE_TIMEOUT = 3600
+
+
+class RateLimitExceeded(ProviderUnavailable):
+    # A queue this long means the provider is unusable for now; callers fall
+    # back to the question bank as for any other outage.
+    pass
+
+
+class RateReservation:
+
+    def __init__(self, governor, estimated_tokens, start, wait):
+        self.governor = governor
+        self.estimated_tokens = estimated_tokens
+        self.start = start
+        self.wait = wait
+
+    def settle(self, usage):
+        total_tokens = getattr(usage, 'total_tokens', None)
+        if total_tokens is not None:
+            self.governor.settle(self, total_tokens)
+
+
+class RateGovernor:
+    # Requests and tokens are scheduled on shared "theoretical arrival times"
+    # (GCRA): every caller reserves the next free slot under a cache lease, so
+    # callers across all workers are served in arrival order.
+
+    def __init__(
+        self,
+        rpm=None,
+        tpm=None,
+        burst_seconds=None,
+        max_wait=None,
+    ):
+        self.rpm = LLMConfig.OPENAI_RPM_LIMIT if rpm is None else rpm
+        self.tpm = LLMConfig.OPENAI_TPM_LIMIT if tpm is None else tpm
+        self.burst_seconds = (
+            LLMConfig.OPENAI_GOVERNOR_BURST_SECONDS if burst_seconds is None else burst_seconds
+        )
+        self.max_wait = LLMConfig.OPENAI_GOVERNOR_MAX_WAIT_SECONDS if max_wait is None else max_wait
+
+    @property
+    def enabled(self):
+        return self.rpm > 0 or self.tpm > 0
+
+    def _request_interval(self):
+        return 60.0 / self.rpm if self.rpm > 0 else 0.0
+
+    def _token_interval(self):
+        return 60.0 / self.tpm if self.tpm > 0 else 0.0
+
+    def _load(self, now):
+        state = cache.get(STATE_KEY)
+        if state is None:
+            state = {
+                'request_tat': now,
+                'token_tat': now,
+                'acquired': 0,
+                'delayed': 0,
+                'rejected': 0,
+                'throttled': 0,
+                'wait_total': 0.0,
+                'wait_max': 0.0,
+                'tokens_estimated': 0,
+                'tokens_used': 0,
+                'window': {},
+            }
+        # Per-second [requests, tokens] buckets for the last minute of scheduled calls.
+        window_start = int(now) - 60
+        state['window'] = {
+            second: bucket for second, bucket in state['window'].items() if second > window_start
+        }
+        return state
+
+    def _save(self, state):
+        cache.set(STATE_KEY, state, timeout=STATE_TIMEOUT)
+
+    def _start_time(self, state, now):
+        return max(
+            now,
+            state['request_tat'] - self.burst_seconds,
+            state['token_tat'] - self.burst_seconds,
+        )
+
+    def reserve(self, estimated_tokens):
+        if not self.enabled:
+            return RateReservation(self, estimated_tokens, None, 0.0)
+
+        now = time.time()
+        with CacheLease(STATE_KEY):
+            state = self._load(now)
+            start = self._start_time(state, now)
+            wait = start - now
+            if wait > self.max_wait:
+                state['rejected'] += 1
+                self._save(state)
+                raise RateLimitExceeded(
+                    f"LLM rate limit queue is {wait:.1f}s long (max {self.max_wait}s)"
+                )
+
+            state['request_tat'] = max(state['request_tat'], now) + self._request_interval()
+            state['token_tat'] = max(state['token_tat'], now) + self._token_interval() * estimated_tokens
+            state['acquired'] += 1
+            state['tokens_estimated'] += estimated_tokens
+            state['wait_total'] += wait
+            state['wait_max'] = max(state['wait_max'], wait)
+            if wait > 0:
+                state['delayed'] += 1
+            bucket = state['window'].setdefault(int(start), [0, 0])
+            bucket[0] += 1
+            bucket[1] += estimated_tokens
+            self._save(state)
+
+        return RateReservation(self, estimated_tokens, start, wait)
+
+    @contextmanager
+    def slot(self, estimated_tokens):
+        reservation = self.reserve(estimated_tokens)
+        if reservation.wait > 0:
+            logger.debug("LLM governor: waiting %.2fs for a request slot", reservation.wait)
+            time.sleep(reservation.wait)
+        yield reservation
+
+    def settle(self, reservation, used_tokens):
+        # Bookkeeping after a paid completion must never cost the caller its response.
+        if not self.enabled:
+            return
+        now = time.time()
+        difference = used_tokens - reservation.estimated_tokens
+        try:
+            with CacheLease(STATE_KEY):
+                state = self._load(now)
+                # Give back (or charge) the difference between the estimate and the real usage.
+                state['token_tat'] += self._token_interval() * difference
+                state['tokens_used'] += used_tokens
+                bucket = state['window'].get(int(reservation.start))
+                if bucket:
+                    bucket[1] = max(0, bucket[1] + difference)
+                self._save(state)
+        except LeaseUnavailable as e:
+            logger.warning("LLM governor: could not settle %s used tokens: %s", used_tokens, e)
+
+    def throttle(self, retry_after):
+        # The provider answered 429: nobody gets a slot before retry_after elapses.
+        if not self.enabled:
+            return
+        now = time.time()
+        try:
+            with CacheLease(STATE_KEY):
+                state = self._load(now)
+                resume = now + retry_after + self.burst_seconds
+                state['request_tat'] = max(state['request_tat'], resume)
+                state['token_tat'] = max(state['token_tat'], resume)
+                state['throttled'] += 1
+                self._save(state)
+        except LeaseUnavailable as e:
+            logger.warning("LLM governor: could not record provider rate limit: %s", e)
+            return
+        logger.warning("LLM governor: provider rate limit hit, pausing for %.1fs", retry_after)
+
+    def stats(self):
+        now = time.time()
+        state = self._load(now)
+        elapsed = [bucket for second, bucket in state['window'].items() if second <= now]
+        requests_last_minute = sum(bucket[0] for bucket in elapsed)
+        tokens_last_minute = sum(bucket[1] for bucket in elapsed)
+        acquired = state['acquired']
+        return {
+            'enabled': self.enabled,
+            'rpm_limit': self.rpm,
+            'tpm_limit': self.tpm,
+            'requests_last_minute': requests_last_minute,
+            'tokens_last_minute': tokens_last_minute,
+            'rpm_utilization': round(requests_last_minute / self.rpm, 3) if self.rpm else None,
+            'tpm_utilization': round(tokens_last_minute / self.tpm, 3) if self.tpm else None,
+            'current_wait_seconds': round(self._start_time(state, now) - now, 3),
+            'acquired': acquired,
+            'delayed': state['delayed'],
+            'rejected': state['rejected'],
+            'throttled': state['throttled'],
+            'avg_wait_seconds': round(state['wait_total'] / acquired, 3) if acquired else 0.0,
+            'max_wait_seconds': round(state['wait_max'], 3),
+            'tokens_estimated': state['tokens_estimated'],
+            'tokens_used': state['tokens_used'],
+        }
+
+
+def estimate_tokens(messages, max_tokens):
+    # Roughly four characters per token for the prompt plus the completion budget.
+    prompt_chars = sum(len(message.get('content') or '') for message in messages)
+    return prompt_chars // 4 + max_tokens
@@ -0,0 +1,232 @@
+import logging
+import math
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from django.core.cache import cache
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+from .config import LLMConfig
+from .metrics import counters, increment
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (APITimeoutError, APIConnectionError, InternalServerError, RateLimitError)
+
+BREAKER_KEY = 'llm_resilience:breaker'
+PROBE_KEY = 'llm_resilience:probe'
+LATENCY_KEY = 'llm_resilience:latency'
+STATE_TIMEOUT = 24 * 3600
+
+RESILIENCE_COUNTERS = [
+    f'resilience:{name}'
+    for name in (
+        'opened', 'fast_failed', 'retries', 'timeouts', 'errors', 'rate_limited', 'hedges', 'hedge_wins',
+    )
+]
+
+_hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='llm-hedge')
+
+
+class ProviderUnavailable(RuntimeError):
+    pass
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class LatencyTracker:
+    # Shared, lossy sample of recent completion latencies; a dropped sample under
+    # concurrent writes only makes the percentile slightly staler.
+
+    def samples(self):
+        return cache.get(LATENCY_KEY) or []
+
+    def record(self, seconds):
+        samples = self.samples()
+        samples.append(round(seconds, 3))
+        cache.set(LATENCY_KEY, samples[-LLMConfig.OPENAI_LATENCY_SAMPLES:], timeout=STATE_TIMEOUT)
+
+    def percentile(self, pct):
+        samples = self.samples()
+        if len(samples) < LLMConfig.OPENAI_LATENCY_MIN_SAMPLES:
+            return None
+        return _percentile(samples, pct)
+
+    def deadline(self):
+        observed = self.percentile(LLMConfig.OPENAI_TIMEOUT_PERCENTILE)
+        if observed is None:
+            return LLMConfig.OPENAI_TIMEOUT_MAX_SECONDS
+        return min(
+            LLMConfig.OPENAI_TIMEOUT_MAX_SECONDS,
+            max(LLMConfig.OPENAI_TIMEOUT_MIN_SECONDS, observed * LLMConfig.OPENAI_TIMEOUT_MULTIPLIER),
+        )
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def _state(self):
+        return cache.get(BREAKER_KEY) or {'failures': 0, 'opened_at': None}
+
+    def failures(self):
+        return self._state()['failures']
+
+    def state(self):
+        opened_at = self._state()['opened_at']
+        if opened_at is None:
+            return self.CLOSED
+        if time.time() - opened_at < LLMConfig.OPENAI_BREAKER_COOLDOWN_SECONDS:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self):
+        state = self.state()
+        if state == self.CLOSED:
+            return True
+        # After the cooldown exactly one caller across all workers probes the provider.
+        if state == self.HALF_OPEN and cache.add(
+            PROBE_KEY, 1, timeout=LLMConfig.OPENAI_BREAKER_COOLDOWN_SECONDS
+        ):
+            return True
+        increment('resilience:fast_failed')
+        return False
+
+    def record_success(self):
+        state = self._state()
+        if state['failures'] or state['opened_at'] is not None:
+            if state['opened_at'] is not None:
+                logger.info("LLM circuit breaker closed after a successful probe")
+            cache.set(BREAKER_KEY, {'failures': 0, 'opened_at': None}, timeout=STATE_TIMEOUT)
+            cache.delete(PROBE_KEY)
+
+    def record_failure(self):
+        state = self._state()
+        state['failures'] += 1
+        was_open = state['opened_at'] is not None
+        if was_open or state['failures'] >= LLMConfig.OPENAI_BREAKER_FAILURE_THRESHOLD:
+            state['opened_at'] = time.time()
+            cache.delete(PROBE_KEY)
+            increment('resilience:opened')
+            logger.warning(
+                "LLM circuit breaker open for %ss after %s consecutive failures",
+                LLMConfig.OPENAI_BREAKER_COOLDOWN_SECONDS,
+                state['failures'],
+            )
+        cache.set(BREAKER_KEY, state, timeout=STATE_TIMEOUT)
+
+
+class ResilientCaller:
+
+    def __init__(self, latency=None, breaker=None, hedge=None):
+        self.latency = latency or LatencyTracker()
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge = LLMConfig.OPENAI_HEDGE_ENABLED if hedge is None else hedge
+
+    def backoff(self, attempt):
+        ceiling = min(
+            LLMConfig.OPENAI_RETRY_MAX_SECONDS,
+            LLMConfig.OPENAI_RETRY_BASE_SECONDS * (2 ** attempt),
+        )
+        return random.uniform(0, ceiling)
+
+    def call(self, request):
+        # request(timeout) performs one completion with the given deadline.
+        if not self.breaker.allow():
+            raise ProviderUnavailable("LLM provider circuit breaker is open")
+
+        deadline = self.latency.deadline()
+        attempts = LLMConfig.OPENAI_MAX_RETRIES + 1
+        for attempt in range(attempts):
+            started = time.monotonic()
+            try:
+                response = self._hedged(request, deadline) if self.hedge else request(deadline)
+            except RETRYABLE_ERRORS as e:
+                if isinstance(e, RateLimitError):
+                    # The provider is up; the caller's governor holds the retry until retry-after.
+                    increment('resilience:rate_limited')
+                else:
+                    increment('resilience:timeouts' if isinstance(e, APITimeoutError) else 'resilience:errors')
+                    self.breaker.record_failure()
+                if attempt + 1 >= attempts or self.breaker.state() == CircuitBreaker.OPEN:
+                    raise ProviderUnavailable(
+                        f"LLM provider unavailable after {attempt + 1} attempt(s): {e.__class__.__name__}"
+                    ) from e
+                delay = self.backoff(attempt)
+                increment('resilience:retries')
+                logger.warning(
+                    "LLM call failed (%s), retry %s/%s in %.2fs",
+                    e.__class__.__name__,
+                    attempt + 1,
+                    attempts - 1,
+                    delay,
+                )
+                time.sleep(delay)
+                continue
+
+            self.latency.record(time.monotonic() - started)
+            self.breaker.record_success()
+            return response
+
+    def _hedged(self, request, deadline):
+        hedge_after = self.latency.percentile(LLMConfig.OPENAI_HEDGE_PERCENTILE)
+        if hedge_after is None:
+            return request(deadline)
+
+        primary = _hedge_executor.submit(request, deadline)
+        try:
+            return primary.result(timeout=hedge_after)
+        except FutureTimeout:
+            pass
+
+        increment('resilience:hedges')
+        backup = _hedge_executor.submit(request, deadline)
+        pending = {primary, backup}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        increment('resilience:hedge_wins')
+                    return future.result()
+                error = future.exception()
+        raise error
+
+
+def resilience_stats():
+    breaker = CircuitBreaker()
+    latency = LatencyTracker()
+    counts = counters(RESILIENCE_COUNTERS)
+
+    def counter(name):
+        return counts[f'resilience:{name}']
+
+    samples = latency.samples()
+    hedges = counter('hedges')
+    return {
+        'breaker': breaker.state(),
+        'consecutive_failures': breaker.failures(),
+        'breaker_opened': counter('opened'),
+        'fast_failed': counter('fast_failed'),
+        'retries': counter('retries'),
+        'timeouts': counter('timeouts'),
+        'errors': counter('errors'),
+        'rate_limited': counter('rate_limited'),
+        'latency_samples': len(samples),
+        'latency_p50': _percentile(samples, 50) if samples else None,
+        'latency_p90': _percentile(samples, 90) if samples else None,
+        'latency_p95': _percentile(samples, 95) if samples else None,
+        'deadline_seconds': latency.deadline(),
+        'hedge_enabled': LLMConfig.OPENAI_HEDGE_ENABLED,
+        'hedges': hedges,
+        'hedge_wins': counter('hedge_wins'),
+        'hedge_win_rate': round(counter('hedge_wins') / hedges, 3) if hedges else None,
+    }
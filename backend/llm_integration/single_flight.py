@@ -0,0 +1,327 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+
+from cache_manager import CacheLease, LeaseUnavailable
+
+from .config import LLMConfig
+from .metrics import counters, increment
+from .resilience import ProviderUnavailable
+from .telemetry import note_returned
+
+logger = logging.getLogger(__name__)
+
+FLIGHT_KEY = 'llm_flight:{}'
+RESULT_KEY = 'llm_flight_result:{}:{}'
+SEEN_KEY = 'llm_flight_seen:{}'
+# Member id of requests that join a flight after its model call has started.
+LATE = 'late'
+POLL_SECONDS = 0.05
+
+COALESCE_COUNTERS = [
+    f'coalesce:{name}'
+    for name in (
+        'requests', 'flights', 'uncontended', 'joined_local', 'joined_remote', 'joined_late', 'timeouts', 'failed',
+    )
+]
+
+_local_flights = {}
+_local_lock = threading.Lock()
+
+
+def flight_key(topic, difficulty, subtopic, knowledge_level, existing_questions=None):
+    scope = json.dumps(
+        [topic, difficulty, subtopic or '', knowledge_level or '', sorted(existing_questions or [])],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(scope.encode()).hexdigest()[:32]
+
+
+class Flight:
+
+    def __init__(self, flight_id, count):
+        self.id = flight_id
+        self.counts = [count]
+        self.open = True
+        self.running = False
+        self.done = threading.Event()
+        self.shares = None
+        self.error = None
+
+
+def deal(questions, counts):
+    # Round-robin so a short batch is shared fairly; surplus goes to the leader.
+    shares = [[] for _ in counts]
+    pending = list(questions)
+    while pending:
+        needy = [index for index, count in enumerate(counts) if len(shares[index]) < count]
+        if not needy:
+            shares[0].extend(pending)
+            break
+        for index in needy:
+            if not pending:
+                break
+            shares[index].append(pending.pop(0))
+    return shares
+
+
+def seat(counts, limit):
+    # Joiners are admitted against partial totals (local joins never touch the
+    # shared record), so the leader enforces the limit once membership is final.
+    seated = []
+    total = 0
+    for count in counts:
+        seated.append(total + count <= limit or not seated)
+        if seated[-1]:
+            total += count
+    return seated
+
+
+class SingleFlight:
+    # Identical generation requests that arrive within the collection window
+    # share one model call sized for all of them. Threads of one process join
+    # the flight in memory; other processes join it through its cache record.
+
+    def __init__(self, window=None, max_questions=None, wait=None):
+        self.window = LLMConfig.OPENAI_COALESCE_WINDOW_SECONDS if window is None else window
+        # A merged call must still fit in one model response.
+        self.max_questions = (
+            min(LLMConfig.OPENAI_COALESCE_MAX_QUESTIONS, LLMConfig.max_questions_per_call())
+            if max_questions is None else max_questions
+        )
+        self.wait = LLMConfig.OPENAI_COALESCE_WAIT_SECONDS if wait is None else wait
+
+    @property
+    def enabled(self):
+        return self.window > 0
+
+    def run(self, key, count, produce):
+        # produce(count) performs the model call and returns validated questions.
+        increment('coalesce:requests')
+        if not self.enabled or count >= self.max_questions:
+            return produce(count)
+
+        flight, index = self._join_local(key, count)
+        if flight is not None:
+            return self._await_local(flight, index, count, produce)
+
+        member = self._join_remote(key, count)
+        if member:
+            return self._await_remote(*member, count, produce)
+
+        flight, index = self._join_local(key, count, lead=True)
+        if index:
+            return self._await_local(flight, index, count, produce)
+        return self._lead(key, flight, produce)
+
+    def _join_local(self, key, count, lead=False):
+        with _local_lock:
+            flight = _local_flights.get(key)
+            if flight and flight.open and sum(flight.counts) + count <= self.max_questions:
+                flight.counts.append(count)
+                return flight, len(flight.counts) - 1
+            if flight and flight.running and count <= flight.counts[0]:
+                return flight, LATE
+            if not lead:
+                return None, None
+            flight = Flight(uuid.uuid4().hex, count)
+            _local_flights[key] = flight
+            return flight, 0
+
+    def _join_remote(self, key, count):
+        record_key = FLIGHT_KEY.format(key)
+        record = cache.get(record_key)
+        local = _local_flights.get(key)
+        # Our own process's flight was already found full by _join_local.
+        if record is None or (local is not None and local.id == record['id']):
+            return None
+        if record.get('running'):
+            return (record['id'], LATE) if count <= record['total'] else None
+        try:
+            with CacheLease(record_key, wait=self.window):
+                record = cache.get(record_key)
+                if record is None or record['total'] + count > self.max_questions:
+                    return None
+                member = uuid.uuid4().hex
+                record['members'].append([member, count])
+                record['total'] += count
+                cache.set(record_key, record, timeout=self._record_timeout())
+        except LeaseUnavailable:
+            return None
+        return record['id'], member
+
+    def _record_timeout(self):
+        return max(1, int(self.window + self.wait))
+
+    def _contended(self, key):
+        # The first request for a key in a while runs at once: waiting the window
+        # only pays off once identical requests actually arrive together.
+        return not cache.add(SEEN_KEY.format(key), 1, timeout=LLMConfig.OPENAI_COALESCE_RECENT_SECONDS)
+
+    def _lead(self, key, flight, produce):
+        record_key = FLIGHT_KEY.format(key)
+        record = {'id': flight.id, 'total': flight.counts[0], 'members': []}
+        contended = self._contended(key)
+        if not contended:
+            increment('coalesce:uncontended')
+            record['running'] = True
+        published = cache.add(record_key, record, timeout=self._record_timeout())
+        if contended:
+            time.sleep(self.window)
+
+        with _local_lock:
+            flight.open = False
+            flight.running = True
+        members = self._start_remote(record_key, flight) if published and contended else []
+
+        counts = flight.counts + [count for _, count in members]
+        seated = seat(counts, self.max_questions)
+        seats = [count for count, taken in zip(counts, seated) if taken]
+        increment('coalesce:flights')
+        if len(seats) > 1:
+            logger.info(
+                "Coalesced %s identical generation requests into one call for %s questions",
+                len(seats),
+                sum(seats),
+            )
+
+        local = len(flight.counts)
+        try:
+            questions = produce(sum(seats))
+        except Exception as e:
+            # Waiters must not sit out their timeout because the shared call failed.
+            increment('coalesce:failed')
+            flight.error = e
+            flight.done.set()
+            failure = {'error': str(e), 'unavailable': isinstance(e, ProviderUnavailable)}
+            for member, _ in members:
+                self._publish(flight.id, member, failure)
+            self._publish(flight.id, LATE, failure)
+            self._land(key, record_key, flight, published)
+            raise
+
+        dealt = iter(deal(questions, seats))
+        shares = [next(dealt) if taken else None for taken in seated]
+        flight.shares = shares[:local]
+        flight.done.set()
+        for (member, _), share in zip(members, shares[local:]):
+            self._publish(flight.id, member, {'questions': share})
+        self._publish(flight.id, LATE, {'questions': shares[0]})
+        self._land(key, record_key, flight, published)
+
+        note_returned(len(shares[0]) - len(questions))
+        return shares[0]
+
+    def _start_remote(self, record_key, flight):
+        # Members collected during the window are final; identical requests that
+        # arrive while the call runs still find the record and await a copy.
+        running = {'id': flight.id, 'total': flight.counts[0], 'members': [], 'running': True}
+        try:
+            with CacheLease(record_key, wait=self.window):
+                record = cache.get(record_key)
+                if record is not None and record['id'] == flight.id:
+                    cache.set(record_key, running, timeout=self._record_timeout())
+        except LeaseUnavailable:
+            # A joiner holding the lease past our window only risks its own timeout.
+            record = cache.get(record_key)
+            if record is not None and record['id'] == flight.id:
+                cache.set(record_key, running, timeout=self._record_timeout())
+        if record is None or record['id'] != flight.id:
+            return []
+        return record['members']
+
+    def _land(self, key, record_key, flight, published):
+        with _local_lock:
+            flight.running = False
+            if _local_flights.get(key) is flight:
+                del _local_flights[key]
+        if published:
+            record = cache.get(record_key)
+            if record is not None and record['id'] == flight.id:
+                cache.delete(record_key)
+
+    def _publish(self, flight_id, member, payload):
+        cache.set(RESULT_KEY.format(flight_id, member), payload, timeout=max(1, int(self.wait)))
+
+    def _await_local(self, flight, index, count, produce):
+        if not flight.done.wait(self.window + self.wait):
+            return self._timed_out(count, produce)
+        if flight.error is not None:
+            raise flight.error
+        if index == LATE:
+            return self._late_share(flight.shares[0], count, produce, 'coalesce:joined_local')
+        share = flight.shares[index]
+        if share is None:
+            return produce(count)
+        increment('coalesce:joined_local')
+        note_returned(len(share))
+        return share
+
+    def _await_remote(self, flight_id, member, count, produce):
+        result_key = RESULT_KEY.format(flight_id, member)
+        deadline = time.monotonic() + self.window + self.wait
+        result = cache.get(result_key)
+        while result is None and time.monotonic() < deadline:
+            time.sleep(POLL_SECONDS)
+            result = cache.get(result_key)
+        if result is None:
+            return self._timed_out(count, produce)
+
+        if member != LATE:
+            cache.delete(result_key)
+        if 'error' in result:
+            if result['unavailable']:
+                raise ProviderUnavailable(result['error'])
+            raise ValueError(result['error'])
+        if member == LATE:
+            return self._late_share(result['questions'], count, produce, 'coalesce:joined_remote')
+        if result['questions'] is None:
+            return produce(count)
+        increment('coalesce:joined_remote')
+        note_returned(len(result['questions']))
+        return result['questions']
+
+    def _late_share(self, questions, count, produce, counter):
+        # The call was already sized without us, so a late request reuses the
+        # leader's questions (rows are shared across sessions like bank questions).
+        if len(questions) < count:
+            return produce(count)
+        increment(counter)
+        increment('coalesce:joined_late')
+        note_returned(len(questions))
+        return list(questions)
+
+    def _timed_out(self, count, produce):
+        # The leader died or stalled; generate on our own rather than fail the user.
+        increment('coalesce:timeouts')
+        logger.warning("Coalesced generation did not finish in %ss, generating alone", self.wait)
+        return produce(count)
+
+
+def coalescing_stats():
+    counts = counters(COALESCE_COUNTERS)
+
+    def counter(name):
+        return counts[f'coalesce:{name}']
+
+    requests = counter('requests')
+    joined = counter('joined_local') + counter('joined_remote')
+    return {
+        'enabled': SingleFlight().enabled,
+        'window_seconds': LLMConfig.OPENAI_COALESCE_WINDOW_SECONDS,
+        'max_questions': SingleFlight().max_questions,
+        'requests': requests,
+        'flights': counter('flights'),
+        'uncontended': counter('uncontended'),
+        'joined_local': counter('joined_local'),
+        'joined_remote': counter('joined_remote'),
+        'joined_late': counter('joined_late'),
+        'timeouts': counter('timeouts'),
+        'failed': counter('failed'),
+        'coalesced_ratio': round(joined / requests, 3) if requests else None,
+    }
@@ -0,0 +1,114 @@
+import logging
+
+from .config import LLMConfig
+from .metrics import counters, increment
+
+logger = logging.getLogger(__name__)
+
+JSON_SCHEMA = 'json_schema'
+JSON_OBJECT = 'json_object'
+TEXT = 'text'
+OUTPUT_MODES = (JSON_SCHEMA, JSON_OBJECT, TEXT)
+
+OUTPUT_COUNTERS = [
+    f'output:{name}'
+    for name in ('batches', 'batch_failures', 'fallback_runs', 'fallback_calls', 'wasted_tokens')
+]
+
+# Field types for keys the validator requires; anything not listed is a string.
+FIELD_SCHEMAS = {
+    'wrong_answers': {'type': 'array', 'items': {'type': 'string'}},
+}
+
+# Models that rejected a response_format in this process, mapped to the mode that works.
+_downgraded = {}
+
+
+def question_schema(required_keys):
+    return {
+        'type': 'object',
+        'properties': {key: FIELD_SCHEMAS.get(key, {'type': 'string'}) for key in required_keys},
+        'required': list(required_keys),
+        'additionalProperties': False,
+    }
+
+
+def batch_schema(required_keys):
+    # Structured outputs need an object at the top level, so the batch is wrapped.
+    return {
+        'type': 'object',
+        'properties': {'questions': {'type': 'array', 'items': question_schema(required_keys)}},
+        'required': ['questions'],
+        'additionalProperties': False,
+    }
+
+
+def output_mode(model):
+    configured = LLMConfig.OPENAI_RESPONSE_FORMAT
+    if configured not in OUTPUT_MODES:
+        configured = TEXT
+    return _downgraded.get(model, configured)
+
+
+def response_format(mode, name, schema):
+    if mode == JSON_SCHEMA:
+        return {
+            'type': JSON_SCHEMA,
+            'json_schema': {'name': name, 'strict': True, 'schema': schema},
+        }
+    if mode == JSON_OBJECT:
+        return {'type': JSON_OBJECT}
+    return None
+
+
+def downgrade(model, mode, error):
+    # Older models answer 400 for json_schema (and the oldest for json_object).
+    if mode == TEXT or 'response_format' not in str(error):
+        return None
+    fallback = JSON_OBJECT if mode == JSON_SCHEMA else TEXT
+    _downgraded[model] = fallback
+    logger.warning("Model %s does not support %s output, using %s", model, mode, fallback)
+    return fallback
+
+
+def unwrap_questions(data):
+    if isinstance(data, dict):
+        if isinstance(data.get('questions'), list):
+            return data['questions']
+        if 'question' in data:
+            return [data]
+        lists = [value for value in data.values() if isinstance(value, list)]
+        if len(lists) == 1:
+            return lists[0]
+    return data
+
+
+def response_tokens(response):
+    return getattr(getattr(response, 'usage', None), 'total_tokens', None) or 0
+
+
+def record_output(name, delta=1):
+    increment(f'output:{name}', delta)
+
+
+def output_stats():
+    counts = counters(OUTPUT_COUNTERS)
+
+    def counter(name):
+        return counts[f'output:{name}']
+
+    batches = counter('batches')
+
+    def per_thousand(value):
+        return round(value * 1000 / batches, 1) if batches else None
+
+    return {
+        'mode': output_mode(LLMConfig.OPENAI_MODEL),
+        'batches': batches,
+        'batch_failures': counter('batch_failures'),
+        'fallback_runs': counter('fallback_runs'),
+        'fallback_calls': counter('fallback_calls'),
+        'wasted_tokens': counter('wasted_tokens'),
+        'fallback_calls_per_1000_batches': per_thousand(counter('fallback_calls')),
+        'wasted_tokens_per_1000_batches': per_thousand(counter('wasted_tokens')),
+    }
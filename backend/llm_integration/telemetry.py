@@ -0,0 +1,117 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+
+from .config import LLMConfig
+
+REJECTION_REASONS = (
+    'validation',
+    'unparseable',
+    'session_duplicate',
+    'session_similar',
+    'error',
+)
+
+_current = ContextVar('llm_call_telemetry', default=None)
+
+
+def _usage_value(source, name):
+    value = getattr(source, name, None)
+    return value if isinstance(value, int) else 0
+
+
+class CallTelemetry:
+    # Everything one generation call costs and yields, from the provider
+    # requests (batch plus any single-question fallback) to the questions kept.
+
+    def __init__(self, requested=0):
+        self.model = LLMConfig.OPENAI_MODEL
+        self.requested = requested
+        self.requests = 0
+        self.latency = 0.0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+        self.returned = 0
+        self.valid = 0
+        self.added = 0
+        self.deduplicated = 0
+        self.bank_fallback = False
+        self.rejections = Counter()
+
+    def add_response(self, response, seconds):
+        usage = getattr(response, 'usage', None)
+        self.requests += 1
+        self.latency += seconds
+        self.prompt_tokens += _usage_value(usage, 'prompt_tokens')
+        self.completion_tokens += _usage_value(usage, 'completion_tokens')
+        self.cached_tokens += _usage_value(getattr(usage, 'prompt_tokens_details', None), 'cached_tokens')
+
+    def reject(self, reason, count=1):
+        self.rejections[reason] += count
+
+    @property
+    def unused(self):
+        # Valid questions left over once the batch target was reached.
+        consumed = self.added + sum(self.rejections[reason] for reason in ('session_duplicate', 'session_similar', 'error'))
+        return max(0, self.valid - consumed)
+
+    @property
+    def cost(self):
+        return estimate_cost(self.prompt_tokens, self.cached_tokens, self.completion_tokens)
+
+
+def estimate_cost(prompt_tokens, cached_tokens, completion_tokens):
+    per_token = Decimal(1) / Decimal(1_000_000)
+    return (
+        (prompt_tokens - cached_tokens) * LLMConfig.OPENAI_PRICE_INPUT_PER_1M
+        + cached_tokens * LLMConfig.OPENAI_PRICE_CACHED_INPUT_PER_1M
+        + completion_tokens * LLMConfig.OPENAI_PRICE_OUTPUT_PER_1M
+    ) * per_token
+
+
+@contextmanager
+def collect_call_telemetry(requested=0):
+    telemetry = CallTelemetry(requested)
+    token = _current.set(telemetry)
+    try:
+        yield telemetry
+    finally:
+        _current.reset(token)
+
+
+def current_call_telemetry():
+    return _current.get()
+
+
+def note_rejection(reason, count=1):
+    telemetry = _current.get()
+    if telemetry is not None and count:
+        telemetry.reject(reason, count)
+
+
+def note_generated(count, bank_fallback=False):
+    telemetry = _current.get()
+    if telemetry is not None:
+        telemetry.valid += count
+        telemetry.bank_fallback = telemetry.bank_fallback or bank_fallback
+
+
+def note_added(deduplicated=False):
+    telemetry = _current.get()
+    if telemetry is not None:
+        telemetry.added += 1
+        telemetry.deduplicated += int(deduplicated)
+
+
+def note_returned(count):
+    telemetry = _current.get()
+    if telemetry is not None:
+        telemetry.returned += count
+
+
+def record_request(response, seconds):
+    telemetry = _current.get()
+    if telemetry is not None:
+        telemetry.add_response(response, seconds)
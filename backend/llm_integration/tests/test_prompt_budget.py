@@ -0,0 +1,124 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from llm_integration import prompt_budget
+from llm_integration.metrics import reset
+from llm_integration.prompt_budget import (
+    PROMPT_COUNTERS,
+    count_tokens,
+    prompt_stats,
+    question_stem,
+    select_exclusions,
+)
+from llm_integration.prompts import QuizPrompts
+from llm_integration.question_generator import QuestionGenerator
+from llm_integration.rate_governor import RateGovernor
+from llm_integration.resilience import BREAKER_KEY
+
+
+class FakeEmbeddings:
+    # Two-dimensional "embeddings": texts mentioning a keyword point one way.
+    def __init__(self, keyword):
+        self.keyword = keyword
+
+    def is_available(self):
+        return True
+
+    def encode_questions(self, texts):
+        return [[1.0, 0.0] if self.keyword in text else [0.0, 1.0] for text in texts]
+
+
+class PromptBudgetTests(SimpleTestCase):
+    def setUp(self):
+        reset(PROMPT_COUNTERS)
+        prompt_budget._vector_cache.clear()
+        self.addCleanup(prompt_budget._vector_cache.clear)
+
+    def test_tokenizer_download_failure_falls_back_to_length_estimate(self):
+        offline = MagicMock()
+        offline.encoding_for_model.side_effect = OSError('no network')
+        prompt_budget._encoding.cache_clear()
+        self.addCleanup(prompt_budget._encoding.cache_clear)
+
+        with patch.object(prompt_budget, 'tiktoken', offline):
+            self.assertEqual(count_tokens('x' * 40, model='offline-model'), 10)
+            self.assertEqual(count_tokens('x' * 8, model='offline-model'), 2)
+
+        offline.encoding_for_model.assert_called_once_with('offline-model')
+        offline.get_encoding.assert_not_called()
+
+    def test_static_prefix_is_identical_across_calls(self):
+        first = QuizPrompts.build_multiple_questions_prompt("Geografia", "łatwy", 3)
+        second = QuizPrompts.build_multiple_questions_prompt(
+            "Chemia", "trudny", 7, "Kwasy", "university", ["Jaki jest wzor kwasu siarkowego?"], 500
+        )
+
+        prefix = QuizPrompts.MULTIPLE_QUESTIONS_RULES
+        self.assertTrue(first.startswith(prefix))
+        self.assertTrue(second.startswith(prefix))
+        self.assertIn("- Jaki jest wzor kwasu siarkowego", second)
+
+    def test_exclusions_are_trimmed_to_the_token_budget(self):
+        existing = [f"Pytanie numer {i} o stolicach panstw europejskich i ich polozeniu?" for i in range(40)]
+        base = QuizPrompts.build_multiple_questions_prompt("Geografia", "łatwy", 3)
+        budget = count_tokens(base) + 120
+
+        prompt = QuizPrompts.build_multiple_questions_prompt(
+            "Geografia", "łatwy", 3, existing_questions=existing, token_budget=budget
+        )
+
+        self.assertLessEqual(count_tokens(prompt), budget)
+        self.assertIn("- Pytanie numer 0 o", prompt)
+        self.assertNotIn("- Pytanie numer 39 o", prompt)
+
+    def test_question_stem_keeps_the_first_words(self):
+        self.assertEqual(question_stem("Ile wynosi 2 + 2?"), "Ile wynosi 2 + 2")
+        self.assertEqual(question_stem("a b c d e f", max_words=3), "a b c…")
+
+    def test_most_similar_questions_are_selected_first(self):
+        existing = ["Stolica Francji?", "Wulkany Islandii?", "Stolica Niemiec?", "Rzeki Polski?"]
+
+        with patch.object(prompt_budget, "get_embeddings_service", return_value=FakeEmbeddings("Stolica")):
+            selected = select_exclusions("Stolica", existing, 2)
+
+        self.assertEqual(selected, ["Stolica Francji?", "Stolica Niemiec?"])
+
+    def test_without_embeddings_the_most_recent_questions_are_selected(self):
+        unavailable = MagicMock(is_available=MagicMock(return_value=False))
+
+        with patch.object(prompt_budget, "get_embeddings_service", return_value=unavailable):
+            self.assertEqual(select_exclusions("x", ["a", "b", "c", "b"], 2), ["c", "b"])
+
+    def test_generator_reports_prompt_and_cached_tokens(self):
+        cache.delete(BREAKER_KEY)
+        generator = QuestionGenerator()
+        generator.governor = RateGovernor(rpm=0, tpm=0)
+        generator.client = MagicMock()
+        question = {
+            "question": "Ktore miasto jest stolica Francji?",
+            "correct_answer": "Paryz",
+            "wrong_answers": ["Berlin", "Madryt", "Rzym"],
+            "explanation": "Stolica Francji to Paryz.",
+        }
+        generator.client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps({"questions": [question]})))],
+            usage=SimpleNamespace(
+                total_tokens=900,
+                prompt_tokens=700,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=512),
+            ),
+        )
+
+        generator.generate_multiple_questions(
+            "Geografia", "łatwy", 1, existing_questions=["Ktore miasto jest stolica Niemiec?"]
+        )
+
+        stats = prompt_stats()
+        self.assertEqual(stats["prompts"], 1)
+        self.assertEqual((stats["exclusions_offered"], stats["exclusions_included"]), (1, 1))
+        self.assertGreater(stats["avg_tokens"], stats["avg_static_tokens"])
+        self.assertEqual(stats["cache_hit_ratio"], round(512 / 700, 3))
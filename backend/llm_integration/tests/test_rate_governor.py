@@ -0,0 +1,145 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from openai import RateLimitError
+
+from cache_manager import CacheLease
+from llm_integration.config import LLMConfig
+from llm_integration.question_generator import QuestionGenerator
+from llm_integration.rate_governor import STATE_KEY, RateGovernor, RateLimitExceeded, estimate_tokens
+from llm_integration.resilience import BREAKER_KEY, ProviderUnavailable
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+
+
+class RateGovernorTests(SimpleTestCase):
+    def setUp(self):
+        cache.delete_many([STATE_KEY, BREAKER_KEY])
+        self.clock = FakeClock()
+        patcher = patch('llm_integration.rate_governor.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_requests_are_spaced_in_arrival_order(self):
+        governor = RateGovernor(rpm=60, tpm=0, burst_seconds=0, max_wait=30)
+
+        waits = [governor.reserve(10).wait for _ in range(3)]
+
+        self.assertEqual(waits, [0.0, 1.0, 2.0])
+        stats = governor.stats()
+        self.assertEqual((stats['acquired'], stats['delayed']), (3, 2))
+        self.assertEqual(stats['current_wait_seconds'], 3.0)
+
+    def test_token_budget_is_charged_by_estimate_and_settled_by_usage(self):
+        governor = RateGovernor(rpm=0, tpm=6000, burst_seconds=0, max_wait=30)
+
+        first = governor.reserve(100)
+        second = governor.reserve(100)
+        self.assertEqual((first.wait, second.wait), (0.0, 1.0))
+
+        first.settle(SimpleNamespace(total_tokens=50))
+        self.assertEqual(governor.reserve(100).wait, 1.5)
+        self.assertEqual(governor.stats()['tokens_used'], 50)
+
+    def test_burst_allowance_and_utilization(self):
+        governor = RateGovernor(rpm=60, tpm=6000, burst_seconds=5, max_wait=30)
+
+        waits = [governor.reserve(20).wait for _ in range(4)]
+
+        self.assertEqual(waits, [0.0, 0.0, 0.0, 0.0])
+        stats = governor.stats()
+        self.assertEqual(stats['requests_last_minute'], 4)
+        self.assertEqual(stats['rpm_utilization'], round(4 / 60, 3))
+        self.assertEqual(stats['tpm_utilization'], round(80 / 6000, 3))
+
+    def test_queue_longer_than_max_wait_is_rejected(self):
+        governor = RateGovernor(rpm=6, tpm=0, burst_seconds=0, max_wait=15)
+
+        governor.reserve(1)
+        governor.reserve(1)
+        with self.assertRaises(RateLimitExceeded):
+            governor.reserve(1)
+        self.assertEqual(governor.stats()['rejected'], 1)
+
+    def test_rejection_is_a_provider_outage(self):
+        self.assertTrue(issubclass(RateLimitExceeded, ProviderUnavailable))
+
+    def test_completion_survives_a_busy_governor_lease(self):
+        generator = QuestionGenerator()
+        generator.governor = RateGovernor(rpm=600, tpm=6000, burst_seconds=1, max_wait=30)
+        generator.client = MagicMock()
+        response = SimpleNamespace(usage=SimpleNamespace(total_tokens=50))
+        generator.client.chat.completions.create.return_value = response
+
+        messages = [{'role': 'user', 'content': 'x' * 40}]
+        with patch.object(CacheLease, 'acquire', side_effect=[True, False]):
+            result = generator._governed_completion(messages, {'model': 'test', 'max_tokens': 100}, 5)
+
+        self.assertIs(result, response)
+        self.assertEqual(generator.governor.stats()['tokens_used'], 0)
+
+    def test_slot_sleeps_for_its_turn(self):
+        governor = RateGovernor(rpm=30, tpm=0, burst_seconds=0, max_wait=30)
+
+        with governor.slot(1):
+            pass
+        with governor.slot(1):
+            pass
+
+        self.assertEqual(self.clock.slept, [2.0])
+
+    def test_provider_429_pauses_every_caller(self):
+        generator = QuestionGenerator()
+        generator.governor = RateGovernor(rpm=600, tpm=0, burst_seconds=1, max_wait=30)
+        generator.client = MagicMock()
+        generator.client.chat.completions.create.side_effect = RateLimitError(
+            'rate limited',
+            response=MagicMock(status_code=429, headers={'retry-after': '7'}),
+            body=None,
+        )
+
+        messages = [{'role': 'user', 'content': 'x' * 40}]
+        with patch.object(LLMConfig, 'OPENAI_MAX_RETRIES', 0), self.assertRaises(ProviderUnavailable) as raised:
+            generator._create_completion(messages, {'model': 'test', 'max_tokens': 100})
+        self.assertIsInstance(raised.exception.__cause__, RateLimitError)
+
+        stats = generator.governor.stats()
+        self.assertEqual(stats['throttled'], 1)
+        self.assertEqual(stats['current_wait_seconds'], 7.0)
+        self.assertEqual(stats['tokens_estimated'], estimate_tokens(messages, 100))
+
+    @patch('llm_integration.resilience.time.sleep')
+    def test_429_is_retried_after_retry_after(self, resilience_sleep):
+        generator = QuestionGenerator()
+        generator.governor = RateGovernor(rpm=600, tpm=0, burst_seconds=1, max_wait=30)
+        generator.client = MagicMock()
+        response = SimpleNamespace(usage=SimpleNamespace(total_tokens=50))
+        generator.client.chat.completions.create.side_effect = [
+            RateLimitError(
+                'rate limited',
+                response=MagicMock(status_code=429, headers={'retry-after': '7'}),
+                body=None,
+            ),
+            response,
+        ]
+
+        messages = [{'role': 'user', 'content': 'x' * 40}]
+        with patch('llm_integration.question_generator.record_request'):
+            result = generator._create_completion(messages, {'model': 'test', 'max_tokens': 100})
+
+        self.assertIs(result, response)
+        self.assertEqual(self.clock.slept, [7.0])
+        self.assertEqual(generator.client.chat.completions.create.call_count, 2)
+        self.assertEqual(estimate_tokens(messages, 100), 110)
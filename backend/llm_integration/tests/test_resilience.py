@@ -0,0 +1,119 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from openai import APITimeoutError, RateLimitError
+
+from llm_integration.config import LLMConfig
+from llm_integration.metrics import reset
+from llm_integration.resilience import (
+    BREAKER_KEY,
+    LATENCY_KEY,
+    PROBE_KEY,
+    RESILIENCE_COUNTERS,
+    CircuitBreaker,
+    LatencyTracker,
+    ProviderUnavailable,
+    ResilientCaller,
+    resilience_stats,
+)
+
+
+class ResilienceTests(SimpleTestCase):
+    def setUp(self):
+        cache.delete_many([BREAKER_KEY, PROBE_KEY, LATENCY_KEY])
+        reset(RESILIENCE_COUNTERS)
+        patcher = patch('llm_integration.resilience.time.sleep')
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _timeout(self):
+        return APITimeoutError(request=MagicMock())
+
+    def test_deadline_follows_observed_latency(self):
+        tracker = LatencyTracker()
+        self.assertEqual(tracker.deadline(), LLMConfig.OPENAI_TIMEOUT_MAX_SECONDS)
+
+        cache.set(LATENCY_KEY, [3.0] * 20)
+        self.assertEqual(tracker.deadline(), LLMConfig.OPENAI_TIMEOUT_MIN_SECONDS)
+
+        cache.set(LATENCY_KEY, [2.0] * 10 + [20.0] * 10)
+        self.assertEqual(tracker.deadline(), 40.0)
+
+    def test_retries_with_jittered_backoff_then_succeeds(self):
+        request = MagicMock(side_effect=[self._timeout(), self._timeout(), 'response'])
+
+        with patch('llm_integration.resilience.random.uniform', side_effect=lambda low, high: high):
+            self.assertEqual(ResilientCaller(hedge=False).call(request), 'response')
+
+        self.assertEqual([c.args[0] for c in self.sleep.call_args_list], [0.5, 1.0])
+        request.assert_called_with(LLMConfig.OPENAI_TIMEOUT_MAX_SECONDS)
+        stats = resilience_stats()
+        self.assertEqual((stats['retries'], stats['timeouts']), (2, 2))
+        self.assertEqual(stats['breaker'], CircuitBreaker.CLOSED)
+        self.assertEqual(stats['consecutive_failures'], 0)
+
+    @patch.object(LLMConfig, 'OPENAI_MAX_RETRIES', 0)
+    @patch.object(LLMConfig, 'OPENAI_BREAKER_FAILURE_THRESHOLD', 2)
+    def test_breaker_opens_and_fails_fast(self):
+        caller = ResilientCaller(hedge=False)
+        request = MagicMock(side_effect=self._timeout())
+
+        for _ in range(2):
+            with self.assertRaises(ProviderUnavailable) as raised:
+                caller.call(request)
+            self.assertIsInstance(raised.exception.__cause__, APITimeoutError)
+        with self.assertRaises(ProviderUnavailable):
+            caller.call(request)
+
+        self.assertEqual(request.call_count, 2)
+        stats = resilience_stats()
+        self.assertEqual((stats['breaker'], stats['breaker_opened'], stats['fast_failed']), ('open', 1, 1))
+
+    @patch.object(LLMConfig, 'OPENAI_MAX_RETRIES', 2)
+    @patch.object(LLMConfig, 'OPENAI_BREAKER_FAILURE_THRESHOLD', 2)
+    def test_rate_limits_are_retried_without_opening_the_breaker(self):
+        rate_limited = RateLimitError('slow down', response=MagicMock(status_code=429, headers={}), body=None)
+        request = MagicMock(side_effect=rate_limited)
+
+        with self.assertRaises(ProviderUnavailable):
+            ResilientCaller(hedge=False).call(request)
+
+        self.assertEqual(request.call_count, 3)
+        stats = resilience_stats()
+        self.assertEqual((stats['rate_limited'], stats['retries']), (3, 2))
+        self.assertEqual((stats['breaker'], stats['consecutive_failures']), (CircuitBreaker.CLOSED, 0))
+
+    def test_half_open_breaker_lets_a_single_probe_through(self):
+        breaker = CircuitBreaker()
+        cache.set(BREAKER_KEY, {'failures': 5, 'opened_at': time.time() - 3600})
+
+        self.assertEqual(breaker.state(), CircuitBreaker.HALF_OPEN)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+        breaker.record_success()
+        self.assertEqual(breaker.state(), CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_hedged_request_wins_over_slow_primary(self):
+        cache.set(LATENCY_KEY, [0.05] * 20)
+        calls = []
+        release = threading.Event()
+
+        def request(timeout):
+            calls.append(timeout)
+            if len(calls) == 1:
+                release.wait(2)
+                return 'primary'
+            return 'hedge'
+
+        try:
+            self.assertEqual(ResilientCaller(hedge=True).call(request), 'hedge')
+        finally:
+            release.set()
+
+        stats = resilience_stats()
+        self.assertEqual((stats['hedges'], stats['hedge_wins'], stats['hedge_win_rate']), (1, 1, 1.0))
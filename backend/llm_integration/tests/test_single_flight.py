@@ -0,0 +1,236 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from llm_integration.config import LLMConfig
+from llm_integration.metrics import reset
+from llm_integration.question_generator import QuestionGenerator
+from llm_integration.rate_governor import RateGovernor
+from llm_integration.resilience import BREAKER_KEY, ProviderUnavailable
+from llm_integration.single_flight import (
+    COALESCE_COUNTERS,
+    FLIGHT_KEY,
+    SEEN_KEY,
+    SingleFlight,
+    coalescing_stats,
+    deal,
+    flight_key,
+)
+
+
+def _seen(key):
+    # Pretend an identical request arrived moments ago, as during a burst.
+    cache.set(SEEN_KEY.format(key), 1)
+
+
+def _question(number):
+    return {
+        "question": f"Ktora planeta jest numerem {number} od Slonca?",
+        "correct_answer": f"Planeta {number}",
+        "wrong_answers": [f"Ksiezyc {number}", f"Gwiazda {number}", f"Kometa {number}"],
+        "explanation": f"Poprawna odpowiedz to Planeta {number}.",
+    }
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        reset(COALESCE_COUNTERS)
+        self.calls = []
+
+    def _produce(self, total):
+        self.calls.append(total)
+        return [f'q{i}' for i in range(total)]
+
+    def _run_concurrently(self, flight, key, counts):
+        _seen(key)
+        results = [None] * len(counts)
+
+        def run(index):
+            results[index] = flight.run(key, counts[index], self._produce)
+
+        threads = [threading.Thread(target=run, args=(index,)) for index in range(len(counts))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_deal_splits_round_robin_and_leader_keeps_surplus(self):
+        self.assertEqual(deal(['a', 'b', 'c', 'd'], [3, 3]), [['a', 'c'], ['b', 'd']])
+        self.assertEqual(deal(['a', 'b', 'c', 'd'], [1, 2]), [['a', 'd'], ['b', 'c']])
+
+    def test_identical_requests_in_one_process_share_a_call(self):
+        flight = SingleFlight(window=0.2, max_questions=10, wait=5)
+
+        results = self._run_concurrently(flight, 'same', [3, 3, 3])
+
+        self.assertEqual(self.calls, [9])
+        self.assertEqual(sorted(item for share in results for item in share), sorted(self._produce(9)))
+        self.assertTrue(all(len(share) == 3 for share in results))
+        stats = coalescing_stats()
+        self.assertEqual((stats['requests'], stats['flights'], stats['joined_local']), (3, 1, 2))
+        self.assertEqual(stats['coalesced_ratio'], round(2 / 3, 3))
+
+    def test_flight_never_grows_past_max_questions(self):
+        flight = SingleFlight(window=0.2, max_questions=8, wait=5)
+
+        self._run_concurrently(flight, 'capped', [4, 4, 4])
+
+        self.assertEqual(sorted(self.calls), [4, 8])
+
+    def test_other_process_joins_through_cache_record(self):
+        flight = SingleFlight(window=0.3, max_questions=10, wait=5)
+        _seen('remote')
+        leader = threading.Thread(target=lambda: flight.run('remote', 3, self._produce))
+        leader.start()
+        time.sleep(0.1)
+
+        with patch('llm_integration.single_flight._local_flights', {}):
+            member = flight._join_remote('remote', 2)
+        share = flight._await_remote(*member, 2, self._produce)
+        leader.join()
+
+        self.assertEqual(self.calls, [5])
+        self.assertEqual(share, ['q1', 'q3'])
+        self.assertEqual(coalescing_stats()['joined_remote'], 1)
+
+    def test_failure_of_shared_call_reaches_every_waiter(self):
+        flight = SingleFlight(window=0.3, max_questions=10, wait=5)
+
+        def fail(total):
+            raise ProviderUnavailable("breaker open")
+
+        errors = []
+        _seen('failing')
+
+        def lead():
+            try:
+                flight.run('failing', 3, fail)
+            except ProviderUnavailable as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=lead)
+        leader.start()
+        time.sleep(0.1)
+        with patch('llm_integration.single_flight._local_flights', {}):
+            member = flight._join_remote('failing', 2)
+        with self.assertRaises(ProviderUnavailable):
+            flight._await_remote(*member, 2, self._produce)
+        leader.join()
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(self.calls, [])
+
+    def test_first_request_in_a_while_does_not_wait_for_the_window(self):
+        flight = SingleFlight(window=0.2, max_questions=10, wait=5)
+
+        with patch('llm_integration.single_flight.time.sleep') as sleep:
+            self.assertEqual(flight.run('quiet', 2, self._produce), ['q0', 'q1'])
+            sleep.assert_not_called()
+            flight.run('quiet', 2, self._produce)
+            sleep.assert_called_once_with(0.2)
+
+        self.assertEqual(coalescing_stats()['uncontended'], 1)
+
+    def _slow_produce(self, started, release):
+        def produce(total):
+            started.set()
+            release.wait(5)
+            return self._produce(total)
+        return produce
+
+    def test_request_during_uncontended_call_reuses_its_result(self):
+        flight = SingleFlight(window=0.2, max_questions=10, wait=5)
+        started, release = threading.Event(), threading.Event()
+        produce = self._slow_produce(started, release)
+        results = {}
+
+        first = threading.Thread(target=lambda: results.update(first=flight.run('click', 3, produce)))
+        first.start()
+        self.assertTrue(started.wait(5))
+        second = threading.Thread(target=lambda: results.update(second=flight.run('click', 3, produce)))
+        second.start()
+        time.sleep(0.05)
+        release.set()
+        first.join()
+        second.join()
+
+        self.assertEqual(self.calls, [3])
+        self.assertEqual(results, {'first': ['q0', 'q1', 'q2'], 'second': ['q0', 'q1', 'q2']})
+        stats = coalescing_stats()
+        self.assertEqual((stats['uncontended'], stats['joined_local'], stats['joined_late']), (1, 1, 1))
+
+    def test_other_process_awaits_a_running_call(self):
+        flight = SingleFlight(window=0.2, max_questions=10, wait=5)
+        started, release = threading.Event(), threading.Event()
+        leader = threading.Thread(target=lambda: flight.run('running', 3, self._slow_produce(started, release)))
+        leader.start()
+        self.assertTrue(started.wait(5))
+
+        with patch('llm_integration.single_flight._local_flights', {}):
+            member = flight._join_remote('running', 2)
+            too_big = flight._join_remote('running', 4)
+        release.set()
+        share = flight._await_remote(*member, 2, self._produce)
+        leader.join()
+
+        self.assertIsNone(too_big)
+        self.assertEqual(self.calls, [3])
+        self.assertEqual(share, ['q0', 'q1', 'q2'])
+        self.assertIsNone(cache.get(FLIGHT_KEY.format('running')))
+
+    def test_default_flight_size_fits_one_model_response(self):
+        with patch.object(LLMConfig, 'OPENAI_MAX_OUTPUT_TOKENS', 2100):
+            self.assertEqual(SingleFlight().max_questions, 6)
+
+    def test_waiter_generates_alone_when_leader_never_answers(self):
+        flight = SingleFlight(window=0.05, max_questions=10, wait=0.1)
+
+        self.assertEqual(flight._await_remote('dead-flight', 'member', 2, self._produce), ['q0', 'q1'])
+        self.assertEqual(coalescing_stats()['timeouts'], 1)
+
+    def test_key_covers_generation_parameters(self):
+        base = flight_key('Astronomia', 'łatwy', None, 'high_school', ['b', 'a'])
+        self.assertEqual(base, flight_key('Astronomia', 'łatwy', '', 'high_school', ['a', 'b']))
+        self.assertNotEqual(base, flight_key('Astronomia', 'trudny', None, 'high_school', ['a', 'b']))
+
+
+class GeneratorCoalescingTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        reset(COALESCE_COUNTERS)
+        cache.delete(BREAKER_KEY)
+
+    def test_double_start_makes_one_model_call(self):
+        generator = QuestionGenerator()
+        generator.governor = RateGovernor(rpm=0, tpm=0)
+        generator.single_flight = SingleFlight(window=0.2, max_questions=10, wait=5)
+        generator.client = MagicMock()
+        generator.client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(
+                content=json.dumps({"questions": [_question(number) for number in range(1, 7)]})
+            ))],
+            usage=SimpleNamespace(total_tokens=1000, prompt_tokens=600, completion_tokens=400),
+        )
+        results = []
+        _seen(flight_key('Astronomia', 'łatwy', None, 'high_school'))
+
+        def start():
+            results.append(generator.generate_multiple_questions('Astronomia', 'łatwy', 3))
+
+        threads = [threading.Thread(target=start) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(generator.client.chat.completions.create.call_count, 1)
+        self.assertEqual([len(share) for share in results], [3, 3])
+        texts = [question['question'] for share in results for question in share]
+        self.assertEqual(len(set(texts)), 6)
@@ -0,0 +1,104 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from openai import BadRequestError
+
+from llm_integration import structured_output
+from llm_integration.config import LLMConfig
+from llm_integration.metrics import reset
+from llm_integration.question_generator import QuestionGenerator
+from llm_integration.rate_governor import RateGovernor
+from llm_integration.resilience import BREAKER_KEY
+from llm_integration.structured_output import OUTPUT_COUNTERS, batch_schema, output_stats
+
+
+def _question(text, answer):
+    return {
+        "question": text,
+        "correct_answer": answer,
+        "wrong_answers": ["Berlin", "Madryt", "Wieden"],
+        "explanation": f"Poprawna odpowiedz to {answer}.",
+    }
+
+
+def _response(payload, tokens=100):
+    content = payload if isinstance(payload, str) else json.dumps(payload)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(total_tokens=tokens),
+    )
+
+
+class StructuredOutputTests(SimpleTestCase):
+    def setUp(self):
+        cache.delete(BREAKER_KEY)
+        reset(OUTPUT_COUNTERS)
+        structured_output._downgraded.clear()
+        self.addCleanup(structured_output._downgraded.clear)
+        self.generator = QuestionGenerator()
+        self.generator.governor = RateGovernor(rpm=0, tpm=0)
+        self.generator.client = MagicMock()
+        self.create = self.generator.client.chat.completions.create
+
+    def test_schema_is_derived_from_validator_keys(self):
+        schema = batch_schema(QuestionGenerator.REQUIRED_KEYS)
+        item = schema["properties"]["questions"]["items"]
+
+        self.assertEqual(item["required"], list(QuestionGenerator.REQUIRED_KEYS))
+        self.assertEqual(set(item["properties"]), set(QuestionGenerator.REQUIRED_KEYS))
+        self.assertEqual(item["properties"]["wrong_answers"]["type"], "array")
+        self.assertFalse(item["additionalProperties"])
+
+    def test_batch_requests_json_schema_and_needs_no_fallback(self):
+        self.create.return_value = _response({"questions": [
+            _question("Ktore miasto jest stolica Francji?", "Paryz"),
+            _question("Ktore miasto jest stolica Wloch?", "Rzym"),
+        ]})
+
+        with patch.object(LLMConfig, "OPENAI_RESPONSE_FORMAT", "json_schema"):
+            result = self.generator.generate_multiple_questions("Geografia", "latwy", 2)
+
+        self.assertEqual(len(result), 2)
+        self.assertEqual(self.create.call_count, 1)
+        output_format = self.create.call_args.kwargs["response_format"]
+        self.assertEqual(output_format["type"], "json_schema")
+        self.assertTrue(output_format["json_schema"]["strict"])
+        stats = output_stats()
+        self.assertEqual((stats["batches"], stats["fallback_calls"], stats["wasted_tokens"]), (1, 0, 0))
+
+    def test_unparseable_text_batch_counts_fallback_calls_and_wasted_tokens(self):
+        self.create.side_effect = [
+            _response("Oto pytania: {\"questions\": [", tokens=400),
+            _response("Nie moge", tokens=50),
+            _response(_question("Ktore miasto jest stolica Francji?", "Paryz"), tokens=60),
+        ]
+
+        with patch.object(LLMConfig, "OPENAI_RESPONSE_FORMAT", "text"):
+            result = self.generator.generate_multiple_questions("Geografia", "latwy", 1)
+
+        self.assertEqual(len(result), 1)
+        self.assertNotIn("response_format", self.create.call_args.kwargs)
+        stats = output_stats()
+        self.assertEqual(stats["batch_failures"], 1)
+        self.assertEqual((stats["fallback_runs"], stats["fallback_calls"]), (1, 2))
+        self.assertEqual(stats["wasted_tokens"], 450)
+        self.assertEqual(stats["fallback_calls_per_1000_batches"], 2000.0)
+
+    def test_model_without_json_schema_is_downgraded_once(self):
+        rejected = BadRequestError(
+            "Invalid parameter: 'response_format' of type 'json_schema' is not supported with this model.",
+            response=MagicMock(status_code=400),
+            body=None,
+        )
+        valid = _response({"questions": [_question("Ktore miasto jest stolica Francji?", "Paryz")]})
+        self.create.side_effect = [rejected, valid, valid]
+
+        with patch.object(LLMConfig, "OPENAI_RESPONSE_FORMAT", "json_schema"):
+            self.generator.generate_multiple_questions("Geografia", "latwy", 1)
+            self.generator.generate_multiple_questions("Geografia", "latwy", 1)
+
+        formats = [call.kwargs["response_format"]["type"] for call in self.create.call_args_list]
+        self.assertEqual(formats, ["json_schema", "json_object", "json_object"])
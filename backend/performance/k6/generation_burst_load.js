@@ -0,0 +1,132 @@
+import http from 'k6/http';
+import { check, sleep } from 'k6';
+import { Counter, Gauge, Trend } from 'k6/metrics';
+
+const baseUrl = (__ENV.BASE_URL || 'http://localhost:8000').replace(/\/+$/, '');
+const perfEmail = __ENV.PERF_EMAIL;
+const perfPassword = __ENV.PERF_PASSWORD;
+const adminEmail = __ENV.ADMIN_EMAIL;
+const adminPassword = __ENV.ADMIN_PASSWORD;
+
+if (!perfEmail || !perfPassword || !adminEmail || !adminPassword) {
+  throw new Error('Missing PERF_EMAIL, PERF_PASSWORD, ADMIN_EMAIL or ADMIN_PASSWORD.');
+}
+
+const topic = __ENV.QUIZ_TOPIC || 'Matematyka';
+const knowledgeLevel = __ENV.QUIZ_KNOWLEDGE_LEVEL || 'high_school';
+const difficulty = __ENV.QUIZ_DIFFICULTY || 'medium';
+const questionsCount = Number(__ENV.QUIZ_QUESTIONS || 5);
+
+const startTrend = new Trend('burst_start_duration', true);
+const startFailures = new Counter('burst_start_failures');
+const generationRequests = new Counter('llm_generation_requests');
+const modelCalls = new Counter('llm_coalesced_flights');
+const coalescedRatio = new Gauge('llm_coalesced_ratio');
+
+const jsonHeaders = { 'Content-Type': 'application/json' };
+
+export const options = {
+  scenarios: {
+    // Every start uses the same topic and settings, like a popular quiz going live.
+    generation_burst: {
+      executor: 'constant-arrival-rate',
+      rate: Number(__ENV.START_RATE || 10),
+      timeUnit: '1s',
+      duration: __ENV.DURATION || '1m',
+      preAllocatedVUs: Number(__ENV.VUS || 20),
+      maxVUs: Number(__ENV.MAX_VUS || 100),
+    },
+  },
+  thresholds: {
+    http_req_failed: ['rate<0.10'],
+    burst_start_duration: ['p(95)<8000'],
+    llm_coalesced_ratio: [`value>=${Number(__ENV.MIN_COALESCED_RATIO || 0)}`],
+  },
+};
+
+function asJson(response) {
+  try {
+    return response.json();
+  } catch {
+    return null;
+  }
+}
+
+function login(email, password) {
+  const response = http.post(
+    `${baseUrl}/api/auth/jwt/create/`,
+    JSON.stringify({ email, password }),
+    { headers: jsonHeaders, tags: { endpoint: 'auth_jwt_create' } }
+  );
+  if (response.status !== 200) {
+    throw new Error(`Login failed for ${email}: ${response.status}`);
+  }
+  return asJson(response).access;
+}
+
+function coalescingStats(adminToken) {
+  const response = http.get(`${baseUrl}/api/quiz/admin/llm-coalescing/`, {
+    headers: { Authorization: `Bearer ${adminToken}` },
+    tags: { endpoint: 'admin_llm_coalescing' },
+  });
+  check(response, { 'coalescing stats status is 200': (r) => r.status === 200 });
+  return asJson(response) || {};
+}
+
+export function setup() {
+  const adminToken = login(adminEmail, adminPassword);
+  return {
+    token: login(perfEmail, perfPassword),
+    adminToken,
+    before: coalescingStats(adminToken),
+  };
+}
+
+export default function (data) {
+  const headers = { ...jsonHeaders, Authorization: `Bearer ${data.token}` };
+  const response = http.post(
+    `${baseUrl}/api/quiz/start/`,
+    JSON.stringify({
+      topic,
+      knowledge_level: knowledgeLevel,
+      difficulty,
+      questions_count: questionsCount,
+    }),
+    { headers, tags: { endpoint: 'quiz_start' } }
+  );
+
+  startTrend.add(response.timings.duration);
+  const sessionId = asJson(response)?.session_id;
+  const ok = check(response, {
+    'start quiz status is 201': (r) => r.status === 201,
+    'start quiz has session id': () => Number.isInteger(sessionId),
+  });
+  if (!ok) {
+    startFailures.add(1);
+    return;
+  }
+
+  http.post(`${baseUrl}/api/quiz/cancel/${sessionId}/`, '{}', {
+    headers,
+    tags: { endpoint: 'quiz_cancel' },
+  });
+  sleep(Number(__ENV.ITERATION_SLEEP || 0));
+}
+
+export function teardown(data) {
+  const after = coalescingStats(data.adminToken);
+  const delta = (name) => (after[name] || 0) - (data.before[name] || 0);
+  const requests = delta('requests');
+  const joined = delta('joined_local') + delta('joined_remote');
+
+  generationRequests.add(requests);
+  modelCalls.add(delta('flights'));
+  coalescedRatio.add(requests ? joined / requests : 0);
+  console.log(
+    `coalescing: ${requests} generation requests, ${delta('flights')} flights ` +
+      `(${delta('uncontended')} without a wait), ` +
+      `${delta('joined_local')} joined in-process, ${delta('joined_remote')} joined across processes, ` +
+      `${delta('joined_late')} joined a running call, ` +
+      `${delta('timeouts')} timeouts, ratio ${requests ? (joined / requests).toFixed(3) : 'n/a'}`
+  );
+}
@@ -50,7 +50,7 @@ class QuestionAdmin(admin.ModelAdmin):
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        return qs.prefetch_related("answers")
+        return qs.without_explanations().prefetch_related("answers")
 
     inlines = [AnswerInline]
 
@@ -3,6 +3,7 @@ from django.utils import timezone
 from django.utils.html import format_html
 
 from ..models import QuizSession
+from ..services.history_service import snapshot_completed_session
 from .filters import AccuracyFilter
 from .inlines import QuestionInline
 
@@ -154,6 +155,7 @@ class QuizSessionAdmin(admin.ModelAdmin):
                 if not session.ended_at:
                     session.ended_at = timezone.now()
                 session.save()
+                snapshot_completed_session(session)
                 count += 1
         self.message_user(request, f"{count} quiz(zes) marked as completed.")
 
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, FloatField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from quiz_app.models import Answer, QuizSession
+
+
+class Command(BaseCommand):
+    help = "Recomputes denormalized answer count and total response time on quiz sessions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Sessions updated per statement (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+
+        session_answers = Answer.objects.filter(session=OuterRef("pk")).order_by().values("session")
+        answers_count = Subquery(
+            session_answers.annotate(total=Count("id")).values("total"),
+            output_field=IntegerField(),
+        )
+        response_time = Subquery(
+            session_answers.annotate(total=Sum("response_time")).values("total"),
+            output_field=FloatField(),
+        )
+
+        updated = 0
+        last_id = 0
+        while True:
+            ids = list(
+                QuizSession.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            updated += QuizSession.objects.filter(id__in=ids).update(
+                answers_count=Coalesce(answers_count, Value(0)),
+                total_response_time=Coalesce(response_time, Value(0.0)),
+            )
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Done. Recomputed totals for {updated} sessions."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from quiz_app.models import Question, QuizSession, Topic
+
+
+class Command(BaseCommand):
+    help = "Links quiz sessions and questions without a canonical topic to Topic rows"
+
+    def handle(self, *args, **options):
+        topics_before = Topic.objects.count()
+
+        for model in (QuizSession, Question):
+            raw_topics = (
+                model.objects.filter(canonical_topic__isnull=True)
+                .exclude(topic="")
+                .values_list("topic", flat=True)
+                .distinct()
+            )
+
+            linked = 0
+            for raw_topic in list(raw_topics):
+                topic = Topic.resolve(raw_topic)
+                if topic is None:
+                    continue
+                linked += model.objects.filter(
+                    topic=raw_topic,
+                    canonical_topic__isnull=True,
+                ).update(canonical_topic=topic)
+
+            self.stdout.write(f"{model._meta.verbose_name_plural}: linked {linked} rows")
+
+        created = Topic.objects.count() - topics_before
+        self.stdout.write(self.style.SUCCESS(f"Done. Created {created} new topics."))
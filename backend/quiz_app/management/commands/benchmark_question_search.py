@@ -0,0 +1,130 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from quiz_app.models import Question
+from quiz_app.services.question_search_service import search_questions
+
+BENCHMARK_TOPIC = '__search_benchmark__'
+
+WORDS = [
+    'fotosynteza', 'chlorofil', 'komórka', 'energia', 'słońce', 'równanie', 'całka', 'pochodna',
+    'funkcja', 'wielomian', 'wojna', 'królestwo', 'powstanie', 'konstytucja', 'rzeka', 'góry',
+    'stolica', 'województwo', 'pierwiastek', 'wodór', 'tlen', 'reakcja', 'atom', 'cząsteczka',
+    'siła', 'prędkość', 'przyspieszenie', 'grawitacja', 'planeta', 'galaktyka', 'poeta', 'powieść',
+    'dramat', 'epoka', 'romantyzm', 'pozytywizm', 'algorytm', 'procesor', 'pamięć', 'sieć',
+]
+
+DEFAULT_TERMS = ['fotosynteza', 'równanie całka', 'wojna', 'planeta galaktyka', 'zolw']
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks question full-text search against the legacy icontains filter'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Insert this many synthetic questions before measuring (e.g. 1000000)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows per INSERT while seeding (default: 5000)',
+        )
+        parser.add_argument(
+            '--term',
+            action='append',
+            dest='terms',
+            help='Search term to measure (repeatable)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Runs per term, the best time is reported (default: 3)',
+        )
+        parser.add_argument(
+            '--cleanup',
+            action='store_true',
+            help='Delete synthetic benchmark questions afterwards',
+        )
+
+    def handle(self, *args, **options):
+        if options['seed'] > 0:
+            self._seed(options['seed'], options['batch_size'])
+
+        self.stdout.write(f'Questions in bank: {Question.objects.count()}\n')
+
+        for term in options['terms'] or DEFAULT_TERMS:
+            legacy = self._best_time(lambda: self._run(self._legacy_queryset(term)), options['repeat'])
+            fts = self._best_time(lambda: self._run(self._fts_queryset(term)), options['repeat'])
+            self.stdout.write(
+                f'"{term}": icontains {legacy[0] * 1000:.1f} ms ({legacy[1]} rows) | '
+                f'full-text {fts[0] * 1000:.1f} ms ({fts[1]} rows)'
+            )
+
+        if options['cleanup']:
+            deleted, _ = Question.objects.filter(topic=BENCHMARK_TOPIC).delete()
+            self.stdout.write(self.style.WARNING(f'\nDeleted {deleted} benchmark rows'))
+
+    def _legacy_queryset(self, term):
+        return Question.objects.filter(
+            Q(question_text__icontains=term)
+            | Q(correct_answer__icontains=term)
+            | Q(wrong_answer_1__icontains=term)
+            | Q(wrong_answer_2__icontains=term)
+            | Q(wrong_answer_3__icontains=term)
+            | Q(explanation__icontains=term)
+        ).order_by('-created_at')
+
+    def _fts_queryset(self, term):
+        return search_questions(Question.objects.all(), term).order_by('-_search_rank', '-created_at')
+
+    def _run(self, queryset):
+        total = queryset.count()
+        list(queryset.values_list('id', flat=True)[:20])
+        return total
+
+    def _best_time(self, func, repeat):
+        best = None
+        total = 0
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            total = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, total
+
+    def _seed(self, count, batch_size):
+        rng = random.Random(42)
+        self.stdout.write(f'Seeding {count} synthetic questions...')
+        started = time.perf_counter()
+        created = 0
+        while created < count:
+            size = min(batch_size, count - created)
+            Question.objects.bulk_create(
+                [self._synthetic_question(rng) for _ in range(size)],
+                batch_size=batch_size,
+            )
+            created += size
+        self.stdout.write(self.style.SUCCESS(f'Seeded {created} rows in {time.perf_counter() - started:.1f}s\n'))
+
+    def _synthetic_question(self, rng):
+        def sentence(length):
+            return ' '.join(rng.choice(WORDS) for _ in range(length))
+
+        return Question(
+            topic=BENCHMARK_TOPIC,
+            question_text=f'{sentence(8).capitalize()}?',
+            correct_answer=sentence(2),
+            wrong_answer_1=sentence(2),
+            wrong_answer_2=sentence(2),
+            wrong_answer_3=sentence(2),
+            explanation=sentence(25),
+            total_answers=rng.randint(1, 50),
+        )
@@ -0,0 +1,87 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz_app.models import Answer, Question, QuizSession
+from quiz_app.serializers import AnswerDetailSerializer, QuizSessionSerializer
+from quiz_app.serializers.question_serializer import AdminQuestionSerializer
+from quiz_app.serializers.row_serializers import (
+    admin_question_rows,
+    answer_detail_rows,
+    serialize_admin_question_rows,
+    serialize_answer_detail_rows,
+    serialize_session_rows,
+    session_rows,
+)
+
+
+class Command(BaseCommand):
+    help = 'Compares DRF serializers with the .values() row serializers per 1000 rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=1000,
+            help='Rows to serialize per run (default: 1000)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Runs per serializer, the best time is reported (default: 5)',
+        )
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        repeat = options['repeat']
+        cases = [
+            (
+                'QuizSessionSerializer',
+                QuizSession.objects.select_related('user').order_by('-id')[:rows],
+                lambda qs: QuizSessionSerializer(qs, many=True).data,
+                QuizSession.objects.order_by('-id')[:rows],
+                lambda qs: serialize_session_rows(session_rows(qs)),
+            ),
+            (
+                'AnswerDetailSerializer',
+                Answer.objects.select_related('question').order_by('-id')[:rows],
+                lambda qs: AnswerDetailSerializer(qs, many=True).data,
+                Answer.objects.order_by('-id')[:rows],
+                lambda qs: serialize_answer_detail_rows(answer_detail_rows(qs)),
+            ),
+            (
+                'AdminQuestionSerializer',
+                Question.objects.select_related('created_by').order_by('-id')[:rows],
+                lambda qs: AdminQuestionSerializer(qs, many=True).data,
+                Question.objects.order_by('-id')[:rows],
+                lambda qs: serialize_admin_question_rows(admin_question_rows(qs)),
+            ),
+        ]
+
+        for name, drf_qs, drf_func, fast_qs, fast_func in cases:
+            drf_time, drf_data = self._best_time(lambda: drf_func(drf_qs.all()), repeat)
+            fast_time, fast_data = self._best_time(lambda: fast_func(fast_qs.all()), repeat)
+            if not drf_data:
+                self.stdout.write(f'{name}: no rows, skipped')
+                continue
+            if list(drf_data) != fast_data:
+                raise CommandError(f'{name}: row serializer output differs from DRF output')
+
+            per_thousand = 1000 / len(drf_data)
+            self.stdout.write(
+                f'{name} ({len(drf_data)} rows): '
+                f'DRF {drf_time * per_thousand * 1000:.1f} ms/1000 | '
+                f'rows {fast_time * per_thousand * 1000:.1f} ms/1000 | '
+                f'x{drf_time / fast_time:.1f}'
+            )
+
+    def _best_time(self, func, repeat):
+        best = None
+        result = None
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
@@ -2,11 +2,11 @@ import logging
 from datetime import timedelta
 
 from django.core.management.base import BaseCommand
-from django.db import DatabaseError, transaction
+from django.db import DatabaseError
 from django.utils import timezone
 
-from quiz_app.models import Answer, QuizSession, QuizSessionQuestion
-from quiz_app.services.cleanup_service import cleanup_orphaned_questions
+from quiz_app.services.cleanup_service import abandoned_sessions, rollback_abandoned_chunk
+from quiz_app.utils.constants import CLEANUP_SESSION_AGE_MINUTES, CLEANUP_SESSION_BATCH_SIZE
 
 logger = logging.getLogger(__name__)
 
@@ -18,72 +18,52 @@ class Command(BaseCommand):
         parser.add_argument(
             "--age-minutes",
             type=int,
-            default=60,
+            default=CLEANUP_SESSION_AGE_MINUTES,
             help="Minimum age (minutes) of an unfinished session to delete",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=CLEANUP_SESSION_BATCH_SIZE,
+            help="Sessions rolled back per transaction",
+        )
 
     def handle(self, *args, **options):
-        age_minutes = options.get("age_minutes", 60)
+        age_minutes = options.get("age_minutes", CLEANUP_SESSION_AGE_MINUTES)
+        batch_size = max(1, options.get("batch_size") or CLEANUP_SESSION_BATCH_SIZE)
         cutoff = timezone.now() - timedelta(minutes=age_minutes)
 
-        stale_sessions = QuizSession.objects.filter(is_completed=False, started_at__lt=cutoff)
+        stale_count = abandoned_sessions(cutoff).count()
 
-        if not stale_sessions.exists():
+        if not stale_count:
             self.stdout.write(self.style.SUCCESS("No abandoned sessions to clean."))
             return
 
-        self.stdout.write(
-            f"Cleaning {stale_sessions.count()} abandoned sessions (> {age_minutes} min)"
-        )
+        self.stdout.write(f"Cleaning {stale_count} abandoned sessions (> {age_minutes} min)")
 
-        for session in stale_sessions:
+        totals = {"sessions": 0, "answers": 0, "questions": 0, "orphans": 0}
+        after_id = 0
+        while True:
             try:
-                with transaction.atomic():
-                    self._rollback_session(session)
-                self.stdout.write(self.style.SUCCESS(f"Deleted session {session.id}"))
+                session_ids, result = rollback_abandoned_chunk(batch_size, after_id, cutoff)
             except DatabaseError as e:
-                logger.error(f"Cleanup failed for session {session.id}: {e}")
-                self.stderr.write(self.style.ERROR(f"Error for session {session.id}: {e}"))
-
-    def _rollback_session(self, session):
-        answers = self._collect_answers(session)
-        total_answers_delta, total_correct_delta = self._rollback_answers(answers)
-        session_question_ids = self._delete_session_questions(session)
-        self._delete_orphaned_questions(session_question_ids)
-        self._update_profile(session, total_answers_delta, total_correct_delta)
-        session.delete()
-
-    def _collect_answers(self, session):
-        return list(Answer.objects.filter(session=session).select_related("question"))
+                logger.error(f"Cleanup batch failed: {e}")
+                self.stderr.write(self.style.ERROR(f"Error while cleaning batch: {e}"))
+                break
+
+            for key, value in result.items():
+                totals[key] += value
+            if result["sessions"]:
+                self.stdout.write(
+                    f"Batch: {result['sessions']} sessions, {result['answers']} answers rolled back"
+                )
+            if len(session_ids) < batch_size:
+                break
+            after_id = session_ids[-1]
 
-    def _rollback_answers(self, answers):
-        total_answers_delta = len(answers)
-        total_correct_delta = sum(1 for ans in answers if ans.is_correct)
-
-        for ans in answers:
-            q = ans.question
-            if q.total_answers > 0:
-                q.total_answers = max(0, q.total_answers - 1)
-            if ans.is_correct and q.correct_answers_count > 0:
-                q.correct_answers_count = max(0, q.correct_answers_count - 1)
-            q.times_used = q.total_answers
-            q.save(update_fields=["total_answers", "correct_answers_count", "times_used"])
-
-        Answer.objects.filter(id__in=[a.id for a in answers]).delete()
-        return total_answers_delta, total_correct_delta
-
-    def _delete_session_questions(self, session):
-        session_question_ids = list(
-            QuizSessionQuestion.objects.filter(session=session).values_list("question_id", flat=True)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {totals['sessions']} sessions, rolled back {totals['answers']} answers "
+                f"on {totals['questions']} question rows, removed {totals['orphans']} orphaned questions"
+            )
         )
-        QuizSessionQuestion.objects.filter(session=session).delete()
-        return session_question_ids
-
-    def _delete_orphaned_questions(self, session_question_ids):
-        cleanup_orphaned_questions(session_question_ids, reason="cleanup_job")
-
-    def _update_profile(self, session, total_answers_delta, total_correct_delta):
-        profile = session.user.profile
-        profile.total_questions_answered = max(0, profile.total_questions_answered - total_answers_delta)
-        profile.total_correct_answers = max(0, profile.total_correct_answers - total_correct_delta)
-        profile.save(update_fields=["total_questions_answered", "total_correct_answers"])
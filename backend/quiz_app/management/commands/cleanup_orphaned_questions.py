@@ -1,8 +1,9 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
-from quiz_app.models import Question, QuizSessionQuestion
-from quiz_app.services.cleanup_service import cleanup_orphaned_questions
+from quiz_app.models import Question
+from quiz_app.services.cleanup_service import delete_orphaned_questions, orphaned_questions
+from quiz_app.utils.constants import CLEANUP_DELETE_BATCH_SIZE
 
 
 class Command(BaseCommand):
@@ -20,6 +21,12 @@ class Command(BaseCommand):
             default=24,
             help='Delete only questions older than X hours (default: 24)',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=CLEANUP_DELETE_BATCH_SIZE,
+            help=f'Questions deleted per statement (default: {CLEANUP_DELETE_BATCH_SIZE})',
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
@@ -35,6 +42,7 @@ class Command(BaseCommand):
             total_answers=0,
             created_at__lt=cutoff_time
         )
+        to_delete = orphaned_questions(created_before=cutoff_time)
 
         total_candidates = orphaned_candidates.count()
         self.stdout.write(f'Found {total_candidates} deletion candidates\n')
@@ -43,46 +51,38 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS('Database is clean. No orphaned questions.\n'))
             return
 
-        to_delete = []
-        to_keep = []
-
-        for question in orphaned_candidates:
-            used_in_active = QuizSessionQuestion.objects.filter(
-                question=question,
-                session__is_completed=False
-            ).exists()
-            if used_in_active:
-                to_keep.append(question)
-            else:
-                to_delete.append(question)
+        delete_count = to_delete.count()
 
         self.stdout.write('\nSUMMARY:')
-        self.stdout.write(f'  - To delete: {len(to_delete)} questions')
-        self.stdout.write(f'  - To keep (active sessions): {len(to_keep)} questions\n')
+        self.stdout.write(f'  - To delete: {delete_count} questions')
+        self.stdout.write(f'  - To keep (active sessions): {total_candidates - delete_count} questions\n')
 
-        if len(to_delete) == 0:
+        if delete_count == 0:
             self.stdout.write(self.style.SUCCESS('No questions to delete.\n'))
             return
 
-        if to_delete:
-            self.stdout.write('\nQUESTIONS TO DELETE:')
-            for i, q in enumerate(to_delete[:10], 1):
-                age_days = (timezone.now() - q.created_at).days
-                self.stdout.write(
-                    f'  {i}. ID={q.id} | {q.topic} | {q.difficulty_level} | '
-                    f'Age: {age_days}d | "{q.question_text[:50]}..."'
-                )
-            if len(to_delete) > 10:
-                self.stdout.write(f'  ... and {len(to_delete) - 10} more')
+        self.stdout.write('\nQUESTIONS TO DELETE:')
+        preview = to_delete.order_by('id').only(
+            'id', 'topic', 'difficulty_level', 'created_at', 'question_text'
+        )[:10]
+        for i, q in enumerate(preview, 1):
+            age_days = (timezone.now() - q.created_at).days
+            self.stdout.write(
+                f'  {i}. ID={q.id} | {q.topic} | {q.difficulty_level} | '
+                f'Age: {age_days}d | "{q.question_text[:50]}..."'
+            )
+        if delete_count > 10:
+            self.stdout.write(f'  ... and {delete_count - 10} more')
 
         if dry_run:
             self.stdout.write(self.style.WARNING('\nDRY RUN - nothing was deleted'))
-            self.stdout.write(f'Run without --dry-run to delete {len(to_delete)} questions\n')
+            self.stdout.write(f'Run without --dry-run to delete {delete_count} questions\n')
         else:
-            self.stdout.write(self.style.WARNING(f'\nDeleting {len(to_delete)} questions...'))
+            self.stdout.write(self.style.WARNING(f'\nDeleting {delete_count} questions...'))
 
-            deleted_count = cleanup_orphaned_questions(
-                [q.id for q in to_delete],
+            deleted_count = delete_orphaned_questions(
+                created_before=cutoff_time,
+                batch_size=options['batch_size'],
                 reason="manual_cleanup",
             )
 
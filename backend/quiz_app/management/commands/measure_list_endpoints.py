@@ -0,0 +1,79 @@
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+API_ENDPOINTS = [
+    ('library', '/api/quiz/questions/', {'page_size': 20}),
+    ('admin list_questions', '/api/quiz/admin/questions/', {'page_size': 20}),
+    ('history', '/api/quiz/history/', {'page_size': 10}),
+]
+
+DJANGO_ADMIN_ENDPOINTS = [
+    ('django admin questions', '/admin/quiz_app/question/', {}),
+]
+
+
+class Command(BaseCommand):
+    help = 'Measures per-request Python memory and DB bytes transferred on the main list endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--email',
+            required=True,
+            help='Admin user to request the endpoints as (needs is_staff for Django admin)',
+        )
+        parser.add_argument(
+            '--host',
+            default='localhost',
+            help='Host header sent with requests (must be in ALLOWED_HOSTS, default: localhost)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options['email'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['email']} not found")
+
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        admin_client = Client()
+        admin_client.force_login(user)
+
+        rows = [(name, api_client, url, params) for name, url, params in API_ENDPOINTS]
+        if user.is_staff:
+            rows += [(name, admin_client, url, params) for name, url, params in DJANGO_ADMIN_ENDPOINTS]
+
+        for name, client, url, params in rows:
+            client.get(url, params, HTTP_HOST=options['host'])
+            status_code, peak, db_bytes, body_bytes, queries = self._measure(client, url, params, options['host'])
+            self.stdout.write(
+                f'{name} [{status_code}]: peak memory {peak / 1024:.0f} KiB | '
+                f'DB rows {db_bytes / 1024:.0f} KiB in {queries} queries | body {body_bytes / 1024:.0f} KiB'
+            )
+
+    def _measure(self, client, url, params, host):
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as ctx:
+                response = client.get(url, params, HTTP_HOST=host)
+            _current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        selects = [q['sql'] for q in ctx.captured_queries if q['sql'].lstrip().upper().startswith('SELECT')]
+        db_bytes = sum(self._result_bytes(sql) for sql in selects)
+        return response.status_code, peak, db_bytes, len(response.content), len(selects)
+
+    def _result_bytes(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COALESCE(SUM(pg_column_size(t.*)), 0) FROM ({sql}) t'
+            )
+            return cursor.fetchone()[0]
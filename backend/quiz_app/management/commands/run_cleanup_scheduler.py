@@ -0,0 +1,93 @@
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz_app.services.cleanup_scheduler import CLEANUP_TASKS, CleanupScheduler, cleanup_metrics
+from quiz_app.utils.constants import (
+    CLEANUP_SCHEDULER_CHUNK_SIZE,
+    CLEANUP_SCHEDULER_IDLE_SECONDS,
+    CLEANUP_SCHEDULER_MAX_LOCK_MS,
+    CLEANUP_SCHEDULER_ROWS_PER_SECOND,
+)
+
+
+class Command(BaseCommand):
+    help = "Runs abandoned-session and orphaned-question cleanup continuously in paced chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--task",
+            action="append",
+            choices=sorted(CLEANUP_TASKS),
+            help="Cleanup task to run (repeatable, default: all)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CLEANUP_SCHEDULER_CHUNK_SIZE,
+            help=f"Maximum rows per chunk/transaction (default: {CLEANUP_SCHEDULER_CHUNK_SIZE})",
+        )
+        parser.add_argument(
+            "--rows-per-second",
+            type=int,
+            default=CLEANUP_SCHEDULER_ROWS_PER_SECOND,
+            help=f"Pacing per task, 0 disables (default: {CLEANUP_SCHEDULER_ROWS_PER_SECOND})",
+        )
+        parser.add_argument(
+            "--max-lock-ms",
+            type=int,
+            default=CLEANUP_SCHEDULER_MAX_LOCK_MS,
+            help=f"Lock wait limit and chunk duration target (default: {CLEANUP_SCHEDULER_MAX_LOCK_MS})",
+        )
+        parser.add_argument(
+            "--idle-seconds",
+            type=int,
+            default=CLEANUP_SCHEDULER_IDLE_SECONDS,
+            help=f"Sleep when there is nothing to clean (default: {CLEANUP_SCHEDULER_IDLE_SECONDS})",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Stop after every task completed one full pass",
+        )
+        parser.add_argument(
+            "--status",
+            action="store_true",
+            help="Print progress and throughput metrics and exit",
+        )
+
+    def handle(self, *args, **options):
+        if options["status"]:
+            self._print_status()
+            return
+
+        try:
+            scheduler = CleanupScheduler(
+                tasks=options["task"],
+                chunk_size=options["chunk_size"],
+                rows_per_second=options["rows_per_second"],
+                max_lock_ms=options["max_lock_ms"],
+                idle_seconds=options["idle_seconds"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: scheduler.stop())
+
+        self.stdout.write(
+            f"Cleanup scheduler started: {', '.join(scheduler.tasks)} "
+            f"(chunk {scheduler.chunk_size}, {scheduler.rows_per_second} rows/s, "
+            f"max lock {scheduler.max_lock_ms} ms)"
+        )
+        scheduler.run(once=options["once"])
+        self._print_status()
+
+    def _print_status(self):
+        for entry in cleanup_metrics():
+            self.stdout.write(
+                f"{entry['task']}: backlog={entry['backlog']} cursor={entry['cursor']} "
+                f"processed={entry['processed_total']} passes={entry['passes_completed']} "
+                f"throughput={entry['rows_per_second']} rows/s chunk={entry['chunk_size']} "
+                f"last={entry['last_chunk_rows']} rows/{entry['last_chunk_ms']} ms errors={entry['errors']}"
+            )
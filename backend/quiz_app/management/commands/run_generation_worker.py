@@ -0,0 +1,67 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from quiz_app.services.generation_queue import generation_queue_stats, requeue_stale_generation_jobs
+from quiz_app.services.generation_worker import GenerationWorkerPool
+from quiz_app.utils.constants import GENERATION_JOB_POLL_SECONDS, GENERATION_WORKERS
+
+
+class Command(BaseCommand):
+    help = "Runs the bounded worker pool that executes queued question generation jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=GENERATION_WORKERS,
+            help=f"Concurrent generation workers (default: {GENERATION_WORKERS})",
+        )
+        parser.add_argument(
+            "--poll-seconds",
+            type=float,
+            default=GENERATION_JOB_POLL_SECONDS,
+            help=f"Idle polling interval (default: {GENERATION_JOB_POLL_SECONDS})",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run the jobs that are due now in this process and exit",
+        )
+        parser.add_argument(
+            "--status",
+            action="store_true",
+            help="Print queue depth and job latency and exit",
+        )
+
+    def handle(self, *args, **options):
+        if options["status"]:
+            self._print_status()
+            return
+
+        pool = GenerationWorkerPool(workers=options["workers"], poll_seconds=options["poll_seconds"])
+
+        if options["once"]:
+            requeue_stale_generation_jobs()
+            processed = pool.run_pending()
+            self.stdout.write(self.style.SUCCESS(f"Processed {processed} generation jobs"))
+            self._print_status()
+            return
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: pool.stop())
+
+        self.stdout.write(f"Generation worker pool started: {pool.workers} workers ({pool.name})")
+        pool.run_forever()
+        self._print_status()
+
+    def _print_status(self):
+        stats = generation_queue_stats()
+        self.stdout.write(
+            f"depth={stats['depth']}/{stats['max_depth']} running={stats['running']} "
+            f"oldest={stats['oldest_queued_seconds']}s by_kind={stats['queued_by_kind']}"
+        )
+        self.stdout.write(
+            f"last {stats['window_minutes']} min: completed={stats['completed']} failed={stats['failed']} "
+            f"wait_ms={stats['wait_ms']} run_ms={stats['run_ms']}"
+        )
@@ -1,6 +1,38 @@
+from decimal import Decimal
+
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+import django.contrib.postgres.search
 from django.db import migrations, models
 import django.db.models.deletion
+import django.utils.timezone
+
+QUESTION_SEARCH_CONFIG_SQL = """
+CREATE TEXT SEARCH CONFIGURATION quiz_polish (COPY = simple);
+ALTER TEXT SEARCH CONFIGURATION quiz_polish
+    ALTER MAPPING FOR asciiword, asciihword, hword_asciipart, word, hword, hword_part
+    WITH unaccent, simple;
+"""
+
+QUESTION_SEARCH_TRIGGER_SQL = """
+CREATE FUNCTION quiz_app_question_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('quiz_polish', coalesce(NEW.question_text, '')), 'A') ||
+        setweight(to_tsvector('quiz_polish', concat_ws(' ', NEW.correct_answer, NEW.wrong_answer_1,
+                                                      NEW.wrong_answer_2, NEW.wrong_answer_3)), 'B') ||
+        setweight(to_tsvector('quiz_polish', coalesce(NEW.explanation, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER quiz_app_question_search_vector
+    BEFORE INSERT OR UPDATE OF question_text, correct_answer, wrong_answer_1, wrong_answer_2,
+        wrong_answer_3, explanation, search_vector
+    ON quiz_app_question
+    FOR EACH ROW EXECUTE FUNCTION quiz_app_question_search_vector_update();
+"""
 
 
 class Migration(migrations.Migration):
@@ -11,6 +43,26 @@ class Migration(migrations.Migration):
     ]
 
     operations = [
+        TrigramExtension(),
+        UnaccentExtension(),
+        migrations.RunSQL(
+            QUESTION_SEARCH_CONFIG_SQL,
+            reverse_sql="DROP TEXT SEARCH CONFIGURATION IF EXISTS quiz_polish;",
+        ),
+        migrations.CreateModel(
+            name='Topic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('normalized_name', models.CharField(max_length=200, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Topic',
+                'verbose_name_plural': 'Topics',
+                'ordering': ['name'],
+            },
+        ),
         migrations.CreateModel(
             name='QuizSession',
             fields=[
@@ -31,7 +83,13 @@ class Migration(migrations.Migration):
                 ('questions_count', models.IntegerField(default=10)),
                 ('time_per_question', models.IntegerField(default=30)),
                 ('use_adaptive_difficulty', models.BooleanField(default=True)),
+                ('is_custom', models.BooleanField(default=False)),
                 ('questions_generated_count', models.IntegerField(default=0)),
+                ('answers_count', models.IntegerField(default=0)),
+                ('total_response_time', models.FloatField(default=0.0)),
+                ('canonical_topic', models.ForeignKey(blank=True, null=True,
+                                                      on_delete=django.db.models.deletion.SET_NULL,
+                                                      related_name='sessions', to='quiz_app.topic')),
                 ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_sessions',
                                            to=settings.AUTH_USER_MODEL)),
             ],
@@ -68,7 +126,14 @@ class Migration(migrations.Migration):
                 ('total_answers', models.IntegerField(default=0)),
                 ('correct_answers_count', models.IntegerField(default=0)),
                 ('times_used', models.IntegerField(default=0)),
+                ('success_rate', models.FloatField(default=0.0)),
+                ('difficulty_rank', models.PositiveSmallIntegerField(default=2)),
                 ('content_hash', models.CharField(blank=True, db_index=True, max_length=64, null=True)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(blank=True, editable=False,
+                                                                                   null=True)),
+                ('canonical_topic', models.ForeignKey(blank=True, null=True,
+                                                      on_delete=django.db.models.deletion.SET_NULL,
+                                                      related_name='questions', to='quiz_app.topic')),
                 ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL,
                                                  related_name='created_questions', to=settings.AUTH_USER_MODEL)),
                 ('session', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE,
@@ -78,6 +143,7 @@ class Migration(migrations.Migration):
                 'verbose_name': 'Question',
                 'verbose_name_plural': 'Questions',
                 'ordering': ['-created_at'],
+                'base_manager_name': 'objects',
             },
         ),
         migrations.CreateModel(
@@ -122,6 +188,156 @@ class Migration(migrations.Migration):
                 'unique_together': {('session', 'question')},
             },
         ),
+        migrations.CreateModel(
+            name='QuizSessionSnapshot',
+            fields=[
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True,
+                                                 related_name='snapshot', serialize=False,
+                                                 to='quiz_app.quizsession')),
+                ('payload', models.JSONField()),
+                ('etag', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Quiz Session Snapshot',
+                'verbose_name_plural': 'Quiz Session Snapshots',
+            },
+        ),
+        migrations.CreateModel(
+            name='CleanupCursor',
+            fields=[
+                ('task', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('chunk_size', models.PositiveIntegerField(default=0)),
+                ('processed_total', models.BigIntegerField(default=0)),
+                ('pass_processed', models.BigIntegerField(default=0)),
+                ('passes_completed', models.PositiveIntegerField(default=0)),
+                ('last_chunk_rows', models.PositiveIntegerField(default=0)),
+                ('last_chunk_ms', models.FloatField(default=0.0)),
+                ('rows_per_second', models.FloatField(default=0.0)),
+                ('errors', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('pass_started_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Cleanup Cursor',
+                'verbose_name_plural': 'Cleanup Cursors',
+            },
+        ),
+        migrations.CreateModel(
+            name='GenerationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('session_start', 'Pytania startowe sesji'),
+                                                   ('shortfall', 'Brak pytania w trakcie quizu'),
+                                                   ('fill_session', 'Dogenerowanie pytań sesji'),
+                                                   ('level_change', 'Pytania po zmianie poziomu'),
+                                                   ('pregenerate_level', 'Pregeneracja kolejnego poziomu')],
+                                          max_length=30)),
+                ('priority', models.PositiveSmallIntegerField(default=4)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('queued', 'W kolejce'), ('running', 'W trakcie'),
+                                                     ('done', 'Zakończone'), ('failed', 'Nieudane')],
+                                            default='queued', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('worker', models.CharField(blank=True, default='', max_length=100)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE,
+                                              related_name='generation_jobs', to='quiz_app.quizsession')),
+            ],
+            options={
+                'verbose_name': 'Generation Job',
+                'verbose_name_plural': 'Generation Jobs',
+            },
+        ),
+        migrations.CreateModel(
+            name='GenerationCall',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('kind', models.CharField(choices=[('generation', 'Wywołanie generowania'),
+                                                   ('level_cleanup', 'Usunięcie pytań po zmianie poziomu')],
+                                          default='generation', max_length=20)),
+                ('topic', models.CharField(max_length=200)),
+                ('difficulty_level', models.CharField(blank=True, default='', max_length=20)),
+                ('knowledge_level', models.CharField(blank=True, default='', max_length=20)),
+                ('model', models.CharField(blank=True, default='', max_length=100)),
+                ('bank_fallback', models.BooleanField(default=False)),
+                ('requests', models.PositiveIntegerField(default=0)),
+                ('latency_ms', models.PositiveIntegerField(default=0)),
+                ('prompt_tokens', models.PositiveIntegerField(default=0)),
+                ('cached_tokens', models.PositiveIntegerField(default=0)),
+                ('completion_tokens', models.PositiveIntegerField(default=0)),
+                ('requested', models.PositiveIntegerField(default=0)),
+                ('returned', models.PositiveIntegerField(default=0)),
+                ('valid', models.PositiveIntegerField(default=0)),
+                ('added', models.PositiveIntegerField(default=0)),
+                ('deduplicated', models.PositiveIntegerField(default=0)),
+                ('rejected_validation', models.PositiveIntegerField(default=0)),
+                ('rejected_unparseable', models.PositiveIntegerField(default=0)),
+                ('rejected_session_duplicate', models.PositiveIntegerField(default=0)),
+                ('rejected_session_similar', models.PositiveIntegerField(default=0)),
+                ('rejected_error', models.PositiveIntegerField(default=0)),
+                ('rejected_level_cleanup', models.PositiveIntegerField(default=0)),
+                ('unused', models.PositiveIntegerField(default=0)),
+                ('cost_usd', models.DecimalField(decimal_places=6, default=Decimal('0'), max_digits=12)),
+                ('session', models.ForeignKey(blank=True, db_constraint=False, null=True,
+                                              on_delete=django.db.models.deletion.DO_NOTHING,
+                                              related_name='+', to='quiz_app.quizsession')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL,
+                                           related_name='generation_calls', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Generation Call',
+                'verbose_name_plural': 'Generation Calls',
+            },
+        ),
+        migrations.CreateModel(
+            name='GenerationUsageDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('topic', models.CharField(max_length=200)),
+                ('difficulty_level', models.CharField(blank=True, default='', max_length=20)),
+                ('knowledge_level', models.CharField(blank=True, default='', max_length=20)),
+                ('model', models.CharField(blank=True, default='', max_length=100)),
+                ('calls', models.PositiveIntegerField(default=0)),
+                ('requests', models.PositiveIntegerField(default=0)),
+                ('latency_ms', models.BigIntegerField(default=0)),
+                ('prompt_tokens', models.BigIntegerField(default=0)),
+                ('cached_tokens', models.BigIntegerField(default=0)),
+                ('completion_tokens', models.BigIntegerField(default=0)),
+                ('requested', models.PositiveIntegerField(default=0)),
+                ('returned', models.PositiveIntegerField(default=0)),
+                ('valid', models.PositiveIntegerField(default=0)),
+                ('added', models.PositiveIntegerField(default=0)),
+                ('deduplicated', models.PositiveIntegerField(default=0)),
+                ('rejected_validation', models.PositiveIntegerField(default=0)),
+                ('rejected_unparseable', models.PositiveIntegerField(default=0)),
+                ('rejected_session_duplicate', models.PositiveIntegerField(default=0)),
+                ('rejected_session_similar', models.PositiveIntegerField(default=0)),
+                ('rejected_error', models.PositiveIntegerField(default=0)),
+                ('rejected_level_cleanup', models.PositiveIntegerField(default=0)),
+                ('unused', models.PositiveIntegerField(default=0)),
+                ('cost_usd', models.DecimalField(decimal_places=6, default=Decimal('0'), max_digits=14)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL,
+                                           related_name='generation_usage', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Generation Usage (daily)',
+                'verbose_name_plural': 'Generation Usage (daily)',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='topic',
+            index=GinIndex(fields=['normalized_name'], name='quiz_topic_norm_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
         migrations.AddIndex(
             model_name='quizsession',
             index=models.Index(fields=['-started_at'], name='quiz_app_qu_started_2be838_idx'),
@@ -130,6 +346,20 @@ class Migration(migrations.Migration):
             model_name='quizsession',
             index=models.Index(fields=['user', 'is_completed'], name='quiz_app_qu_user_id_67c182_idx'),
         ),
+        migrations.AddIndex(
+            model_name='quizsession',
+            index=models.Index(fields=['canonical_topic', 'is_completed'], name='quiz_app_qu_canonic_730ef3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizsession',
+            index=models.Index(condition=models.Q(('is_completed', True)), fields=['user', '-started_at', '-id'],
+                               name='quiz_session_history_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizsession',
+            index=models.Index(condition=models.Q(('is_completed', True)),
+                               fields=['user', 'is_custom', '-started_at', '-id'], name='quiz_session_custom_idx'),
+        ),
         migrations.AddIndex(
             model_name='question',
             index=models.Index(fields=['topic', 'difficulty_level'], name='quiz_app_qu_topic_b5f1a8_idx'),
@@ -146,6 +376,36 @@ class Migration(migrations.Migration):
             model_name='question',
             index=models.Index(fields=['session', 'created_at'], name='quiz_app_qu_session_45d5ed_idx'),
         ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['canonical_topic', 'difficulty_level'], name='quiz_app_qu_canonic_bb5c58_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=GinIndex(fields=['search_vector'], name='quiz_question_search_gin_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(condition=models.Q(('total_answers__gt', 0)), fields=['-created_at', '-id'],
+                               name='quiz_q_library_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(condition=models.Q(('total_answers__gt', 0)), fields=['success_rate', 'id'],
+                               name='quiz_q_library_success_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(condition=models.Q(('total_answers__gt', 0)), fields=['difficulty_rank', 'success_rate'],
+                               name='quiz_q_library_diff_idx'),
+        ),
+        migrations.RunSQL(
+            QUESTION_SEARCH_TRIGGER_SQL,
+            reverse_sql="""
+            DROP TRIGGER IF EXISTS quiz_app_question_search_vector ON quiz_app_question;
+            DROP FUNCTION IF EXISTS quiz_app_question_search_vector_update();
+            """,
+        ),
         migrations.AddIndex(
             model_name='answer',
             index=models.Index(fields=['question', 'user'], name='quiz_app_an_questio_99a372_idx'),
@@ -158,9 +418,37 @@ class Migration(migrations.Migration):
             model_name='answer',
             index=models.Index(fields=['-answered_at'], name='quiz_app_an_answere_1b0db3_idx'),
         ),
+        migrations.AddIndex(
+            model_name='generationjob',
+            index=models.Index(condition=models.Q(('status', 'queued')), fields=['priority', 'run_after', 'id'],
+                               name='quiz_genjob_queued_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generationjob',
+            index=models.Index(fields=['status', 'finished_at'], name='quiz_genjob_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generationcall',
+            index=models.Index(fields=['created_at'], name='quiz_gencall_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generationusagedaily',
+            index=models.Index(fields=['day', 'topic'], name='quiz_genusage_topic_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generationusagedaily',
+            index=models.Index(fields=['user', 'day'], name='quiz_genusage_user_idx'),
+        ),
         migrations.AddConstraint(
             model_name='answer',
             constraint=models.UniqueConstraint(fields=('question', 'user', 'session'),
                                                name='unique_answer_per_question_session'),
         ),
+        migrations.AddConstraint(
+            model_name='generationusagedaily',
+            constraint=models.UniqueConstraint(
+                fields=('day', 'topic', 'difficulty_level', 'knowledge_level', 'model', 'user'),
+                name='unique_generation_usage_day',
+            ),
+        ),
     ]
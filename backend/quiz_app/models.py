@@ -1,10 +1,79 @@
 import hashlib
+from decimal import ROUND_HALF_UP, Decimal
 
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import F, Q
+from django.db.models.functions import Round
+from django.utils import timezone
 
 
-class QuizSession(models.Model):
+class Topic(models.Model):
+    name = models.CharField(max_length=200)
+    normalized_name = models.CharField(max_length=200, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Topic'
+        verbose_name_plural = 'Topics'
+        indexes = [
+            GinIndex(
+                fields=['normalized_name'],
+                name='quiz_topic_norm_trgm_idx',
+                opclasses=['gin_trgm_ops'],
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    @staticmethod
+    def normalize_name(name):
+        from .utils.deduplicator import UniversalDeduplicator
+        return UniversalDeduplicator().normalize_text((name or '').casefold())
+
+    @classmethod
+    def resolve(cls, name):
+        normalized_name = cls.normalize_name(name)
+        if not normalized_name:
+            return None
+        topic, _created = cls.objects.get_or_create(
+            normalized_name=normalized_name,
+            defaults={'name': ' '.join(name.split())},
+        )
+        return topic
+
+
+def _assign_canonical_topic(instance, kwargs):
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and 'topic' not in update_fields:
+        return
+    if 'topic' not in instance.__dict__ or not instance.topic:
+        return
+    unchanged = instance.topic == getattr(instance, '_loaded_topic', None)
+    if instance.canonical_topic_id is not None and update_fields is None and unchanged:
+        return
+    instance.canonical_topic = Topic.resolve(instance.topic)
+    instance._loaded_topic = instance.topic
+    if update_fields is not None:
+        kwargs['update_fields'] = {*update_fields, 'canonical_topic'}
+
+
+class CanonicalTopicMixin:
+    # Remembers the topic as loaded, so save() re-resolves canonical_topic only
+    # when the free-text topic was changed in memory.
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_topic = instance.__dict__.get('topic')
+        return instance
+
+
+class QuizSession(CanonicalTopicMixin, models.Model):
     KNOWLEDGE_LEVEL_CHOICES = [
         ('elementary', 'Szkoła podstawowa'),
         ('high_school', 'Liceum'),
@@ -12,8 +81,17 @@ class QuizSession(models.Model):
         ('expert', 'Ekspert'),
     ]
 
+    CUSTOM_SETTING_FIELDS = ('questions_count', 'time_per_question', 'use_adaptive_difficulty')
+
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='quiz_sessions')
     topic = models.CharField(max_length=200)
+    canonical_topic = models.ForeignKey(
+        Topic,
+        on_delete=models.SET_NULL,
+        related_name='sessions',
+        null=True,
+        blank=True
+    )
     subtopic = models.CharField(max_length=200, blank=True, null=True)
     knowledge_level = models.CharField(max_length=20, choices=KNOWLEDGE_LEVEL_CHOICES, default='high_school')
     initial_difficulty = models.CharField(max_length=20)
@@ -27,7 +105,10 @@ class QuizSession(models.Model):
     questions_count = models.IntegerField(default=10)
     time_per_question = models.IntegerField(default=30)
     use_adaptive_difficulty = models.BooleanField(default=True)
+    is_custom = models.BooleanField(default=False)
     questions_generated_count = models.IntegerField(default=0)
+    answers_count = models.IntegerField(default=0)
+    total_response_time = models.FloatField(default=0.0)
 
     class Meta:
         ordering = ['-started_at']
@@ -36,19 +117,76 @@ class QuizSession(models.Model):
         indexes = [
             models.Index(fields=['-started_at']),
             models.Index(fields=['user', 'is_completed']),
+            models.Index(fields=['canonical_topic', 'is_completed']),
+            models.Index(
+                fields=['user', '-started_at', '-id'],
+                name='quiz_session_history_idx',
+                condition=Q(is_completed=True),
+            ),
+            models.Index(
+                fields=['user', 'is_custom', '-started_at', '-id'],
+                name='quiz_session_custom_idx',
+                condition=Q(is_completed=True),
+            ),
         ]
 
     def __str__(self):
         return f'{self.user.email} - {self.topic}'
 
+    def save(self, *args, **kwargs):
+        _assign_canonical_topic(self, kwargs)
+        self.is_custom = self.compute_is_custom()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(self.CUSTOM_SETTING_FIELDS):
+            kwargs['update_fields'] = {*update_fields, 'is_custom'}
+        super().save(*args, **kwargs)
+
+    def compute_is_custom(self):
+        from .utils.constants import (
+            DEFAULT_QUESTIONS_COUNT,
+            DEFAULT_TIME_PER_QUESTION,
+            DEFAULT_USE_ADAPTIVE_DIFFICULTY,
+        )
+        return (self.questions_count != DEFAULT_QUESTIONS_COUNT or
+                self.time_per_question != DEFAULT_TIME_PER_QUESTION or
+                self.use_adaptive_difficulty != DEFAULT_USE_ADAPTIVE_DIFFICULTY)
+
+    def record_answer(self, response_time):
+        QuizSession.objects.filter(pk=self.pk).update(
+            answers_count=F('answers_count') + 1,
+            total_response_time=F('total_response_time') + float(response_time or 0),
+        )
+        self.refresh_from_db(fields=['answers_count', 'total_response_time'])
+
     @property
     def accuracy(self):
-        if self.total_questions == 0:
+        return self.compute_accuracy(self.correct_answers, self.total_questions)
+
+    @staticmethod
+    def compute_accuracy(correct_answers, total_questions):
+        if total_questions == 0:
             return 0
-        return round((self.correct_answers / self.total_questions) * 100, 2)
+        return round((correct_answers / total_questions) * 100, 2)
+
+
+class QuestionQuerySet(models.QuerySet):
+    # Columns no list or detail view reads: embeddings are only needed by dedup,
+    # the search vector only by the database itself.
+    HEAVY_FIELDS = ('embedding_vector', 'search_vector')
+
+    def with_embeddings(self):
+        return self.defer(None).defer('search_vector')
+
+    def without_explanations(self):
+        return self.defer('explanation')
+
+
+class QuestionManager(models.Manager.from_queryset(QuestionQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset().defer(*QuestionQuerySet.HEAVY_FIELDS)
 
 
-class Question(models.Model):
+class Question(CanonicalTopicMixin, models.Model):
     DIFFICULTY_CHOICES = [
         ('łatwy', 'Łatwy'),
         ('średni', 'Średni'),
@@ -71,6 +209,13 @@ class Question(models.Model):
     )
 
     topic = models.CharField(max_length=200, db_index=True)
+    canonical_topic = models.ForeignKey(
+        Topic,
+        on_delete=models.SET_NULL,
+        related_name='questions',
+        null=True,
+        blank=True
+    )
     subtopic = models.CharField(max_length=200, blank=True, null=True, db_index=True)
     knowledge_level = models.CharField(max_length=20, choices=KNOWLEDGE_LEVEL_CHOICES, blank=True, null=True)
     question_text = models.TextField()
@@ -96,10 +241,19 @@ class Question(models.Model):
     total_answers = models.IntegerField(default=0)
     correct_answers_count = models.IntegerField(default=0)
     times_used = models.IntegerField(default=0)
+    success_rate = models.FloatField(default=0.0)
+    difficulty_rank = models.PositiveSmallIntegerField(default=2)
 
     content_hash = models.CharField(max_length=64, db_index=True, null=True, blank=True)
 
+    # Maintained by the quiz_app_question_search_vector trigger (see 0001_initial).
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+
+    objects = QuestionManager()
+
     class Meta:
+        # Related access and delete cascades go through the base manager too.
+        base_manager_name = 'objects'
         ordering = ['-created_at']
         verbose_name = 'Question'
         verbose_name_plural = 'Questions'
@@ -108,27 +262,61 @@ class Question(models.Model):
             models.Index(fields=['content_hash']),
             models.Index(fields=['-times_used']),
             models.Index(fields=['session', 'created_at']),
+            models.Index(fields=['canonical_topic', 'difficulty_level']),
+            GinIndex(fields=['search_vector'], name='quiz_question_search_gin_idx'),
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='quiz_q_library_created_idx',
+                condition=Q(total_answers__gt=0),
+            ),
+            models.Index(
+                fields=['success_rate', 'id'],
+                name='quiz_q_library_success_idx',
+                condition=Q(total_answers__gt=0),
+            ),
+            models.Index(
+                fields=['difficulty_rank', 'success_rate'],
+                name='quiz_q_library_diff_idx',
+                condition=Q(total_answers__gt=0),
+            ),
         ]
 
     def __str__(self):
         return f'Q{self.id}: {self.question_text[:50]}'
 
-    @property
-    def success_rate(self):
-        if self.total_answers == 0:
-            return 0
-        return round((self.correct_answers_count / self.total_answers) * 100, 1)
-
     @property
     def incorrect_answers_count(self):
         return max(0, self.total_answers - self.correct_answers_count)
 
     def update_stats(self, is_correct):
-        self.total_answers += 1
-        if is_correct:
-            self.correct_answers_count += 1
-        self.times_used = self.total_answers
-        self.save(update_fields=['total_answers', 'correct_answers_count', 'times_used'])
+        correct_increment = 1 if is_correct else 0
+        Question.objects.filter(pk=self.pk).update(
+            total_answers=F('total_answers') + 1,
+            correct_answers_count=F('correct_answers_count') + correct_increment,
+            times_used=F('total_answers') + 1,
+            success_rate=Round(
+                100.0 * (F('correct_answers_count') + correct_increment) / (F('total_answers') + 1),
+                1,
+            ),
+        )
+        self.refresh_from_db(fields=['total_answers', 'correct_answers_count', 'times_used', 'success_rate'])
+
+    @staticmethod
+    def compute_success_rate(correct_answers_count, total_answers):
+        if not total_answers:
+            return 0.0
+        rate = Decimal(correct_answers_count * 100) / Decimal(total_answers)
+        return float(rate.quantize(Decimal('0.1'), rounding=ROUND_HALF_UP))
+
+    @staticmethod
+    def difficulty_rank_for(difficulty_level):
+        from .utils.constants import DIFFICULTY_ALIAS_MAP, DIFFICULTY_RANK_MAP
+        canonical = DIFFICULTY_ALIAS_MAP.get((difficulty_level or '').strip().lower())
+        return DIFFICULTY_RANK_MAP.get(canonical, DIFFICULTY_RANK_MAP['medium'])
+
+    @staticmethod
+    def heavy_related_fields(prefix):
+        return [f'{prefix}__{field}' for field in QuestionQuerySet.HEAVY_FIELDS]
 
     @staticmethod
     def build_content_hash(
@@ -158,6 +346,17 @@ class Question(models.Model):
     def save(self, *args, **kwargs):
         if not self.content_hash:
             self.content_hash = self.compute_content_hash()
+        _assign_canonical_topic(self, kwargs)
+        self.success_rate = self.compute_success_rate(self.correct_answers_count, self.total_answers)
+        self.difficulty_rank = self.difficulty_rank_for(self.difficulty_level)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            derived = set()
+            if {'total_answers', 'correct_answers_count'} & set(update_fields):
+                derived.add('success_rate')
+            if 'difficulty_level' in update_fields:
+                derived.add('difficulty_rank')
+            kwargs['update_fields'] = {*update_fields, *derived}
         super().save(*args, **kwargs)
 
 
@@ -214,3 +413,238 @@ class Answer(models.Model):
 
     def __str__(self):
         return f"{self.user.email} - {'correct' if self.is_correct else 'wrong'}"
+
+
+class QuizSessionSnapshot(models.Model):
+    session = models.OneToOneField(
+        QuizSession,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='snapshot'
+    )
+    payload = models.JSONField()
+    etag = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Quiz Session Snapshot'
+        verbose_name_plural = 'Quiz Session Snapshots'
+
+    def __str__(self):
+        return f"Snapshot of session {self.session_id}"
+
+
+class CleanupCursor(models.Model):
+    task = models.CharField(max_length=50, primary_key=True)
+    last_id = models.BigIntegerField(default=0)
+    chunk_size = models.PositiveIntegerField(default=0)
+    processed_total = models.BigIntegerField(default=0)
+    pass_processed = models.BigIntegerField(default=0)
+    passes_completed = models.PositiveIntegerField(default=0)
+    last_chunk_rows = models.PositiveIntegerField(default=0)
+    last_chunk_ms = models.FloatField(default=0.0)
+    rows_per_second = models.FloatField(default=0.0)
+    errors = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    pass_started_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Cleanup Cursor'
+        verbose_name_plural = 'Cleanup Cursors'
+
+    def __str__(self):
+        return f"{self.task} @ {self.last_id}"
+
+
+class GenerationJob(models.Model):
+    KIND_SESSION_START = 'session_start'
+    KIND_SHORTFALL = 'shortfall'
+    KIND_FILL_SESSION = 'fill_session'
+    KIND_LEVEL_CHANGE = 'level_change'
+    KIND_PREGENERATE_LEVEL = 'pregenerate_level'
+    KIND_CHOICES = [
+        (KIND_SESSION_START, 'Pytania startowe sesji'),
+        (KIND_SHORTFALL, 'Brak pytania w trakcie quizu'),
+        (KIND_FILL_SESSION, 'Dogenerowanie pytań sesji'),
+        (KIND_LEVEL_CHANGE, 'Pytania po zmianie poziomu'),
+        (KIND_PREGENERATE_LEVEL, 'Pregeneracja kolejnego poziomu'),
+    ]
+
+    PRIORITY_SESSION_START = 0
+    PRIORITY_SHORTFALL = 1
+    PRIORITY_LEVEL_CHANGE = 2
+    PRIORITY_PREGENERATE = 3
+    PRIORITY_BACKGROUND_FILL = 4
+    KIND_PRIORITIES = {
+        KIND_SESSION_START: PRIORITY_SESSION_START,
+        KIND_SHORTFALL: PRIORITY_SHORTFALL,
+        KIND_LEVEL_CHANGE: PRIORITY_LEVEL_CHANGE,
+        KIND_PREGENERATE_LEVEL: PRIORITY_PREGENERATE,
+        KIND_FILL_SESSION: PRIORITY_BACKGROUND_FILL,
+    }
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'W kolejce'),
+        (STATUS_RUNNING, 'W trakcie'),
+        (STATUS_DONE, 'Zakończone'),
+        (STATUS_FAILED, 'Nieudane'),
+    ]
+
+    session = models.ForeignKey(QuizSession, on_delete=models.CASCADE, related_name='generation_jobs')
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    priority = models.PositiveSmallIntegerField(default=PRIORITY_BACKGROUND_FILL)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True, default='')
+    last_error = models.TextField(blank=True, default='')
+
+    class Meta:
+        verbose_name = 'Generation Job'
+        verbose_name_plural = 'Generation Jobs'
+        indexes = [
+            models.Index(
+                fields=['priority', 'run_after', 'id'],
+                name='quiz_genjob_queued_idx',
+                condition=Q(status='queued'),
+            ),
+            models.Index(fields=['status', 'finished_at'], name='quiz_genjob_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} for session {self.session_id} ({self.status})"
+
+
+class GenerationCall(models.Model):
+    KIND_GENERATION = 'generation'
+    KIND_LEVEL_CLEANUP = 'level_cleanup'
+    KIND_CHOICES = [
+        (KIND_GENERATION, 'Wywołanie generowania'),
+        (KIND_LEVEL_CLEANUP, 'Usunięcie pytań po zmianie poziomu'),
+    ]
+
+    # Additive counters, summed into GenerationUsageDaily.
+    COUNTER_FIELDS = (
+        'requests',
+        'latency_ms',
+        'prompt_tokens',
+        'cached_tokens',
+        'completion_tokens',
+        'requested',
+        'returned',
+        'valid',
+        'added',
+        'deduplicated',
+        'rejected_validation',
+        'rejected_unparseable',
+        'rejected_session_duplicate',
+        'rejected_session_similar',
+        'rejected_error',
+        'rejected_level_cleanup',
+        'unused',
+    )
+
+    created_at = models.DateTimeField(default=timezone.now)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default=KIND_GENERATION)
+    # No constraint: deleting abandoned sessions must not touch the telemetry log.
+    session = models.ForeignKey(
+        QuizSession, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='generation_calls'
+    )
+    topic = models.CharField(max_length=200)
+    difficulty_level = models.CharField(max_length=20, blank=True, default='')
+    knowledge_level = models.CharField(max_length=20, blank=True, default='')
+    model = models.CharField(max_length=100, blank=True, default='')
+    bank_fallback = models.BooleanField(default=False)
+    requests = models.PositiveIntegerField(default=0)
+    latency_ms = models.PositiveIntegerField(default=0)
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    cached_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+    requested = models.PositiveIntegerField(default=0)
+    returned = models.PositiveIntegerField(default=0)
+    valid = models.PositiveIntegerField(default=0)
+    added = models.PositiveIntegerField(default=0)
+    deduplicated = models.PositiveIntegerField(default=0)
+    rejected_validation = models.PositiveIntegerField(default=0)
+    rejected_unparseable = models.PositiveIntegerField(default=0)
+    rejected_session_duplicate = models.PositiveIntegerField(default=0)
+    rejected_session_similar = models.PositiveIntegerField(default=0)
+    rejected_error = models.PositiveIntegerField(default=0)
+    rejected_level_cleanup = models.PositiveIntegerField(default=0)
+    unused = models.PositiveIntegerField(default=0)
+    cost_usd = models.DecimalField(max_digits=12, decimal_places=6, default=Decimal('0'))
+
+    class Meta:
+        verbose_name = 'Generation Call'
+        verbose_name_plural = 'Generation Calls'
+        indexes = [
+            models.Index(fields=['created_at'], name='quiz_gencall_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Generation calls are append-only")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.kind} {self.topic} ({self.created_at:%Y-%m-%d %H:%M})"
+
+
+class GenerationUsageDaily(models.Model):
+    day = models.DateField()
+    topic = models.CharField(max_length=200)
+    difficulty_level = models.CharField(max_length=20, blank=True, default='')
+    knowledge_level = models.CharField(max_length=20, blank=True, default='')
+    model = models.CharField(max_length=100, blank=True, default='')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='generation_usage'
+    )
+    calls = models.PositiveIntegerField(default=0)
+    requests = models.PositiveIntegerField(default=0)
+    latency_ms = models.BigIntegerField(default=0)
+    prompt_tokens = models.BigIntegerField(default=0)
+    cached_tokens = models.BigIntegerField(default=0)
+    completion_tokens = models.BigIntegerField(default=0)
+    requested = models.PositiveIntegerField(default=0)
+    returned = models.PositiveIntegerField(default=0)
+    valid = models.PositiveIntegerField(default=0)
+    added = models.PositiveIntegerField(default=0)
+    deduplicated = models.PositiveIntegerField(default=0)
+    rejected_validation = models.PositiveIntegerField(default=0)
+    rejected_unparseable = models.PositiveIntegerField(default=0)
+    rejected_session_duplicate = models.PositiveIntegerField(default=0)
+    rejected_session_similar = models.PositiveIntegerField(default=0)
+    rejected_error = models.PositiveIntegerField(default=0)
+    rejected_level_cleanup = models.PositiveIntegerField(default=0)
+    unused = models.PositiveIntegerField(default=0)
+    cost_usd = models.DecimalField(max_digits=14, decimal_places=6, default=Decimal('0'))
+
+    class Meta:
+        verbose_name = 'Generation Usage (daily)'
+        verbose_name_plural = 'Generation Usage (daily)'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'topic', 'difficulty_level', 'knowledge_level', 'model', 'user'],
+                name='unique_generation_usage_day',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'topic'], name='quiz_genusage_topic_idx'),
+            models.Index(fields=['user', 'day'], name='quiz_genusage_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.topic} ({self.calls} calls)"
@@ -91,3 +91,4 @@ class AdminQuestionSerializer(serializers.ModelSerializer):
             'difficulty_level', 'total_answers', 'correct_answers_count',
             'success_rate', 'times_used', 'created_at', 'updated_at', 'edited_at', 'created_by'
         ]
+        read_only_fields = ['success_rate']
@@ -1,30 +1,27 @@
 from rest_framework import serializers
-from django.db.models import Sum
 from ..models import QuizSession
 from ..utils.constants import (
-    DEFAULT_QUESTIONS_COUNT,
-    DEFAULT_TIME_PER_QUESTION,
-    DEFAULT_USE_ADAPTIVE_DIFFICULTY,
     DIFFICULTY_VALUE_MAP,
     DIFFICULTY_ALIAS_MAP,
 )
 
 
+def difficulty_value_for(initial_difficulty):
+    name = (initial_difficulty or '').strip().lower()
+    normalized = DIFFICULTY_ALIAS_MAP.get(name, name)
+    return DIFFICULTY_VALUE_MAP.get(normalized, None)
+
+
 class QuizSessionSerializer(serializers.ModelSerializer):
     accuracy = serializers.ReadOnlyField()
     username = serializers.CharField(source='user.username', read_only=True)
     difficulty = serializers.CharField(source='initial_difficulty', read_only=True)
     score = serializers.IntegerField(source='correct_answers', read_only=True)
     completed_at = serializers.DateTimeField(source='ended_at', read_only=True)
-    is_custom = serializers.SerializerMethodField()
+    is_custom = serializers.BooleanField(read_only=True)
     initial_difficulty_value = serializers.SerializerMethodField()
     total_response_time = serializers.SerializerMethodField()
 
-    def get_is_custom(self, obj):
-        return (obj.questions_count != DEFAULT_QUESTIONS_COUNT or
-                obj.time_per_question != DEFAULT_TIME_PER_QUESTION or
-                obj.use_adaptive_difficulty != DEFAULT_USE_ADAPTIVE_DIFFICULTY)
-
     def get_initial_difficulty_value(self, obj):
         if hasattr(obj, 'initial_difficulty_value') and obj.initial_difficulty_value is not None:
             try:
@@ -32,20 +29,10 @@ class QuizSessionSerializer(serializers.ModelSerializer):
             except (TypeError, ValueError):
                 pass
 
-        name = (obj.initial_difficulty or '').strip().lower()
-        normalized = DIFFICULTY_ALIAS_MAP.get(name, name)
-        return DIFFICULTY_VALUE_MAP.get(normalized, None)
+        return difficulty_value_for(obj.initial_difficulty)
 
     def get_total_response_time(self, obj):
-        annotated = getattr(obj, 'total_response_time', None)
-        if annotated is not None:
-            try:
-                return round(float(annotated), 2)
-            except (TypeError, ValueError):
-                return 0.0
-
-        value = obj.answers.aggregate(total=Sum('response_time')).get('total') or 0.0
-        return round(float(value), 2)
+        return round(float(obj.total_response_time or 0.0), 2)
 
     class Meta:
         model = QuizSession
@@ -55,6 +42,6 @@ class QuizSessionSerializer(serializers.ModelSerializer):
             'initial_difficulty_value',
             'started_at', 'ended_at', 'completed_at', 'is_completed',
             'total_questions', 'correct_answers', 'score',
-            'current_streak', 'accuracy', 'total_response_time', 'questions_count',
+            'current_streak', 'accuracy', 'total_response_time', 'answers_count', 'questions_count',
             'time_per_question', 'use_adaptive_difficulty', 'is_custom'
         ]
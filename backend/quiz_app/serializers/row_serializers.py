@@ -0,0 +1,165 @@
+from rest_framework import serializers
+
+from ..models import QuizSession
+from ..utils.fieldsets import fieldset_columns
+from .quiz_serializer import difficulty_value_for
+
+# Read-only fast paths: project rows with .values() and build the same dicts the
+# DRF serializers return, without per-row field binding and attribute traversal.
+_datetime_field = serializers.DateTimeField()
+
+
+def _datetime(value):
+    return None if value is None else _datetime_field.to_representation(value)
+
+
+def _str(value):
+    return None if value is None else str(value)
+
+
+def _int(value):
+    return None if value is None else int(value)
+
+
+def _float(value):
+    return None if value is None else float(value)
+
+
+SESSION_ROW_FIELDS = (
+    'id', 'user__username', 'topic', 'subtopic', 'knowledge_level',
+    'initial_difficulty', 'current_difficulty', 'started_at', 'ended_at', 'is_completed',
+    'total_questions', 'correct_answers', 'current_streak', 'total_response_time',
+    'answers_count', 'questions_count', 'time_per_question', 'use_adaptive_difficulty',
+    'is_custom',
+)
+
+ANSWER_DETAIL_ROW_FIELDS = (
+    'question__question_text', 'question__correct_answer',
+    'question__wrong_answer_1', 'question__wrong_answer_2', 'question__wrong_answer_3',
+    'selected_answer', 'is_correct', 'question__explanation',
+    'response_time', 'difficulty_at_answer',
+)
+
+ADMIN_QUESTION_ROW_FIELDS = (
+    'id', 'topic', 'subtopic', 'knowledge_level',
+    'question_text', 'correct_answer', 'wrong_answer_1',
+    'wrong_answer_2', 'wrong_answer_3', 'explanation',
+    'difficulty_level', 'total_answers', 'correct_answers_count',
+    'success_rate', 'times_used', 'created_at', 'updated_at', 'edited_at', 'created_by__email',
+)
+
+
+def session_rows(queryset, fields=None):
+    columns = fieldset_columns(fields, SESSION_FIELD_COLUMNS, required=('id', 'started_at'))
+    return queryset.values(*(columns or SESSION_ROW_FIELDS))
+
+
+def answer_detail_rows(queryset):
+    return queryset.values(*ANSWER_DETAIL_ROW_FIELDS)
+
+
+def admin_question_rows(queryset):
+    return queryset.values(*ADMIN_QUESTION_ROW_FIELDS)
+
+
+def _initial_difficulty_value(row):
+    value = row.get('initial_difficulty_value')
+    if value is not None:
+        return float(value)
+    return difficulty_value_for(row['initial_difficulty'])
+
+
+# Response key -> (columns it reads, builder). Lets ?fields= trim both the projection and the body.
+SESSION_FIELD_BUILDERS = {
+    'id': (('id',), lambda row: row['id']),
+    'username': (('user__username',), lambda row: _str(row['user__username'])),
+    'topic': (('topic',), lambda row: _str(row['topic'])),
+    'subtopic': (('subtopic',), lambda row: _str(row['subtopic'])),
+    'knowledge_level': (('knowledge_level',), lambda row: _str(row['knowledge_level'])),
+    'initial_difficulty': (('initial_difficulty',), lambda row: _str(row['initial_difficulty'])),
+    'difficulty': (('initial_difficulty',), lambda row: _str(row['initial_difficulty'])),
+    'current_difficulty': (('current_difficulty',), lambda row: _float(row['current_difficulty'])),
+    'initial_difficulty_value': (('initial_difficulty',), _initial_difficulty_value),
+    'started_at': (('started_at',), lambda row: _datetime(row['started_at'])),
+    'ended_at': (('ended_at',), lambda row: _datetime(row['ended_at'])),
+    'completed_at': (('ended_at',), lambda row: _datetime(row['ended_at'])),
+    'is_completed': (('is_completed',), lambda row: bool(row['is_completed'])),
+    'total_questions': (('total_questions',), lambda row: _int(row['total_questions'])),
+    'correct_answers': (('correct_answers',), lambda row: _int(row['correct_answers'])),
+    'score': (('correct_answers',), lambda row: _int(row['correct_answers'])),
+    'current_streak': (('current_streak',), lambda row: _int(row['current_streak'])),
+    'accuracy': (
+        ('correct_answers', 'total_questions'),
+        lambda row: QuizSession.compute_accuracy(row['correct_answers'], row['total_questions']),
+    ),
+    'total_response_time': (
+        ('total_response_time',),
+        lambda row: round(float(row['total_response_time'] or 0.0), 2),
+    ),
+    'answers_count': (('answers_count',), lambda row: _int(row['answers_count'])),
+    'questions_count': (('questions_count',), lambda row: _int(row['questions_count'])),
+    'time_per_question': (('time_per_question',), lambda row: _int(row['time_per_question'])),
+    'use_adaptive_difficulty': (('use_adaptive_difficulty',), lambda row: bool(row['use_adaptive_difficulty'])),
+    'is_custom': (('is_custom',), lambda row: bool(row['is_custom'])),
+}
+
+SESSION_FIELD_COLUMNS = {name: columns for name, (columns, _build) in SESSION_FIELD_BUILDERS.items()}
+
+
+def serialize_session_row(row, fields=None):
+    return {
+        name: build(row)
+        for name, (_columns, build) in SESSION_FIELD_BUILDERS.items()
+        if fields is None or name in fields
+    }
+
+
+def serialize_answer_detail_row(row):
+    return {
+        'question_text': _str(row['question__question_text']),
+        'correct_answer': _str(row['question__correct_answer']),
+        'wrong_answer_1': _str(row['question__wrong_answer_1']),
+        'wrong_answer_2': _str(row['question__wrong_answer_2']),
+        'wrong_answer_3': _str(row['question__wrong_answer_3']),
+        'selected_answer': _str(row['selected_answer']),
+        'is_correct': bool(row['is_correct']),
+        'explanation': _str(row['question__explanation']),
+        'response_time': _float(row['response_time']),
+        'difficulty_at_answer': _float(row['difficulty_at_answer']),
+    }
+
+
+def serialize_admin_question_row(row):
+    return {
+        'id': row['id'],
+        'topic': _str(row['topic']),
+        'subtopic': _str(row['subtopic']),
+        'knowledge_level': _str(row['knowledge_level']),
+        'question_text': _str(row['question_text']),
+        'correct_answer': _str(row['correct_answer']),
+        'wrong_answer_1': _str(row['wrong_answer_1']),
+        'wrong_answer_2': _str(row['wrong_answer_2']),
+        'wrong_answer_3': _str(row['wrong_answer_3']),
+        'explanation': _str(row['explanation']),
+        'difficulty_level': _str(row['difficulty_level']),
+        'total_answers': _int(row['total_answers']),
+        'correct_answers_count': _int(row['correct_answers_count']),
+        'success_rate': _float(row['success_rate']),
+        'times_used': _int(row['times_used']),
+        'created_at': _datetime(row['created_at']),
+        'updated_at': _datetime(row['updated_at']),
+        'edited_at': _datetime(row['edited_at']),
+        'created_by': row['created_by__email'],
+    }
+
+
+def serialize_session_rows(rows, fields=None):
+    return [serialize_session_row(row, fields) for row in rows]
+
+
+def serialize_answer_detail_rows(rows):
+    return [serialize_answer_detail_row(row) for row in rows]
+
+
+def serialize_admin_question_rows(rows):
+    return [serialize_admin_question_row(row) for row in rows]
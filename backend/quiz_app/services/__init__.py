@@ -5,8 +5,20 @@ from .answer_service import (
     prefetch_next_question_cache,
     update_profile_stats_on_completion,
 )
-from .cleanup_service import cleanup_orphaned_questions, cleanup_rejected_question, cleanup_unused_session_questions
-from .history_service import build_quiz_details_payload
+from .cleanup_service import (
+    cleanup_orphaned_questions,
+    cleanup_rejected_question,
+    cleanup_unused_session_questions,
+    delete_orphaned_questions,
+    delete_question_answers,
+    orphaned_questions,
+)
+from .generation_queue import enqueue_generation_job, generation_queue_stats
+from .history_service import (
+    build_quiz_details_payload,
+    invalidate_question_snapshots,
+    snapshot_completed_session,
+)
 from .leaderboard_service import (
     get_global_leaderboard,
     get_topic_leaderboard,
@@ -15,6 +27,8 @@ from .leaderboard_service import (
 )
 from .question_delivery_service import get_next_question_payload
 from .question_generation_service import QuestionGenerationService
+from .question_search_service import search_questions
+from .topic_service import filter_by_topic, matching_topics
 
 __all__ = [
     'QuestionService',
@@ -26,10 +40,20 @@ __all__ = [
     'cleanup_orphaned_questions',
     'cleanup_rejected_question',
     'cleanup_unused_session_questions',
+    'delete_orphaned_questions',
+    'delete_question_answers',
+    'orphaned_questions',
+    'enqueue_generation_job',
+    'generation_queue_stats',
     'build_quiz_details_payload',
+    'invalidate_question_snapshots',
+    'snapshot_completed_session',
     'get_global_leaderboard',
     'get_topic_leaderboard',
     'get_user_ranking',
     'get_leaderboard_stats',
     'get_next_question_payload',
+    'search_questions',
+    'filter_by_topic',
+    'matching_topics',
 ]
@@ -0,0 +1,143 @@
+import hashlib
+import logging
+import math
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db.models import F, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from llm_integration.config import LLMConfig
+from ..models import GenerationUsageDaily
+from ..utils.constants import (
+    GENERATION_ACCEPTANCE_CONFIDENCE,
+    GENERATION_ACCEPTANCE_DECAY,
+    GENERATION_ACCEPTANCE_MIN_TRIALS,
+    GENERATION_ACCEPTANCE_PRIOR_RATE,
+    GENERATION_ACCEPTANCE_PRIOR_TRIALS,
+    GENERATION_ACCEPTANCE_SEED_DAYS,
+    GENERATION_ACCEPTANCE_TTL_SECONDS,
+    GENERATION_BUFFER_MAX_RATIO,
+    GENERATION_BUFFER_MIN_EXTRA,
+    GENERATION_BUFFER_RATIO,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def acceptance_key(topic, difficulty_text, knowledge_level):
+    scope = '|'.join((topic or '', difficulty_text or '', knowledge_level or ''))
+    return 'generation_acceptance:{}'.format(hashlib.sha256(scope.encode()).hexdigest()[:32])
+
+
+def _fit_call(target_count, count):
+    # A buffer the model cannot fit into one response only gets truncated.
+    return max(target_count, min(count, LLMConfig.max_questions_per_call()))
+
+
+def static_buffer_count(target_count):
+    return _fit_call(target_count, max(
+        target_count + GENERATION_BUFFER_MIN_EXTRA,
+        int(target_count * GENERATION_BUFFER_RATIO),
+    ))
+
+
+def _seed(topic, difficulty_text, knowledge_level):
+    # A cold cache starts from the daily rollups, scaled down to the weight an
+    # estimate carries in steady state so old history cannot pin the rate.
+    since = timezone.localdate() - timedelta(days=GENERATION_ACCEPTANCE_SEED_DAYS)
+    try:
+        totals = GenerationUsageDaily.objects.filter(
+            day__gte=since,
+            topic=topic,
+            difficulty_level=difficulty_text or '',
+            knowledge_level=knowledge_level or '',
+        ).aggregate(
+            accepted=Sum('added'),
+            trials=Sum(Greatest('requested', 'returned') - F('unused')),
+        )
+    except DatabaseError as e:
+        logger.warning(f"Could not seed generation acceptance estimate: {e}")
+        totals = {}
+    accepted = totals.get('accepted') or 0
+    trials = totals.get('trials') or 0
+    cap = GENERATION_ACCEPTANCE_MIN_TRIALS / (1 - GENERATION_ACCEPTANCE_DECAY)
+    if trials > cap:
+        accepted, trials = accepted * cap / trials, cap
+    return {'accepted': round(float(accepted), 3), 'trials': round(float(trials), 3)}
+
+
+def load_estimate(topic, difficulty_text, knowledge_level):
+    key = acceptance_key(topic, difficulty_text, knowledge_level)
+    estimate = cache.get(key)
+    if estimate is None:
+        estimate = _seed(topic, difficulty_text, knowledge_level)
+        cache.set(key, estimate, timeout=GENERATION_ACCEPTANCE_TTL_SECONDS)
+    return estimate
+
+
+def acceptance_rate(estimate):
+    return (
+        (estimate['accepted'] + GENERATION_ACCEPTANCE_PRIOR_RATE * GENERATION_ACCEPTANCE_PRIOR_TRIALS)
+        / (estimate['trials'] + GENERATION_ACCEPTANCE_PRIOR_TRIALS)
+    )
+
+
+def observe_acceptance(topic, difficulty_text, knowledge_level, accepted, trials):
+    # Exponentially weighted per call: older calls fade by DECAY each time. A lost
+    # update under concurrent writers only makes the estimate slightly staler.
+    if trials <= 0:
+        return None
+    key = acceptance_key(topic, difficulty_text, knowledge_level)
+    estimate = load_estimate(topic, difficulty_text, knowledge_level)
+    estimate = {
+        'accepted': estimate['accepted'] * GENERATION_ACCEPTANCE_DECAY + min(accepted, trials),
+        'trials': estimate['trials'] * GENERATION_ACCEPTANCE_DECAY + trials,
+    }
+    cache.set(key, estimate, timeout=GENERATION_ACCEPTANCE_TTL_SECONDS)
+    return estimate
+
+
+def observe_call(session, difficulty_text, telemetry):
+    # Surplus left unused once the target was reached was never judged; items the
+    # model failed to return count against it like rejected ones.
+    if telemetry.bank_fallback or not telemetry.requests:
+        return None
+    trials = max(telemetry.requested, telemetry.returned) - telemetry.unused
+    return observe_acceptance(
+        session.topic,
+        difficulty_text,
+        session.knowledge_level,
+        telemetry.added,
+        trials,
+    )
+
+
+def _reach_probability(count, target, rate):
+    # P(Binomial(count, rate) >= target)
+    return sum(
+        math.comb(count, k) * rate ** k * (1 - rate) ** (count - k)
+        for k in range(target, count + 1)
+    )
+
+
+def size_for_target(target_count, rate, confidence=GENERATION_ACCEPTANCE_CONFIDENCE):
+    ceiling = _fit_call(target_count, max(
+        target_count + GENERATION_BUFFER_MIN_EXTRA,
+        math.ceil(target_count * GENERATION_BUFFER_MAX_RATIO),
+    ))
+    for count in range(target_count, ceiling + 1):
+        if _reach_probability(count, target_count, rate) >= confidence:
+            return count
+    return ceiling
+
+
+def adaptive_buffer_count(target_count, topic, difficulty_text, knowledge_level):
+    if target_count <= 0:
+        return 0
+    estimate = load_estimate(topic, difficulty_text, knowledge_level)
+    if estimate['trials'] < GENERATION_ACCEPTANCE_MIN_TRIALS:
+        return static_buffer_count(target_count)
+    return size_for_target(target_count, acceptance_rate(estimate))
@@ -1,12 +1,10 @@
 import logging
-import threading
-
-from django.db import DatabaseError
 
 from cache_manager import QuizCacheService
-from ..models import Answer, Question, QuizSession, QuizSessionQuestion
-from ..utils.constants import SYNC_QUESTION_COUNT
+from ..models import Answer, QuizSession, QuizSessionQuestion
 from ..utils.helpers import build_question_payload, get_used_question_refs
+from .cleanup_service import cleanup_orphaned_questions
+from .generation_telemetry import record_level_cleanup
 from .question_delivery_service import select_next_session_question
 
 logger = logging.getLogger(__name__)
@@ -161,23 +159,8 @@ def _cleanup_old_level_questions(session, previous_level, answered_question_ids)
     if deleted_count <= 0 or not deleted_question_ids:
         return
 
-    orphaned_from_difficulty_change = Question.objects.filter(
-        id__in=deleted_question_ids,
-        total_answers=0
-    )
-
-    for orphan_q in orphaned_from_difficulty_change:
-        used_in_active = QuizSessionQuestion.objects.filter(
-            question=orphan_q,
-            session__is_completed=False
-        ).exists()
-
-        if not used_in_active:
-            logger.info(
-                "Deleting orphaned Question ID=%s (difficulty change, total_answers=0)",
-                orphan_q.id
-            )
-            orphan_q.delete()
+    record_level_cleanup(session, previous_level, deleted_count)
+    cleanup_orphaned_questions(deleted_question_ids, reason="difficulty_change")
 
 
 def _compute_needed_questions(session, answered_question_ids, questions_remaining):
@@ -192,45 +175,16 @@ def _compute_needed_questions(session, answered_question_ids, questions_remainin
 
 
 def _schedule_level_generation(session, new_difficulty_level, actually_needed, bg_generator):
-    sync_count = min(SYNC_QUESTION_COUNT, actually_needed)
-
-    def generate_for_new_level():
-        try:
-            from django.db import connection
-            connection.close()
-        except DatabaseError as e:
-            logger.debug("Database connection close failed in async thread: %s", e)
-        try:
-            generated = bg_generator.generate_adaptive_questions_sync(
-                session=session,
-                new_difficulty_level=new_difficulty_level,
-                count=sync_count
-            )
-            logger.info(
-                "Generated %s questions sync for level '%s' (async thread)",
-                generated,
-                new_difficulty_level
-            )
-
-            if actually_needed > sync_count:
-                async_count = actually_needed - sync_count
-                logger.info(
-                    "Starting async generation of %s more questions for level '%s' (async thread)",
-                    async_count,
-                    new_difficulty_level
-                )
-
-                current_total = QuizSessionQuestion.objects.filter(
-                    session=session
-                ).count()
-                bg_generator.generate_remaining_questions_async(
-                    session_id=session.id,
-                    total_needed=session.questions_count,
-                    already_generated=current_total
-                )
-        except (DatabaseError, RuntimeError, TypeError, ValueError) as e:
-            logger.error("Error generating adaptive questions (async): %s", e)
-
-    threading.Thread(target=generate_for_new_level, daemon=True).start()
+    job = bg_generator.schedule_level_generation(
+        session_id=session.id,
+        difficulty_level=new_difficulty_level,
+        needed=actually_needed,
+    )
+    if job is None:
+        logger.warning(
+            "Level generation for session %s not queued (level '%s')",
+            session.id,
+            new_difficulty_level
+        )
 
 
@@ -1,8 +1,16 @@
 import logging
-import threading
 from django.db import DatabaseError, IntegrityError, transaction
-from ..models import QuizSession, QuizSessionQuestion
-from ..utils.constants import BACKGROUND_BATCH_SIZE
+from llm_integration.telemetry import note_rejection
+from ..models import GenerationJob, QuizSessionQuestion
+from ..utils.constants import BACKGROUND_BATCH_SIZE, SYNC_QUESTION_COUNT
+from .generation_ledger import generation_slots
+from .generation_queue import (
+    GenerationPreempted,
+    enqueue_generation_job,
+    inline_generation_job,
+    should_yield_generation,
+)
+from .generation_telemetry import generation_telemetry
 from .question_generation_service import QuestionGenerationService
 
 logger = logging.getLogger(__name__)
@@ -13,302 +21,335 @@ class BackgroundGenerationService:
     def __init__(self):
         self.core = QuestionGenerationService()
 
-    def generate_initial_questions_sync(self, session, count=2):
-        logger.info(f"Generating {count} questions synchronously for session {session.id}")
+    def generate_initial_questions_sync(self, session, count=2, kind=GenerationJob.KIND_SESSION_START):
+        with inline_generation_job(kind, session.id, count=count):
+            return self._generate_initial_questions(session, count)
 
-        difficulty_text = self.core.get_difficulty_text(session)
-        buffer_count = self.core.compute_buffer_count(count)
-        logger.debug(
-            f"Generating {buffer_count} questions (target: {count}, "
-            f"buffer: +{buffer_count - count} for rejections)"
-        )
-
-        questions_data = self.core.generate_questions_data(
-            session=session,
-            difficulty_text=difficulty_text,
-            count=buffer_count,
-            existing_questions=None,
-        )
+    def _generate_initial_questions(self, session, count):
+        with generation_slots(session, count) as slots:
+            if not slots.count:
+                logger.info(f"No free generation slots for session {session.id}, skipping sync generation")
+                return []
 
-        created_questions = []
-        used_hashes = self.core.get_used_hashes(session)
-        order = 0
+            logger.info(f"Generating {slots.count} questions synchronously for session {session.id}")
 
-        for q_data in questions_data:
+            difficulty_text = self.core.get_difficulty_text(session)
+            buffer_count = self.core.compute_buffer_count(slots.count, session, difficulty_text)
+            logger.debug(
+                f"Generating {buffer_count} questions (target: {slots.count}, "
+                f"buffer: +{buffer_count - slots.count} for rejections)"
+            )
 
-            current_total_in_session = QuizSessionQuestion.objects.filter(session=session).count()
-            if current_total_in_session >= session.questions_count:
-                logger.warning(
-                    f"Session already has {current_total_in_session} questions "
-                    f"(limit: {session.questions_count}), stopping"
+            with generation_telemetry(session, difficulty_text, buffer_count):
+                questions_data = self.core.generate_questions_data(
+                    session=session,
+                    difficulty_text=difficulty_text,
+                    count=buffer_count,
+                    existing_questions=None,
                 )
-                break
 
-            if len(created_questions) >= count:
-                logger.debug(f"Reached target count ({count}), stopping")
-                break
+                created_questions = []
+                used_hashes = self.core.get_used_hashes(session)
 
-            try:
+                for q_data in questions_data:
 
-                question, order = self.core.add_question_from_data(
-                    session=session,
-                    q_data=q_data,
-                    difficulty_text=difficulty_text,
-                    order=order,
-                    used_hashes=used_hashes,
-                )
+                    if slots.full:
+                        logger.debug(f"Reached target count ({slots.count}), stopping")
+                        break
 
-                if question:
-                    created_questions.append(question)
-                    logger.debug(
-                        f"Added question {question.id} to session {session.id} "
-                        f"(order={order}, progress={len(created_questions)}/{count})"
-                    )
-                else:
-                    logger.warning("Question rejected (duplicate or too similar)")
+                    try:
 
-            except (DatabaseError, IntegrityError, ValueError, TypeError, RuntimeError, KeyError) as e:
-                logger.error(f"Error creating question: {e}")
-                continue
+                        question, _ = self.core.add_question_from_data(
+                            session=session,
+                            q_data=q_data,
+                            difficulty_text=difficulty_text,
+                            order=slots.order,
+                            used_hashes=used_hashes,
+                        )
 
-        session.questions_generated_count = len(created_questions)
-        session.save(update_fields=['questions_generated_count'])
+                        if question:
+                            slots.added += 1
+                            created_questions.append(question)
+                            logger.debug(
+                                f"Added question {question.id} to session {session.id} "
+                                f"(order={slots.order - 1}, progress={slots.added}/{slots.count})"
+                            )
+                        else:
+                            logger.warning("Question rejected (duplicate or too similar)")
+
+                    except (DatabaseError, IntegrityError, ValueError, TypeError, RuntimeError, KeyError) as e:
+                        note_rejection("error")
+                        logger.error(f"Error creating question: {e}")
+                        continue
+
+        self._record_generated_count(session, slots.committed)
 
         logger.info(f"Generated {len(created_questions)} questions synchronously")
         return created_questions
 
+    def _record_generated_count(self, session, committed):
+        if committed is None or committed == session.questions_generated_count:
+            return
+        session.questions_generated_count = committed
+        session.save(update_fields=['questions_generated_count'])
+
     def generate_remaining_questions_async(self, session_id, total_needed, already_generated):
         remaining = total_needed - already_generated
 
         if remaining <= 0:
             logger.info(f"All questions already generated for session {session_id}")
-            return
+            return None
+
+        logger.info(f"Queueing generation of {remaining} questions for session {session_id}")
+        return enqueue_generation_job(
+            GenerationJob.KIND_FILL_SESSION,
+            session_id,
+            count=remaining,
+            start_order=already_generated,
+        )
 
-        logger.info(f"Starting async generation of {remaining} questions for session {session_id}")
+    def schedule_level_generation(self, session_id, difficulty_level, needed):
+        return enqueue_generation_job(
+            GenerationJob.KIND_LEVEL_CHANGE,
+            session_id,
+            difficulty_level=difficulty_level,
+            needed=needed,
+        )
 
-        thread = threading.Thread(
-            target=self._generate_questions_in_background,
-            args=(session_id, remaining, already_generated),
-            daemon=True
+    def schedule_pregeneration(self, session_id, difficulty_level, count):
+        return enqueue_generation_job(
+            GenerationJob.KIND_PREGENERATE_LEVEL,
+            session_id,
+            difficulty_level=difficulty_level,
+            count=count,
         )
-        thread.start()
-        logger.debug(f"Background thread started for session {session_id}")
 
-    def _generate_questions_in_background(self, session_id, count, start_order):
-        try:
+    def generate_session_questions(self, session, count, start_order):
+        session_id = session.id
+        difficulty_text = self.core.get_difficulty_text(session)
 
-            from django.db import connection
-            connection.close()
+        current_question_count = QuizSessionQuestion.objects.filter(session=session).count()
+        max_questions_allowed = session.questions_count
 
-            session = QuizSession.objects.get(id=session_id)
-            difficulty_text = self.core.get_difficulty_text(session)
+        actual_needed = max_questions_allowed - current_question_count
 
-            current_question_count = QuizSessionQuestion.objects.filter(session=session).count()
-            max_questions_allowed = session.questions_count
+        if actual_needed <= 0:
+            logger.info(
+                f"Background: Session {session_id} already has enough questions "
+                f"({current_question_count}/{max_questions_allowed})"
+            )
+            return 0
 
-            actual_needed = max_questions_allowed - current_question_count
+        count = min(count, actual_needed)
 
-            if actual_needed <= 0:
-                logger.info(
-                    f"Background: Session {session_id} already has enough questions "
-                    f"({current_question_count}/{max_questions_allowed})"
-                )
-                return
+        existing_questions_list = self.core.get_existing_questions_list(session)
+        used_hashes = self.core.get_used_hashes(session)
 
-            count = min(count, actual_needed)
+        logger.info(
+            f"Background: Generating {count} questions for session {session_id} "
+            f"(currently: {current_question_count}/{max_questions_allowed})"
+        )
+        logger.debug(
+            f"Background: Context - "
+            f"{len(existing_questions_list) if existing_questions_list else 0} existing questions"
+        )
 
-            existing_questions_list = self.core.get_existing_questions_list(session)
-            used_hashes = self.core.get_used_hashes(session)
+        batch_size = min(BACKGROUND_BATCH_SIZE, count)
+        total_generated = 0
+        committed = None
+        failed_batches = 0
+        max_failed_batches = 3
 
-            logger.info(
-                f"Background: Generating {count} questions for session {session_id} "
-                f"(currently: {current_question_count}/{max_questions_allowed})"
-            )
-            logger.debug(
-                f"Background: Context - "
-                f"{len(existing_questions_list) if existing_questions_list else 0} existing questions"
-            )
+        while total_generated < count and failed_batches < max_failed_batches:
 
-            batch_size = min(BACKGROUND_BATCH_SIZE, count)
-            total_generated = 0
-            order = start_order
-            failed_batches = 0
-            max_failed_batches = 3
+            if should_yield_generation(GenerationJob.PRIORITY_BACKGROUND_FILL):
+                raise GenerationPreempted(
+                    f"yielded to urgent generation after {total_generated}/{count} questions"
+                )
 
-            while total_generated < count:
+            remaining = count - total_generated
 
-                current_count_check = QuizSessionQuestion.objects.filter(session=session).count()
-                if current_count_check >= max_questions_allowed:
-                    logger.warning(
-                        f"Background: Limit reached "
-                        f"({current_count_check}/{max_questions_allowed}), stopping generation"
+            with generation_slots(session, min(batch_size, remaining), min_order=start_order) as slots:
+                if not slots.count:
+                    logger.info(
+                        f"Background: No free generation slots left for session {session_id}, stopping"
                     )
                     break
 
-                remaining = count - total_generated
-                current_batch = min(batch_size, remaining)
-
-                buffer_batch = min(current_batch + 1, remaining + 1)
+                buffer_batch = self.core.compute_buffer_count(slots.count, session, difficulty_text)
 
                 logger.debug(
                     f"Background: Generating batch of {buffer_batch} questions "
-                    f"(target: {current_batch}, progress: {total_generated}/{count})"
+                    f"(target: {slots.count}, progress: {total_generated}/{count})"
                 )
 
-                try:
-                    questions_data = self.core.generate_questions_data(
-                        session=session,
-                        difficulty_text=difficulty_text,
-                        count=buffer_batch,
-                        existing_questions=existing_questions_list,
-                    )
-                    failed_batches = 0
-                except (ValueError, RuntimeError, TypeError, KeyError) as e:
-                    failed_batches += 1
-                    logger.warning(
-                        "Background: Failed batch generation %s/%s for session %s: %s",
-                        failed_batches,
-                        max_failed_batches,
-                        session_id,
-                        e,
-                    )
-                    if failed_batches >= max_failed_batches:
-                        logger.error(
-                            "Background: Stopping generation after %s consecutive batch failures",
-                            failed_batches,
-                        )
-                        break
-                    continue
-
-                batch_added = 0
-                for q_data in questions_data:
-
-                    if batch_added >= current_batch:
-                        logger.debug(
-                            f"Background: Reached batch target ({batch_added}/{current_batch}), "
-                            f"moving to next batch"
+                with generation_telemetry(session, difficulty_text, buffer_batch):
+                    try:
+                        questions_data = self.core.generate_questions_data(
+                            session=session,
+                            difficulty_text=difficulty_text,
+                            count=buffer_batch,
+                            existing_questions=existing_questions_list,
                         )
-                        break
-
-                    if total_generated >= count:
+                        failed_batches = 0
+                    except (ValueError, RuntimeError, TypeError, KeyError) as e:
+                        failed_batches += 1
                         logger.warning(
-                            f"Background: Reached total target count ({total_generated}/{count}), stopping"
+                            "Background: Failed batch generation %s/%s for session %s: %s",
+                            failed_batches,
+                            max_failed_batches,
+                            session_id,
+                            e,
                         )
-                        break
+                        questions_data = []
 
-                    current_total = QuizSessionQuestion.objects.filter(session=session).count()
-                    if current_total >= max_questions_allowed:
-                        logger.warning(
-                            f"Background: Session limit reached "
-                            f"({current_total}/{max_questions_allowed}), stopping"
-                        )
-                        break
+                    for q_data in questions_data:
 
-                    try:
-                        with transaction.atomic():
-                            question, order = self.core.add_question_from_data(
-                                session=session,
-                                q_data=q_data,
-                                difficulty_text=difficulty_text,
-                                order=order,
-                                used_hashes=used_hashes,
+                        if slots.full:
+                            logger.debug(
+                                f"Background: Reached batch target ({slots.added}/{slots.count}), "
+                                f"moving to next batch"
                             )
-
-                            if question:
-                                total_generated += 1
-                                batch_added += 1
-
-                                if existing_questions_list is None:
-                                    existing_questions_list = []
-                                existing_questions_list.append(q_data['question'])
-
-                                logger.debug(
-                                    f"Background: Added question {question.id} "
-                                    f"(batch: {batch_added}/{current_batch}, total: {total_generated}/{count})"
-                                )
-                            else:
-                                logger.warning(
-                                    "Background: Question rejected (duplicate or similar)"
+                            break
+
+                        try:
+                            with transaction.atomic():
+                                question, _ = self.core.add_question_from_data(
+                                    session=session,
+                                    q_data=q_data,
+                                    difficulty_text=difficulty_text,
+                                    order=slots.order,
+                                    used_hashes=used_hashes,
                                 )
-                    except (DatabaseError, IntegrityError, ValueError, TypeError, RuntimeError, KeyError) as e:
-                        logger.error(f"Background: Error creating question: {e}")
-                        continue
 
-            session.questions_generated_count = start_order + total_generated
-            session.save(update_fields=['questions_generated_count'])
-
-            logger.info(
-                f"Background: Completed! Generated {total_generated} questions for session {session_id}"
+                                if question:
+                                    slots.added += 1
+                                    total_generated += 1
+
+                                    if existing_questions_list is None:
+                                        existing_questions_list = []
+                                    existing_questions_list.append(q_data['question'])
+
+                                    logger.debug(
+                                        f"Background: Added question {question.id} "
+                                        f"(batch: {slots.added}/{slots.count}, total: {total_generated}/{count})"
+                                    )
+                                else:
+                                    logger.warning(
+                                        "Background: Question rejected (duplicate or similar)"
+                                    )
+                        except (DatabaseError, IntegrityError, ValueError, TypeError, RuntimeError, KeyError) as e:
+                            note_rejection("error")
+                            logger.error(f"Background: Error creating question: {e}")
+                            continue
+
+            committed = slots.committed
+
+        self._record_generated_count(session, committed)
+
+        if failed_batches >= max_failed_batches and total_generated < count:
+            logger.error(
+                "Background: Stopping generation after %s consecutive batch failures",
+                failed_batches,
+            )
+            raise RuntimeError(
+                f"Generated {total_generated}/{count} questions before {failed_batches} consecutive batch failures"
             )
 
-        except (DatabaseError, IntegrityError, ValueError, TypeError, RuntimeError, QuizSession.DoesNotExist) as e:
-            logger.error(f"Background generation failed for session {session_id}: {e}")
-            import traceback
-            traceback.print_exc()
-
-    def generate_adaptive_questions_sync(self, session, new_difficulty_level, count=5):
         logger.info(
-            f"Generating {count} adaptive questions for level: {new_difficulty_level}"
+            f"Background: Completed! Generated {total_generated} questions for session {session_id}"
         )
+        return total_generated
 
-        existing_questions_list = self.core.get_existing_questions_list(session)
-        used_hashes = self.core.get_used_hashes(session)
-
-        buffer_count = self.core.compute_buffer_count(count)
-        logger.debug(
-            f"Generating {buffer_count} adaptive questions (target: {count}, "
-            f"buffer: +{buffer_count - count} for rejections)"
+    def generate_level_questions(self, session, difficulty_level, needed):
+        sync_count = min(SYNC_QUESTION_COUNT, needed)
+        generated = self.generate_adaptive_questions_sync(
+            session=session,
+            new_difficulty_level=difficulty_level,
+            count=sync_count
         )
+        logger.info(
+            "Generated %s questions for level '%s' (generation job)",
+            generated,
+            difficulty_level
+        )
+
+        if needed > sync_count:
+            current_total = QuizSessionQuestion.objects.filter(session=session).count()
+            self.generate_remaining_questions_async(
+                session_id=session.id,
+                total_needed=session.questions_count,
+                already_generated=current_total
+            )
+        return generated
 
-        questions_data = self.core.generate_questions_data(
+    def pregenerate_level_questions(self, session, difficulty_level, count):
+        return self.generate_adaptive_questions_sync(
             session=session,
-            difficulty_text=new_difficulty_level,
-            count=buffer_count,
-            existing_questions=existing_questions_list,
+            new_difficulty_level=difficulty_level,
+            count=count
         )
 
-        max_order = QuizSessionQuestion.objects.filter(session=session).count()
-        order = max_order
-
-        generated_count = 0
+    def generate_adaptive_questions_sync(self, session, new_difficulty_level, count=5):
+        with generation_slots(session, count) as slots:
+            if not slots.count:
+                logger.info(
+                    f"No free generation slots for session {session.id}, "
+                    f"skipping adaptive generation for level: {new_difficulty_level}"
+                )
+                return 0
 
-        for q_data in questions_data:
+            logger.info(
+                f"Generating {slots.count} adaptive questions for level: {new_difficulty_level}"
+            )
 
-            current_total_in_session = QuizSessionQuestion.objects.filter(session=session).count()
-            if current_total_in_session >= session.questions_count:
-                logger.warning(
-                    f"Session already has {current_total_in_session} questions "
-                    f"(limit: {session.questions_count}), stopping adaptive generation"
-                )
-                break
+            existing_questions_list = self.core.get_existing_questions_list(session)
+            used_hashes = self.core.get_used_hashes(session)
 
-            if generated_count >= count:
-                logger.debug(f"Reached target adaptive count ({count}), stopping")
-                break
+            buffer_count = self.core.compute_buffer_count(slots.count, session, new_difficulty_level)
+            logger.debug(
+                f"Generating {buffer_count} adaptive questions (target: {slots.count}, "
+                f"buffer: +{buffer_count - slots.count} for rejections)"
+            )
 
-            try:
-                question, order = self.core.add_question_from_data(
+            with generation_telemetry(session, new_difficulty_level, buffer_count):
+                questions_data = self.core.generate_questions_data(
                     session=session,
-                    q_data=q_data,
                     difficulty_text=new_difficulty_level,
-                    order=order,
-                    used_hashes=used_hashes,
+                    count=buffer_count,
+                    existing_questions=existing_questions_list,
                 )
 
-                if question:
-                    generated_count += 1
-                    logger.debug(
-                        f"Added adaptive question {question.id} "
-                        f"(level={new_difficulty_level}, progress={generated_count}/{count})"
-                    )
-                else:
-                    logger.warning(
-                        "Adaptive question rejected (duplicate or too similar)"
-                    )
+                for q_data in questions_data:
+
+                    if slots.full:
+                        logger.debug(f"Reached target adaptive count ({slots.count}), stopping")
+                        break
+
+                    try:
+                        question, _ = self.core.add_question_from_data(
+                            session=session,
+                            q_data=q_data,
+                            difficulty_text=new_difficulty_level,
+                            order=slots.order,
+                            used_hashes=used_hashes,
+                        )
 
-            except (DatabaseError, IntegrityError, ValueError, TypeError, RuntimeError, KeyError) as e:
-                logger.error(f"Error creating adaptive question: {e}")
-                continue
+                        if question:
+                            slots.added += 1
+                            logger.debug(
+                                f"Added adaptive question {question.id} "
+                                f"(level={new_difficulty_level}, progress={slots.added}/{slots.count})"
+                            )
+                        else:
+                            logger.warning(
+                                "Adaptive question rejected (duplicate or too similar)"
+                            )
+
+                    except (DatabaseError, IntegrityError, ValueError, TypeError, RuntimeError, KeyError) as e:
+                        note_rejection("error")
+                        logger.error(f"Error creating adaptive question: {e}")
+                        continue
 
-        logger.info(f"Generated {generated_count} adaptive questions")
-        return generated_count
+        logger.info(f"Generated {slots.added} adaptive questions")
+        return slots.added
@@ -0,0 +1,238 @@
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from ..models import CleanupCursor
+from ..utils.constants import (
+    CLEANUP_ORPHAN_AGE_HOURS,
+    CLEANUP_SCHEDULER_CHUNK_SIZE,
+    CLEANUP_SCHEDULER_IDLE_SECONDS,
+    CLEANUP_SCHEDULER_MAX_LOCK_MS,
+    CLEANUP_SCHEDULER_MIN_CHUNK_SIZE,
+    CLEANUP_SCHEDULER_ROWS_PER_SECOND,
+    CLEANUP_SESSION_AGE_MINUTES,
+    GENERATION_CALL_RETENTION_DAYS,
+    GENERATION_JOB_RETENTION_HOURS,
+)
+from .cleanup_service import (
+    abandoned_sessions,
+    delete_orphan_chunk,
+    orphaned_questions,
+    rollback_abandoned_chunk,
+)
+from .generation_queue import finished_generation_jobs, purge_generation_jobs_chunk
+from .generation_telemetry import expired_generation_calls, purge_generation_calls_chunk
+
+logger = logging.getLogger(__name__)
+
+THROUGHPUT_SMOOTHING = 0.2
+
+
+def _call_cutoff():
+    return timezone.now() - timedelta(days=GENERATION_CALL_RETENTION_DAYS)
+
+
+def _session_cutoff():
+    return timezone.now() - timedelta(minutes=CLEANUP_SESSION_AGE_MINUTES)
+
+
+def _orphan_cutoff():
+    return timezone.now() - timedelta(hours=CLEANUP_ORPHAN_AGE_HOURS)
+
+
+def _job_cutoff():
+    return timezone.now() - timedelta(hours=GENERATION_JOB_RETENTION_HOURS)
+
+
+def _abandoned_sessions_chunk(limit, after_id):
+    session_ids, _ = rollback_abandoned_chunk(
+        limit, after_id, _session_cutoff(), reason="cleanup_scheduler"
+    )
+    return session_ids
+
+
+def _orphaned_questions_chunk(limit, after_id):
+    return delete_orphan_chunk(limit, after_id, _orphan_cutoff(), reason="cleanup_scheduler")
+
+
+def _generation_jobs_chunk(limit, after_id):
+    return purge_generation_jobs_chunk(limit, after_id, _job_cutoff())
+
+
+def _generation_calls_chunk(limit, after_id):
+    return purge_generation_calls_chunk(limit, after_id, _call_cutoff())
+
+
+CLEANUP_TASKS = {
+    "abandoned_sessions": _abandoned_sessions_chunk,
+    "orphaned_questions": _orphaned_questions_chunk,
+    "generation_jobs": _generation_jobs_chunk,
+    "generation_calls": _generation_calls_chunk,
+}
+
+CLEANUP_BACKLOGS = {
+    "abandoned_sessions": lambda: abandoned_sessions(_session_cutoff()),
+    "orphaned_questions": lambda: orphaned_questions(created_before=_orphan_cutoff()),
+    "generation_jobs": lambda: finished_generation_jobs(_job_cutoff()),
+    "generation_calls": lambda: expired_generation_calls(_call_cutoff()),
+}
+
+
+class CleanupScheduler:
+
+    def __init__(
+        self,
+        tasks=None,
+        chunk_size=CLEANUP_SCHEDULER_CHUNK_SIZE,
+        rows_per_second=CLEANUP_SCHEDULER_ROWS_PER_SECOND,
+        max_lock_ms=CLEANUP_SCHEDULER_MAX_LOCK_MS,
+        idle_seconds=CLEANUP_SCHEDULER_IDLE_SECONDS,
+    ):
+        self.tasks = list(tasks or CLEANUP_TASKS)
+        unknown = set(self.tasks) - set(CLEANUP_TASKS)
+        if unknown:
+            raise ValueError(f"Unknown cleanup tasks: {', '.join(sorted(unknown))}")
+        self.chunk_size = max(CLEANUP_SCHEDULER_MIN_CHUNK_SIZE, chunk_size)
+        self.rows_per_second = max(0, rows_per_second)
+        self.max_lock_ms = max(1, max_lock_ms)
+        self.idle_seconds = max(0, idle_seconds)
+        self._stopping = threading.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    @property
+    def stopping(self):
+        return self._stopping.is_set()
+
+    def _cursor(self, task):
+        cursor, _ = CleanupCursor.objects.get_or_create(
+            task=task, defaults={"chunk_size": self.chunk_size}
+        )
+        if not cursor.chunk_size or cursor.chunk_size > self.chunk_size:
+            cursor.chunk_size = self.chunk_size
+        return cursor
+
+    def _set_lock_timeout(self):
+        # Never queue behind user traffic for longer than one chunk may hold locks.
+        with connection.cursor() as db_cursor:
+            db_cursor.execute("SET LOCAL lock_timeout = %s", [f"{self.max_lock_ms}ms"])
+
+    def _next_chunk_size(self, limit, rows, elapsed_ms):
+        if elapsed_ms > self.max_lock_ms:
+            return max(CLEANUP_SCHEDULER_MIN_CHUNK_SIZE, limit // 2)
+        if rows >= limit and elapsed_ms < self.max_lock_ms / 4:
+            return min(self.chunk_size, limit * 2)
+        return limit
+
+    def run_chunk(self, task):
+        cursor = self._cursor(task)
+        limit = cursor.chunk_size
+        if cursor.pass_started_at is None:
+            cursor.pass_started_at = timezone.now()
+        started = time.monotonic()
+
+        try:
+            with transaction.atomic():
+                self._set_lock_timeout()
+                processed_ids = CLEANUP_TASKS[task](limit, cursor.last_id)
+                elapsed = time.monotonic() - started
+                self._record_chunk(cursor, limit, processed_ids, elapsed)
+        except DatabaseError as e:
+            elapsed = time.monotonic() - started
+            cursor.errors += 1
+            cursor.last_error = str(e)[:500]
+            cursor.chunk_size = max(CLEANUP_SCHEDULER_MIN_CHUNK_SIZE, limit // 2)
+            cursor.save()
+            logger.warning(f"Cleanup chunk for {task} failed after {elapsed * 1000:.0f} ms: {e}")
+            return 0, elapsed, "failed"
+
+        return len(processed_ids), elapsed, "pass_done" if len(processed_ids) < limit else "chunk"
+
+    def _record_chunk(self, cursor, limit, processed_ids, elapsed):
+        rows = len(processed_ids)
+        elapsed_ms = elapsed * 1000
+        cursor.last_chunk_rows = rows
+        cursor.last_chunk_ms = round(elapsed_ms, 2)
+        cursor.processed_total += rows
+        cursor.pass_processed += rows
+        if rows and elapsed > 0:
+            current = rows / elapsed
+            cursor.rows_per_second = round(
+                current if not cursor.rows_per_second
+                else (1 - THROUGHPUT_SMOOTHING) * cursor.rows_per_second + THROUGHPUT_SMOOTHING * current,
+                2,
+            )
+        cursor.chunk_size = self._next_chunk_size(limit, rows, elapsed_ms)
+
+        if rows < limit:
+            logger.info(
+                f"Cleanup pass of {cursor.task} finished: {cursor.pass_processed} rows "
+                f"since {cursor.pass_started_at:%Y-%m-%d %H:%M:%S}"
+            )
+            cursor.passes_completed += 1
+            cursor.last_id = 0
+            cursor.pass_processed = 0
+            cursor.pass_started_at = None
+        else:
+            cursor.last_id = max(processed_ids)
+            logger.debug(
+                f"Cleanup chunk of {cursor.task}: {rows} rows in {elapsed_ms:.0f} ms "
+                f"(cursor={cursor.last_id}, next chunk={cursor.chunk_size})"
+            )
+        cursor.save()
+
+    def _pace(self, rows, elapsed):
+        if not self.rows_per_second or not rows:
+            return
+        delay = rows / self.rows_per_second - elapsed
+        if delay > 0:
+            self._stopping.wait(delay)
+
+    def run(self, once=False):
+        pending = set(self.tasks)
+        while not self.stopping:
+            idle = True
+            for task in self.tasks:
+                if self.stopping or (once and task not in pending):
+                    continue
+                rows, elapsed, status = self.run_chunk(task)
+                if status == "pass_done" or (once and status == "failed"):
+                    pending.discard(task)
+                if rows:
+                    idle = False
+                self._pace(rows, elapsed)
+            if once and not pending:
+                break
+            if idle:
+                self._stopping.wait(self.idle_seconds)
+
+
+def cleanup_metrics(include_backlog=True):
+    cursors = {cursor.task: cursor for cursor in CleanupCursor.objects.filter(task__in=CLEANUP_TASKS)}
+    metrics = []
+    for task in CLEANUP_TASKS:
+        cursor = cursors.get(task) or CleanupCursor(task=task)
+        entry = {
+            "task": task,
+            "cursor": cursor.last_id,
+            "chunk_size": cursor.chunk_size,
+            "processed_total": cursor.processed_total,
+            "pass_processed": cursor.pass_processed,
+            "passes_completed": cursor.passes_completed,
+            "last_chunk_rows": cursor.last_chunk_rows,
+            "last_chunk_ms": cursor.last_chunk_ms,
+            "rows_per_second": cursor.rows_per_second,
+            "errors": cursor.errors,
+            "last_error": cursor.last_error,
+            "pass_started_at": cursor.pass_started_at,
+            "updated_at": cursor.updated_at,
+        }
+        if include_backlog:
+            entry["backlog"] = CLEANUP_BACKLOGS[task]().count()
+        metrics.append(entry)
+    return metrics
@@ -1,59 +1,116 @@
 import logging
 
-from ..models import Answer, Question, QuizSessionQuestion
+from django.db import connection, transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Sum
 
-logger = logging.getLogger(__name__)
+from cache_manager import CacheVersionService
+from users.models import UserProfile
+from ..models import Answer, Question, QuizSession, QuizSessionQuestion
+from ..utils.constants import (
+    CLEANUP_DELETE_BATCH_SIZE,
+    HISTORY_VERSION_SCOPE,
+    LEADERBOARD_VERSION_SCOPE,
+    QUESTIONS_VERSION_SCOPE,
+    USER_VERSION_SCOPE,
+)
+from .history_service import invalidate_question_snapshots
 
+logger = logging.getLogger(__name__)
 
-def cleanup_orphaned_questions(question_ids, reason="cleanup"):
-    if not question_ids:
-        return 0
 
-    orphaned_questions = Question.objects.filter(
-        id__in=question_ids,
-        total_answers=0,
+def orphaned_questions(question_ids=None, created_before=None):
+    active_usage = QuizSessionQuestion.objects.filter(
+        question=OuterRef("pk"),
+        session__is_completed=False,
     )
+    # total_answers can lag behind Answer rows; those questions go through
+    # delete_question_answers, which keeps session totals and history in step.
+    answered = Answer.objects.filter(question=OuterRef("pk"))
+    queryset = Question.objects.filter(total_answers=0).filter(~Exists(active_usage), ~Exists(answered))
+    if question_ids is not None:
+        queryset = queryset.filter(id__in=question_ids)
+    if created_before is not None:
+        queryset = queryset.filter(created_at__lt=created_before)
+    return queryset
+
+
+def _delete_orphan_batch(candidates, limit):
+    # One statement per batch: pick unlocked, unanswered orphans and drop them
+    # together with their links from completed sessions (FKs are deferred until commit).
+    quote = connection.ops.quote_name
+    with transaction.atomic():
+        doomed_sql, params = (
+            candidates.order_by("id")
+            .select_for_update(skip_locked=True)
+            .values("id")[:limit]
+            .query.sql_with_params()
+        )
+        sql = (
+            f"WITH doomed AS ({doomed_sql}), "
+            f"links AS (DELETE FROM {quote(QuizSessionQuestion._meta.db_table)} "
+            f"WHERE question_id IN (SELECT id FROM doomed)) "
+            f"DELETE FROM {quote(Question._meta.db_table)} WHERE id IN (SELECT id FROM doomed) "
+            f"RETURNING id"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
 
+
+def delete_orphaned_questions(
+    question_ids=None,
+    created_before=None,
+    batch_size=CLEANUP_DELETE_BATCH_SIZE,
+    reason="cleanup",
+):
+    batch_size = max(1, batch_size)
     deleted_count = 0
-    for orphan_q in orphaned_questions:
-        used_in_active = QuizSessionQuestion.objects.filter(
-            question=orphan_q,
-            session__is_completed=False,
-        ).exists()
-
-        if not used_in_active:
-            logger.info(
-                "Deleting orphaned Question ID=%s (reason=%s)",
-                orphan_q.id,
-                reason,
-            )
-            orphan_q.delete()
-            deleted_count += 1
-        else:
-            logger.debug(
-                "Keeping Question ID=%s (used in active session)",
-                orphan_q.id,
-            )
 
+    if question_ids is not None:
+        question_ids = list(question_ids)
+        for start in range(0, len(question_ids), batch_size):
+            chunk = question_ids[start:start + batch_size]
+            deleted_count += len(_delete_orphan_batch(
+                orphaned_questions(chunk, created_before), len(chunk)
+            ))
+    else:
+        while True:
+            deleted = len(_delete_orphan_batch(orphaned_questions(None, created_before), batch_size))
+            deleted_count += deleted
+            if deleted < batch_size:
+                break
+
+    if deleted_count:
+        CacheVersionService.bump_version(QUESTIONS_VERSION_SCOPE)
+        logger.info("Deleted %s orphaned questions (reason=%s)", deleted_count, reason)
     return deleted_count
 
 
+def delete_orphan_chunk(limit, after_id=0, created_before=None, reason="cleanup_job"):
+    candidates = orphaned_questions(created_before=created_before).filter(id__gt=after_id)
+    deleted_ids = _delete_orphan_batch(candidates, limit)
+    if deleted_ids:
+        CacheVersionService.bump_version(QUESTIONS_VERSION_SCOPE)
+        logger.debug("Deleted %s orphaned questions (reason=%s)", len(deleted_ids), reason)
+    return deleted_ids
+
+
+def cleanup_orphaned_questions(question_ids, reason="cleanup"):
+    if not question_ids:
+        return 0
+    return delete_orphaned_questions(question_ids, reason=reason)
+
+
 def cleanup_rejected_question(question, reason="duplicate"):
     if question.total_answers != 0:
         return False
 
-    used_in_active = QuizSessionQuestion.objects.filter(
-        question=question,
-        session__is_completed=False,
-    ).exists()
-
-    if not used_in_active:
+    if delete_orphaned_questions([question.id], reason=reason):
         logger.debug(
-            "Deleting orphaned question %s (reason=%s)",
+            "Deleted orphaned question %s (reason=%s)",
             question.id,
             reason,
         )
-        question.delete()
         return True
 
     logger.debug(
@@ -89,61 +146,119 @@ def cleanup_unused_session_questions(session):
     return unused_count, deleted_orphans
 
 
-def rollback_session(session):
-    answers = list(
-        Answer.objects.filter(session=session).select_related('question')
+def delete_question_answers(question):
+    invalidate_question_snapshots(question)
+    session_totals = (
+        Answer.objects.filter(question=question, session__isnull=False)
+        .values('session_id', 'session__user_id')
+        .annotate(answers=Count('id'), response_time=Sum('response_time'))
     )
+    affected_users = set()
+    for row in session_totals:
+        QuizSession.objects.filter(pk=row['session_id']).update(
+            answers_count=F('answers_count') - row['answers'],
+            total_response_time=F('total_response_time') - (row['response_time'] or 0.0),
+        )
+        affected_users.add(row['session__user_id'])
+    CacheVersionService.bump_versions(
+        HISTORY_VERSION_SCOPE.format(user_id=user_id) for user_id in affected_users
+    )
+    return Answer.objects.filter(question=question).delete()[0]
+
 
-    total_answers_delta = len(answers)
-    total_correct_delta = sum(1 for ans in answers if ans.is_correct)
-
-    for ans in answers:
-        question = ans.question
-        if question.total_answers > 0:
-            question.total_answers = max(0, question.total_answers - 1)
-        if ans.is_correct and question.correct_answers_count > 0:
-            question.correct_answers_count = max(
-                0, question.correct_answers_count - 1
-            )
-        question.times_used = question.total_answers
-        question.save(update_fields=['total_answers', 'correct_answers_count', 'times_used'])
-
-    Answer.objects.filter(session=session).delete()
-
-    session_question_ids = list(
-        QuizSessionQuestion.objects.filter(session=session)
-        .values_list('question_id', flat=True)
+def _rollback_question_stats(answers):
+    # One UPDATE ... FROM for every question touched by the answers; deltas are
+    # aggregated in SQL so concurrent answerers never lose increments.
+    quote = connection.ops.quote_name
+    deltas_sql, params = (
+        answers.order_by()
+        .values("question_id")
+        .annotate(answered=Count("id"), correct=Count("id", filter=Q(is_correct=True)))
+        .query.sql_with_params()
     )
-    QuizSessionQuestion.objects.filter(session=session).delete()
+    remaining = "GREATEST(q.total_answers - d.answered, 0)"
+    remaining_correct = "GREATEST(q.correct_answers_count - d.correct, 0)"
+    sql = (
+        f"UPDATE {quote(Question._meta.db_table)} AS q SET "
+        f"total_answers = {remaining}, "
+        f"correct_answers_count = {remaining_correct}, "
+        f"times_used = {remaining}, "
+        f"success_rate = COALESCE(ROUND(100.0 * {remaining_correct} / NULLIF({remaining}, 0), 1), 0) "
+        f"FROM ({deltas_sql}) AS d WHERE q.id = d.question_id"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
 
-    if session_question_ids:
-        orphaned_questions = Question.objects.filter(
-            id__in=session_question_ids,
-            total_answers=0,
-        )
 
-        for orphan_q in orphaned_questions:
-            used_in_active = QuizSessionQuestion.objects.filter(
-                question=orphan_q,
-                session__is_completed=False,
-            ).exists()
-
-            if not used_in_active:
-                logger.info(
-                    "Deleting orphaned Question ID=%s (session rollback)",
-                    orphan_q.id,
-                )
-                orphan_q.delete()
-
-    profile = session.user.profile
-    profile.total_questions_answered = max(
-        0, profile.total_questions_answered - total_answers_delta
+def _rollback_profile_stats(answers):
+    quote = connection.ops.quote_name
+    deltas_sql, params = (
+        answers.order_by()
+        .values("session__user_id")
+        .annotate(answered=Count("id"), correct=Count("id", filter=Q(is_correct=True)))
+        .query.sql_with_params()
     )
-    profile.total_correct_answers = max(
-        0, profile.total_correct_answers - total_correct_delta
+    sql = (
+        f"UPDATE {quote(UserProfile._meta.db_table)} AS p SET "
+        f"total_questions_answered = GREATEST(p.total_questions_answered - d.answered, 0), "
+        f"total_correct_answers = GREATEST(p.total_correct_answers - d.correct, 0) "
+        f"FROM ({deltas_sql}) AS d WHERE p.user_id = d.user_id RETURNING p.user_id"
     )
-    profile.save(update_fields=['total_questions_answered', 'total_correct_answers'])
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return {row[0] for row in cursor.fetchall()}
+
 
-    session.delete()
+def rollback_sessions(session_ids, reason="session_rollback"):
+    session_ids = list(session_ids)
+    if not session_ids:
+        return {"sessions": 0, "answers": 0, "questions": 0, "orphans": 0}
 
+    with transaction.atomic():
+        answers = Answer.objects.filter(session_id__in=session_ids)
+        updated_questions = _rollback_question_stats(answers)
+        affected_users = _rollback_profile_stats(answers)
+        deleted_answers = answers.delete()[0]
 
+        links = QuizSessionQuestion.objects.filter(session_id__in=session_ids)
+        session_question_ids = list(links.values_list("question_id", flat=True).distinct())
+        links.delete()
+
+        deleted_orphans = cleanup_orphaned_questions(session_question_ids, reason=reason)
+        deleted_sessions = QuizSession.objects.filter(id__in=session_ids).delete()[1].get(
+            QuizSession._meta.label, 0
+        )
+
+    if updated_questions:
+        CacheVersionService.bump_version(QUESTIONS_VERSION_SCOPE)
+    scopes = [USER_VERSION_SCOPE.format(user_id=user_id) for user_id in affected_users]
+    if scopes:
+        CacheVersionService.bump_versions(scopes + [LEADERBOARD_VERSION_SCOPE])
+    return {
+        "sessions": deleted_sessions,
+        "answers": deleted_answers,
+        "questions": updated_questions,
+        "orphans": deleted_orphans,
+    }
+
+
+def abandoned_sessions(started_before):
+    return QuizSession.objects.filter(is_completed=False, started_at__lt=started_before)
+
+
+def rollback_abandoned_chunk(limit, after_id=0, started_before=None, reason="cleanup_job"):
+    with transaction.atomic():
+        session_ids = list(
+            abandoned_sessions(started_before)
+            .filter(id__gt=after_id)
+            .select_for_update(skip_locked=True)
+            .order_by("id")
+            .values_list("id", flat=True)[:limit]
+        )
+        result = rollback_sessions(session_ids, reason=reason)
+    return session_ids, result
+
+
+def rollback_session(session):
+    return rollback_sessions([session.id])
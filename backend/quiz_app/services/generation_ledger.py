@@ -0,0 +1,166 @@
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from functools import reduce
+from operator import or_
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+
+from cache_manager import CacheLease, LeaseUnavailable
+
+from ..models import QuizSessionQuestion
+from ..utils.constants import (
+    GENERATION_LEASE_TTL_SECONDS,
+    GENERATION_LEASE_WAIT_SECONDS,
+    GENERATION_LEDGER_TTL_SECONDS,
+    GENERATION_RESERVATION_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationSlots:
+
+    def __init__(self, session_id, token, count, start_order):
+        self.session_id = session_id
+        self.token = token
+        self.count = count
+        self.start_order = start_order
+        self.added = 0
+        self.committed = None
+
+    @property
+    def order(self):
+        return self.start_order + self.added
+
+    @property
+    def remaining(self):
+        return self.count - self.added
+
+    @property
+    def full(self):
+        return self.added >= self.count
+
+
+def ledger_key(session_id):
+    return f'generation_ledger:{session_id}'
+
+
+def _lease(session_id):
+    return CacheLease(
+        ledger_key(session_id),
+        ttl=GENERATION_LEASE_TTL_SECONDS,
+        wait=GENERATION_LEASE_WAIT_SECONDS,
+    )
+
+
+def _count_session_questions(session_id, reservations):
+    # Rows already written inside a live reservation's order range are counted
+    # once, as in flight, so a generator that is half done is not double booked.
+    aggregates = {'total': Count('id'), 'last_order': Max('order')}
+    ranges = [
+        Q(order__gte=start_order, order__lt=start_order + count)
+        for count, _, start_order in reservations.values()
+    ]
+    if ranges:
+        aggregates['reserved'] = Count('id', filter=reduce(or_, ranges))
+    stats = QuizSessionQuestion.objects.filter(session_id=session_id).aggregate(**aggregates)
+    stats.setdefault('reserved', 0)
+    return stats
+
+
+def _load_ledger(session, now):
+    # Only reservations and the order cursor live in the cache; committed is
+    # recounted under the lease so deleted session questions free their slots.
+    ledger = cache.get(ledger_key(session.id)) or {'next_order': 0, 'reservations': {}}
+    # Reservations of crashed generators expire instead of blocking the session.
+    ledger['reservations'] = {
+        token: reservation
+        for token, reservation in ledger['reservations'].items()
+        if reservation[1] > now
+    }
+    return _recount(session, ledger)
+
+
+def _recount(session, ledger):
+    stats = _count_session_questions(session.id, ledger['reservations'])
+    ledger['target'] = session.questions_count
+    ledger['committed'] = stats['total'] - stats['reserved']
+    ledger['written'] = stats['reserved']
+    if stats['last_order'] is not None:
+        ledger['next_order'] = max(ledger['next_order'], stats['last_order'] + 1)
+    return ledger
+
+
+def _store_ledger(session, ledger):
+    cache.set(
+        ledger_key(session.id),
+        {'next_order': ledger['next_order'], 'reservations': ledger['reservations']},
+        timeout=GENERATION_LEDGER_TTL_SECONDS,
+    )
+
+
+def _in_flight(ledger):
+    return sum(reservation[0] for reservation in ledger['reservations'].values()) - ledger['written']
+
+
+def reserve_generation(session, wanted, min_order=0):
+    now = time.time()
+    token = uuid.uuid4().hex
+    with _lease(session.id):
+        ledger = _load_ledger(session, now)
+        available = ledger['target'] - ledger['committed'] - _in_flight(ledger)
+        granted = max(0, min(wanted, available))
+        start_order = max(ledger['next_order'], min_order)
+        if granted:
+            ledger['reservations'][token] = [granted, now + GENERATION_RESERVATION_TTL_SECONDS, start_order]
+            ledger['next_order'] = start_order + granted
+        _store_ledger(session, ledger)
+
+    logger.debug(
+        "Session %s: reserved %s/%s generation slots at order %s (committed=%s, in_flight=%s)",
+        session.id,
+        granted,
+        wanted,
+        start_order,
+        ledger['committed'],
+        _in_flight(ledger),
+    )
+    return GenerationSlots(session.id, token, granted, start_order)
+
+
+def release_generation(session, slots):
+    try:
+        with _lease(session.id):
+            ledger = _load_ledger(session, time.time())
+            if ledger['reservations'].pop(slots.token, None) is not None:
+                ledger = _recount(session, ledger)
+            _store_ledger(session, ledger)
+    except LeaseUnavailable as e:
+        # The reservation expires on its own and its written rows are counted
+        # from the database, so nothing is lost by leaving the ledger alone.
+        logger.warning("Session %s: could not release generation slots: %s", session.id, e)
+        return None
+    return ledger['committed']
+
+
+@contextmanager
+def generation_slots(session, wanted, min_order=0):
+    slots = reserve_generation(session, wanted, min_order)
+    try:
+        yield slots
+    finally:
+        if slots.count:
+            slots.committed = release_generation(session, slots)
+
+
+def generation_ledger_state(session):
+    ledger = _load_ledger(session, time.time())
+    return {
+        'target': ledger['target'],
+        'committed': ledger['committed'],
+        'in_flight': _in_flight(ledger),
+        'next_order': ledger['next_order'],
+    }
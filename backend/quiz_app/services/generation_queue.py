@@ -0,0 +1,312 @@
+import logging
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+from ..models import GenerationJob
+from ..utils.constants import (
+    GENERATION_JOB_BACKOFF_SECONDS,
+    GENERATION_JOB_MAX_ATTEMPTS,
+    GENERATION_JOB_STALE_SECONDS,
+    GENERATION_MAX_RUNNING_BY_PRIORITY,
+    GENERATION_PREEMPT_DELAY_SECONDS,
+    GENERATION_QUEUE_MAX_DEPTH,
+    GENERATION_QUEUE_STATS_WINDOW_MINUTES,
+    GENERATION_THROTTLED_PRIORITY,
+    GENERATION_URGENT_PRIORITY,
+    GENERATION_URGENT_WINDOW_SECONDS,
+)
+from ..utils.helpers import percentile
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_CLASS_NAMES = {
+    GenerationJob.PRIORITY_SESSION_START: 'session_start',
+    GenerationJob.PRIORITY_SHORTFALL: 'shortfall',
+    GenerationJob.PRIORITY_LEVEL_CHANGE: 'level_change',
+    GenerationJob.PRIORITY_PREGENERATE: 'pregenerate',
+    GenerationJob.PRIORITY_BACKGROUND_FILL: 'background_fill',
+}
+
+
+class GenerationPreempted(Exception):
+    pass
+
+
+def queued_jobs():
+    return GenerationJob.objects.filter(status=GenerationJob.STATUS_QUEUED)
+
+
+def enqueue_generation_job(kind, session_id, **payload):
+    # A job still waiting for the same session and kind takes the newest
+    # payload instead of queueing a second run.
+    existing = queued_jobs().filter(session_id=session_id, kind=kind).order_by('id').first()
+    if existing is not None:
+        if existing.payload != payload:
+            GenerationJob.objects.filter(pk=existing.pk).update(payload=payload)
+            existing.payload = payload
+        logger.debug("Generation job %s for session %s already queued (job %s)", kind, session_id, existing.id)
+        return existing
+
+    depth = queued_jobs().count()
+    if depth >= GENERATION_QUEUE_MAX_DEPTH:
+        logger.warning(
+            "Generation queue full (%s jobs), dropping %s for session %s",
+            depth,
+            kind,
+            session_id,
+        )
+        return None
+
+    job = GenerationJob.objects.create(
+        session_id=session_id,
+        kind=kind,
+        priority=GenerationJob.KIND_PRIORITIES[kind],
+        payload=payload,
+        max_attempts=GENERATION_JOB_MAX_ATTEMPTS,
+    )
+    logger.debug("Queued generation job %s (%s) for session %s", job.id, kind, session_id)
+    return job
+
+
+@contextmanager
+def inline_generation_job(kind, session_id, **payload):
+    # Synchronous generation is recorded in the queue table as well, so that
+    # workers can yield to it and its latency shows up next to queued classes.
+    now = timezone.now()
+    job = GenerationJob.objects.create(
+        session_id=session_id,
+        kind=kind,
+        priority=GenerationJob.KIND_PRIORITIES[kind],
+        payload=payload,
+        status=GenerationJob.STATUS_RUNNING,
+        attempts=1,
+        max_attempts=1,
+        run_after=now,
+        started_at=now,
+        worker='inline',
+    )
+    succeeded = False
+    try:
+        yield job
+        succeeded = True
+    finally:
+        GenerationJob.objects.filter(pk=job.pk).update(
+            status=GenerationJob.STATUS_DONE if succeeded else GenerationJob.STATUS_FAILED,
+            finished_at=timezone.now(),
+        )
+
+
+def urgent_generation_active():
+    return GenerationJob.objects.filter(
+        status=GenerationJob.STATUS_RUNNING,
+        priority__lte=GENERATION_URGENT_PRIORITY,
+        started_at__gte=timezone.now() - timedelta(seconds=GENERATION_URGENT_WINDOW_SECONDS),
+    ).exists()
+
+
+def should_yield_generation(priority):
+    return priority >= GENERATION_THROTTLED_PRIORITY and urgent_generation_active()
+
+
+def throttled_priorities():
+    blocked = set()
+    if urgent_generation_active():
+        blocked.update(p for p in PRIORITY_CLASS_NAMES if p >= GENERATION_THROTTLED_PRIORITY)
+    running = dict(
+        GenerationJob.objects.filter(
+            status=GenerationJob.STATUS_RUNNING,
+            priority__in=list(GENERATION_MAX_RUNNING_BY_PRIORITY),
+        ).order_by().values_list('priority').annotate(count=Count('id'))
+    )
+    blocked.update(
+        priority for priority, limit in GENERATION_MAX_RUNNING_BY_PRIORITY.items()
+        if running.get(priority, 0) >= limit
+    )
+    return blocked
+
+
+def claim_generation_jobs(worker, limit=1):
+    now = timezone.now()
+    blocked = throttled_priorities()
+    if len(blocked) == len(PRIORITY_CLASS_NAMES):
+        return []
+    with transaction.atomic():
+        jobs = list(
+            queued_jobs()
+            .filter(run_after__lte=now)
+            .exclude(priority__in=blocked)
+            .select_for_update(skip_locked=True)
+            .order_by('priority', 'run_after', 'id')[:limit]
+        )
+        if not jobs:
+            return []
+        GenerationJob.objects.filter(id__in=[job.id for job in jobs]).update(
+            status=GenerationJob.STATUS_RUNNING,
+            started_at=now,
+            attempts=F('attempts') + 1,
+            worker=worker[:100],
+        )
+    for job in jobs:
+        job.status = GenerationJob.STATUS_RUNNING
+        job.started_at = now
+        job.attempts += 1
+        job.worker = worker[:100]
+    return jobs
+
+
+def complete_generation_job(job):
+    job.status = GenerationJob.STATUS_DONE
+    job.finished_at = timezone.now()
+    job.last_error = ''
+    job.save(update_fields=['status', 'finished_at', 'last_error'])
+
+
+def preempt_generation_job(job, reason):
+    job.status = GenerationJob.STATUS_QUEUED
+    job.attempts = max(0, job.attempts - 1)
+    job.run_after = timezone.now() + timedelta(seconds=GENERATION_PREEMPT_DELAY_SECONDS)
+    job.save(update_fields=['status', 'attempts', 'run_after'])
+    logger.info("Generation job %s (%s) preempted: %s", job.id, job.kind, reason)
+
+
+def retry_delay(attempts):
+    base = GENERATION_JOB_BACKOFF_SECONDS * 2 ** max(0, attempts - 1)
+    return base + random.uniform(0, GENERATION_JOB_BACKOFF_SECONDS)
+
+
+def fail_generation_job(job, error):
+    job.last_error = str(error)[:1000]
+    if job.attempts < job.max_attempts:
+        job.status = GenerationJob.STATUS_QUEUED
+        job.run_after = timezone.now() + timedelta(seconds=retry_delay(job.attempts))
+        logger.warning(
+            "Generation job %s failed (attempt %s/%s), retrying at %s: %s",
+            job.id,
+            job.attempts,
+            job.max_attempts,
+            job.run_after,
+            error,
+        )
+    else:
+        job.status = GenerationJob.STATUS_FAILED
+        job.finished_at = timezone.now()
+        logger.error("Generation job %s failed permanently after %s attempts: %s", job.id, job.attempts, error)
+    job.save(update_fields=['status', 'run_after', 'finished_at', 'last_error'])
+
+
+def requeue_stale_generation_jobs():
+    # Jobs left running by a worker that died are retried (or failed once
+    # they ran out of attempts) instead of being lost.
+    now = timezone.now()
+    stale = GenerationJob.objects.filter(
+        status=GenerationJob.STATUS_RUNNING,
+        started_at__lt=now - timedelta(seconds=GENERATION_JOB_STALE_SECONDS),
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=GenerationJob.STATUS_FAILED,
+        finished_at=now,
+        last_error='Worker lost while running the job',
+    )
+    requeued = stale.update(status=GenerationJob.STATUS_QUEUED, run_after=now)
+    if failed or requeued:
+        logger.warning("Recovered stale generation jobs: %s requeued, %s failed", requeued, failed)
+    return requeued, failed
+
+
+def finished_generation_jobs(finished_before):
+    return GenerationJob.objects.filter(
+        status__in=[GenerationJob.STATUS_DONE, GenerationJob.STATUS_FAILED],
+        finished_at__lt=finished_before,
+    )
+
+
+def purge_generation_jobs_chunk(limit, after_id=0, finished_before=None):
+    job_ids = list(
+        finished_generation_jobs(finished_before)
+        .filter(id__gt=after_id)
+        .order_by('id')
+        .values_list('id', flat=True)[:limit]
+    )
+    if job_ids:
+        GenerationJob.objects.filter(id__in=job_ids).delete()
+    return job_ids
+
+
+def _latency_summary(values):
+    if not values:
+        return {'avg': None, 'p50': None, 'p95': None, 'max': None}
+    return {
+        'avg': round(sum(values) / len(values), 1),
+        'p50': round(percentile(values, 50), 1),
+        'p95': round(percentile(values, 95), 1),
+        'max': round(max(values), 1),
+    }
+
+
+def generation_queue_stats():
+    now = timezone.now()
+    by_status = dict(
+        GenerationJob.objects.order_by().values_list('status').annotate(count=Count('id'))
+    )
+    queued_by_kind = dict(
+        queued_jobs().order_by().values_list('kind').annotate(count=Count('id'))
+    )
+    oldest = queued_jobs().aggregate(oldest=Min('created_at'))['oldest']
+
+    window_start = now - timedelta(minutes=GENERATION_QUEUE_STATS_WINDOW_MINUTES)
+    finished = list(
+        GenerationJob.objects.filter(
+            status__in=[GenerationJob.STATUS_DONE, GenerationJob.STATUS_FAILED],
+            finished_at__gte=window_start,
+        ).values_list('status', 'priority', 'created_at', 'started_at', 'finished_at')
+    )
+    worker_rows = [row for row in finished if row[1] > GENERATION_URGENT_PRIORITY]
+    wait_ms = [
+        (started - created).total_seconds() * 1000
+        for _, _, created, started, _ in worker_rows if started
+    ]
+    run_ms = [
+        (done - started).total_seconds() * 1000
+        for _, _, _, started, done in worker_rows if started and done
+    ]
+
+    pending_by_priority = {
+        (status_name, priority): count
+        for status_name, priority, count in GenerationJob.objects.filter(
+            status__in=[GenerationJob.STATUS_QUEUED, GenerationJob.STATUS_RUNNING]
+        ).order_by().values_list('status', 'priority').annotate(count=Count('id'))
+    }
+    classes = {}
+    for priority, name in PRIORITY_CLASS_NAMES.items():
+        rows = [row for row in finished if row[1] == priority]
+        classes[name] = {
+            'priority': priority,
+            'queued': pending_by_priority.get((GenerationJob.STATUS_QUEUED, priority), 0),
+            'running': pending_by_priority.get((GenerationJob.STATUS_RUNNING, priority), 0),
+            'completed': sum(1 for row in rows if row[0] == GenerationJob.STATUS_DONE),
+            'failed': sum(1 for row in rows if row[0] == GenerationJob.STATUS_FAILED),
+            'latency_ms': _latency_summary([
+                (done - created).total_seconds() * 1000 for _, _, created, _, done in rows if done
+            ]),
+        }
+
+    return {
+        'depth': by_status.get(GenerationJob.STATUS_QUEUED, 0),
+        'max_depth': GENERATION_QUEUE_MAX_DEPTH,
+        'running': by_status.get(GenerationJob.STATUS_RUNNING, 0),
+        'queued_by_kind': queued_by_kind,
+        'oldest_queued_seconds': round((now - oldest).total_seconds(), 1) if oldest else 0,
+        'window_minutes': GENERATION_QUEUE_STATS_WINDOW_MINUTES,
+        'completed': sum(1 for row in worker_rows if row[0] == GenerationJob.STATUS_DONE),
+        'failed': sum(1 for row in worker_rows if row[0] == GenerationJob.STATUS_FAILED),
+        'wait_ms': _latency_summary(wait_ms),
+        'run_ms': _latency_summary(run_ms),
+        'urgent_active': urgent_generation_active(),
+        'throttled_classes': sorted(PRIORITY_CLASS_NAMES[p] for p in throttled_priorities()),
+        'classes': classes,
+    }
@@ -0,0 +1,163 @@
+import logging
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import DatabaseError, IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from llm_integration.telemetry import collect_call_telemetry
+
+from ..models import GenerationCall, GenerationUsageDaily
+from .acceptance_estimator import observe_call
+
+logger = logging.getLogger(__name__)
+
+REJECTION_FIELDS = {
+    'validation': 'rejected_validation',
+    'unparseable': 'rejected_unparseable',
+    'session_duplicate': 'rejected_session_duplicate',
+    'session_similar': 'rejected_session_similar',
+    'error': 'rejected_error',
+    'level_cleanup': 'rejected_level_cleanup',
+}
+
+USAGE_FIELDS = ('calls', *GenerationCall.COUNTER_FIELDS, 'cost_usd')
+
+
+@contextmanager
+def generation_telemetry(session, difficulty_text, requested):
+    # Wraps one generation call together with the loop that stores its questions,
+    # so session-level rejections land on the same record as the tokens spent.
+    with collect_call_telemetry(requested) as telemetry:
+        try:
+            yield telemetry
+        finally:
+            if telemetry.requests or telemetry.valid or telemetry.bank_fallback:
+                record_generation_call(session, difficulty_text, telemetry)
+                observe_call(session, difficulty_text, telemetry)
+
+
+def record_generation_call(session, difficulty_text, telemetry):
+    counters = {
+        'requests': telemetry.requests,
+        'latency_ms': round(telemetry.latency * 1000),
+        'prompt_tokens': telemetry.prompt_tokens,
+        'cached_tokens': telemetry.cached_tokens,
+        'completion_tokens': telemetry.completion_tokens,
+        'requested': telemetry.requested,
+        'returned': telemetry.returned,
+        'valid': telemetry.valid,
+        'added': telemetry.added,
+        'deduplicated': telemetry.deduplicated,
+        'unused': telemetry.unused,
+    }
+    for reason, field in REJECTION_FIELDS.items():
+        counters[field] = telemetry.rejections[reason]
+    return _append(GenerationCall(
+        session=session,
+        user_id=session.user_id,
+        topic=session.topic,
+        difficulty_level=difficulty_text or '',
+        knowledge_level=session.knowledge_level or '',
+        model=telemetry.model,
+        bank_fallback=telemetry.bank_fallback,
+        cost_usd=telemetry.cost,
+        **counters,
+    ))
+
+
+def record_level_cleanup(session, difficulty_level, count):
+    return _append(GenerationCall(
+        kind=GenerationCall.KIND_LEVEL_CLEANUP,
+        session=session,
+        user_id=session.user_id,
+        topic=session.topic,
+        difficulty_level=difficulty_level or '',
+        knowledge_level=session.knowledge_level or '',
+        rejected_level_cleanup=count,
+    ))
+
+
+def _append(call):
+    # Telemetry must never fail the generation it describes.
+    try:
+        with transaction.atomic():
+            call.save()
+            _roll_up(call)
+    except DatabaseError as e:
+        logger.warning(f"Could not record generation telemetry: {e}")
+        return None
+    return call
+
+
+def _roll_up(call):
+    key = {
+        'day': timezone.localdate(call.created_at),
+        'topic': call.topic,
+        'difficulty_level': call.difficulty_level,
+        'knowledge_level': call.knowledge_level,
+        'model': call.model,
+        'user_id': call.user_id,
+    }
+    values = {field: getattr(call, field) for field in GenerationCall.COUNTER_FIELDS}
+    values['calls'] = 1
+    values['cost_usd'] = call.cost_usd
+    increments = {field: F(field) + value for field, value in values.items()}
+
+    if GenerationUsageDaily.objects.filter(**key).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            GenerationUsageDaily.objects.create(**key, **values)
+    except IntegrityError:
+        GenerationUsageDaily.objects.filter(**key).update(**increments)
+
+
+def _summary(row):
+    summary = {field: row[field] for field in USAGE_FIELDS}
+    summary['cost_usd'] = round(float(row['cost_usd'] or 0), 6)
+    summary['rejections'] = {reason: row[field] for reason, field in REJECTION_FIELDS.items()}
+    summary['avg_latency_ms'] = round(row['latency_ms'] / row['requests']) if row['requests'] else None
+    summary['valid_rate'] = round(row['valid'] / row['returned'], 3) if row['returned'] else None
+    summary['acceptance_rate'] = round(row['added'] / row['requested'], 3) if row['requested'] else None
+    return summary
+
+
+def generation_usage_report(days=7, group_by='topic', limit=50):
+    since = timezone.localdate() - timedelta(days=max(1, days) - 1)
+    usage = GenerationUsageDaily.objects.filter(day__gte=since)
+    sums = {field: Sum(field) for field in USAGE_FIELDS}
+
+    group_fields = ['user_id', 'user__username'] if group_by == 'user' else ['topic']
+    groups = usage.values(*group_fields).annotate(**sums).order_by('-cost_usd', *group_fields)[:limit]
+    daily = usage.values('day').annotate(**sums).order_by('day')
+    totals = usage.aggregate(**sums)
+
+    return {
+        'since': since.isoformat(),
+        'group_by': 'user' if group_by == 'user' else 'topic',
+        'totals': _summary({field: totals[field] or 0 for field in USAGE_FIELDS}),
+        'groups': [
+            {**{field: row[field] for field in group_fields}, **_summary(row)}
+            for row in groups
+        ],
+        'daily': [{'day': row['day'].isoformat(), **_summary(row)} for row in daily],
+    }
+
+
+def expired_generation_calls(created_before):
+    return GenerationCall.objects.filter(created_at__lt=created_before)
+
+
+def purge_generation_calls_chunk(limit, after_id=0, created_before=None):
+    # Raw rows are only needed until the retention window passes; daily rollups stay.
+    call_ids = list(
+        expired_generation_calls(created_before)
+        .filter(id__gt=after_id)
+        .order_by('id')
+        .values_list('id', flat=True)[:limit]
+    )
+    if call_ids:
+        GenerationCall.objects.filter(id__in=call_ids).delete()
+    return call_ids
@@ -0,0 +1,127 @@
+import logging
+import os
+import socket
+import threading
+
+from django.db import DatabaseError, IntegrityError, close_old_connections
+from openai import OpenAIError
+
+from ..models import GenerationJob, QuizSession
+from ..utils.constants import GENERATION_JOB_POLL_SECONDS, GENERATION_WORKERS
+from .background_generation_service import BackgroundGenerationService
+from .generation_queue import (
+    GenerationPreempted,
+    claim_generation_jobs,
+    complete_generation_job,
+    fail_generation_job,
+    preempt_generation_job,
+    requeue_stale_generation_jobs,
+)
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {
+    GenerationJob.KIND_FILL_SESSION: 'generate_session_questions',
+    GenerationJob.KIND_LEVEL_CHANGE: 'generate_level_questions',
+    GenerationJob.KIND_PREGENERATE_LEVEL: 'pregenerate_level_questions',
+}
+
+RETRYABLE_ERRORS = (
+    DatabaseError, IntegrityError, OpenAIError, RuntimeError, TypeError, ValueError, KeyError,
+)
+
+
+class GenerationWorkerPool:
+
+    def __init__(self, workers=GENERATION_WORKERS, poll_seconds=GENERATION_JOB_POLL_SECONDS, name=None):
+        self.workers = max(1, workers)
+        self.poll_seconds = poll_seconds
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.generator = BackgroundGenerationService()
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def stop(self):
+        self._stopping.set()
+
+    def run_job(self, job):
+        handler = getattr(self.generator, JOB_HANDLERS[job.kind])
+        try:
+            session = QuizSession.objects.get(pk=job.session_id)
+        except QuizSession.DoesNotExist:
+            logger.info("Session %s is gone, dropping generation job %s", job.session_id, job.id)
+            return False
+
+        try:
+            handler(session, **job.payload)
+        except GenerationPreempted as e:
+            preempt_generation_job(job, e)
+            return False
+        except RETRYABLE_ERRORS as e:
+            fail_generation_job(job, e)
+            return False
+
+        complete_generation_job(job)
+        return True
+
+    def run_pending(self, limit=None):
+        processed = 0
+        while limit is None or processed < limit:
+            jobs = claim_generation_jobs(self.name)
+            if not jobs:
+                break
+            self.run_job(jobs[0])
+            processed += 1
+        return processed
+
+    def _work(self, index):
+        worker = f"{self.name}/{index}"
+        while not self._stopping.is_set():
+            jobs = []
+            try:
+                jobs = claim_generation_jobs(worker)
+                if jobs:
+                    self.run_job(jobs[0])
+                elif index == 0:
+                    requeue_stale_generation_jobs()
+            except DatabaseError as e:
+                logger.error("Generation worker %s hit a database error: %s", worker, e)
+                jobs = []
+            except Exception as e:
+                # A bug in one handler must not take the worker thread down with it.
+                logger.exception("Generation worker %s crashed running a job", worker)
+                if jobs:
+                    self._fail_quietly(jobs[0], e)
+                jobs = []
+            finally:
+                close_old_connections()
+            if not jobs:
+                self._stopping.wait(self.poll_seconds)
+
+    def _fail_quietly(self, job, error):
+        try:
+            fail_generation_job(job, error)
+        except DatabaseError as e:
+            logger.error("Could not record failure of generation job %s: %s", job.id, e)
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._work,
+                args=(index,),
+                name=f"generation-worker-{index}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info("Started %s generation workers (%s)", self.workers, self.name)
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def run_forever(self):
+        self.start()
+        while not self._stopping.wait(1):
+            pass
+        self.join(timeout=30)
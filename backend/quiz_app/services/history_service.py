@@ -1,16 +1,28 @@
-from ..models import Answer
-from ..serializers.answer_serializer import AnswerDetailSerializer
+import hashlib
+import json
+import logging
 
+from django.db import DatabaseError
+from rest_framework.utils.encoders import JSONEncoder
+
+from cache_manager import QuizCacheService
+from ..models import Answer, QuizSessionSnapshot
+from ..serializers.row_serializers import answer_detail_rows, serialize_answer_detail_rows
+
+logger = logging.getLogger(__name__)
 
-def build_quiz_details_payload(session, request_user):
-    answers = Answer.objects.filter(
-        session=session,
-        user=session.user
-    ).select_related('question').order_by('answered_at')
 
-    answers_data = AnswerDetailSerializer(answers, many=True).data
+def _build_session_payload(session):
+    answers = list(answer_detail_rows(
+        Answer.objects.filter(
+            session=session,
+            user_id=session.user_id
+        ).order_by('answered_at')
+    ))
+
+    answers_data = serialize_answer_detail_rows(answers)
     total_response_time = round(
-        sum((ans.response_time or 0) for ans in answers),
+        sum((ans['response_time'] or 0) for ans in answers),
         2
     )
 
@@ -18,19 +30,11 @@ def build_quiz_details_payload(session, request_user):
     if session.use_adaptive_difficulty:
         for ans in answers:
             difficulty_progress.append({
-                'difficulty': ans.difficulty_at_answer,
-                'is_correct': ans.is_correct
+                'difficulty': ans['difficulty_at_answer'],
+                'is_correct': ans['is_correct']
             })
 
-    user_info = None
-    if request_user.profile.role == 'admin':
-        user_info = {
-            'username': session.user.username,
-            'email': session.user.email,
-            'user_id': session.user.id
-        }
-
-    return {
+    payload = {
         'session': {
             'id': session.id,
             'topic': session.topic,
@@ -47,10 +51,93 @@ def build_quiz_details_payload(session, request_user):
             'started_at': session.started_at,
             'ended_at': session.ended_at,
             'completed_at': session.ended_at,
-            'user_info': user_info,
+            'user_info': None,
         },
         'answers': answers_data,
         'difficulty_progress': difficulty_progress
     }
+    # Round-trip through the DRF encoder so the stored blob renders byte-identically.
+    return json.loads(json.dumps(payload, cls=JSONEncoder))
+
+
+def _payload_etag(payload):
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def store_quiz_snapshot(session):
+    payload = _build_session_payload(session)
+    snapshot, _created = QuizSessionSnapshot.objects.update_or_create(
+        session=session,
+        defaults={'payload': payload, 'etag': _payload_etag(payload)},
+    )
+    QuizCacheService.cache_snapshot(
+        session.id,
+        {'payload': snapshot.payload, 'etag': snapshot.etag},
+    )
+    return snapshot
 
 
+def snapshot_completed_session(session):
+    try:
+        store_quiz_snapshot(session)
+    except (DatabaseError, TypeError, ValueError) as e:
+        logger.warning("Failed to snapshot completed session %s: %s", session.id, e)
+
+
+def get_quiz_snapshot(session):
+    if not session.is_completed:
+        payload = _build_session_payload(session)
+        return payload, _payload_etag(payload)
+
+    cached = QuizCacheService.get_cached_snapshot(session.id)
+    if cached:
+        return cached['payload'], cached['etag']
+
+    snapshot = QuizSessionSnapshot.objects.filter(session=session).first()
+    if snapshot is None:
+        snapshot = store_quiz_snapshot(session)
+    else:
+        QuizCacheService.cache_snapshot(
+            session.id,
+            {'payload': snapshot.payload, 'etag': snapshot.etag},
+        )
+    return snapshot.payload, snapshot.etag
+
+
+def invalidate_quiz_snapshots(session_ids):
+    session_ids = list(session_ids)
+    if not session_ids:
+        return 0
+    deleted, _ = QuizSessionSnapshot.objects.filter(session_id__in=session_ids).delete()
+    QuizCacheService.delete_cached_snapshots(session_ids)
+    return deleted
+
+
+def invalidate_question_snapshots(question):
+    session_ids = (
+        Answer.objects.filter(question=question, session__isnull=False)
+        .values_list('session_id', flat=True)
+        .distinct()
+    )
+    return invalidate_quiz_snapshots(session_ids)
+
+
+def build_quiz_details_payload(session, request_user):
+    payload, etag = get_quiz_snapshot(session)
+    if request_user.profile.role == 'admin':
+        payload = {
+            **payload,
+            'session': {
+                **payload['session'],
+                'user_info': {
+                    'username': session.user.username,
+                    'email': session.user.email,
+                    'user_id': session.user.id
+                },
+            },
+        }
+        # user_info is not part of the snapshot, so fold it into the validator.
+        user_info = json.dumps(payload['session']['user_info'], sort_keys=True)
+        etag = f'{etag}-admin-{hashlib.sha256(user_info.encode()).hexdigest()[:12]}'
+    return payload, etag
@@ -6,13 +6,43 @@ from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from ..models import QuizSession, Answer
+from ..utils.fieldsets import trim_fields
+from .topic_service import matching_topics
 
 User = get_user_model()
 
+LEADERBOARD_ENTRY_FIELDS = (
+    "rank",
+    "user_id",
+    "username",
+    "email",
+    "avatar_url",
+    "total_quizzes",
+    "total_questions",
+    "total_correct",
+    "accuracy",
+    "total_score",
+    "avg_response_time",
+)
 
-def _serialize_user(request, user, rank):
+
+def _wants(fields, name):
+    return fields is None or name in fields
+
+
+def _leaderboard_users(queryset, fields):
+    columns = ["id", "username"]
+    if _wants(fields, "email"):
+        columns.append("email")
+    if _wants(fields, "avatar_url"):
+        queryset = queryset.select_related("profile")
+        columns.append("profile__avatar")
+    return queryset.only(*columns)
+
+
+def _serialize_user(request, user, rank, fields=None):
     avatar_url = None
-    profile = getattr(user, "profile", None)
+    profile = getattr(user, "profile", None) if _wants(fields, "avatar_url") else None
     if profile and profile.avatar:
         avatar_url = profile.avatar.url
         if avatar_url and request is not None and avatar_url.startswith("/"):
@@ -26,11 +56,11 @@ def _serialize_user(request, user, rank):
     if avg_response_time is None:
         avg_response_time = 0
 
-    return {
+    return trim_fields({
         "rank": rank,
         "user_id": user.id,
         "username": user.username,
-        "email": user.email,
+        "email": user.email if _wants(fields, "email") else None,
         "avatar_url": avatar_url,
         "total_quizzes": user.total_quizzes or 0,
         "total_questions": total_questions,
@@ -38,7 +68,7 @@ def _serialize_user(request, user, rank):
         "accuracy": accuracy,
         "total_score": total_correct,
         "avg_response_time": round(avg_response_time, 2) if avg_response_time else 0,
-    }
+    }, fields)
 
 
 def _get_period_filter(period):
@@ -60,22 +90,26 @@ def _get_period_date_from(period):
     return None
 
 
-def get_global_leaderboard(request, period, limit):
+def get_global_leaderboard(request, period, limit, fields=None):
     filters = _get_period_filter(period)
     date_from = _get_period_date_from(period)
-    answers_qs = Answer.objects.filter(
-        user=OuterRef("pk"),
-        response_time__gt=0,
-        session__is_completed=True,
-    )
-    if date_from:
-        answers_qs = answers_qs.filter(session__ended_at__gte=date_from)
-    answers_qs = answers_qs.values("user").annotate(
-        avg_rt=Avg("response_time")
-    ).values("avg_rt")
+
+    extra_annotations = {}
+    if _wants(fields, "avg_response_time"):
+        answers_qs = Answer.objects.filter(
+            user=OuterRef("pk"),
+            response_time__gt=0,
+            session__is_completed=True,
+        )
+        if date_from:
+            answers_qs = answers_qs.filter(session__ended_at__gte=date_from)
+        answers_qs = answers_qs.values("user").annotate(
+            avg_rt=Avg("response_time")
+        ).values("avg_rt")
+        extra_annotations["avg_response_time"] = Coalesce(Subquery(answers_qs), Value(0.0))
 
     users = (
-        User.objects.filter(filters)
+        _leaderboard_users(User.objects.filter(filters), fields)
         .annotate(
             total_quizzes=Count(
                 "quiz_sessions", filter=Q(quiz_sessions__is_completed=True)
@@ -94,32 +128,36 @@ def get_global_leaderboard(request, period, limit):
                 ),
                 0,
             ),
-            avg_response_time=Coalesce(Subquery(answers_qs), Value(0.0)),
+            **extra_annotations,
         )
         .filter(total_quizzes__gt=0)
         .order_by("-total_correct")[:limit]
     )
 
     leaderboard_data = [
-        _serialize_user(request, user, rank)
+        _serialize_user(request, user, rank, fields)
         for rank, user in enumerate(users, start=1)
     ]
 
     return {"period": period, "leaderboard": leaderboard_data}
 
 
-def get_topic_leaderboard(request, topic, limit):
+def get_topic_leaderboard(request, topic, limit, fields=None):
+    topic_ids = list(matching_topics(topic).values_list("id", flat=True))
     users = (
-        User.objects.filter(
-            quiz_sessions__is_completed=True,
-            quiz_sessions__topic__icontains=topic
+        _leaderboard_users(
+            User.objects.filter(
+                quiz_sessions__is_completed=True,
+                quiz_sessions__canonical_topic__in=topic_ids
+            ),
+            fields,
         )
         .annotate(
             total_quizzes=Count(
                 "quiz_sessions",
                 filter=Q(
                     quiz_sessions__is_completed=True,
-                    quiz_sessions__topic__icontains=topic,
+                    quiz_sessions__canonical_topic__in=topic_ids,
                 ),
             ),
             total_questions=Coalesce(
@@ -127,7 +165,7 @@ def get_topic_leaderboard(request, topic, limit):
                     "quiz_sessions__total_questions",
                     filter=Q(
                         quiz_sessions__is_completed=True,
-                        quiz_sessions__topic__icontains=topic,
+                        quiz_sessions__canonical_topic__in=topic_ids,
                     ),
                 ),
                 0,
@@ -137,7 +175,7 @@ def get_topic_leaderboard(request, topic, limit):
                     "quiz_sessions__correct_answers",
                     filter=Q(
                         quiz_sessions__is_completed=True,
-                        quiz_sessions__topic__icontains=topic,
+                        quiz_sessions__canonical_topic__in=topic_ids,
                     ),
                 ),
                 0,
@@ -148,7 +186,7 @@ def get_topic_leaderboard(request, topic, limit):
     )
 
     leaderboard_data = [
-        _serialize_user(request, user, rank)
+        _serialize_user(request, user, rank, fields)
         for rank, user in enumerate(users, start=1)
     ]
 
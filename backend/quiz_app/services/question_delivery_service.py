@@ -1,13 +1,12 @@
 import logging
 import time
-import threading
 
 from django.db import DatabaseError
 
 from cache_manager import QuizCacheService
 from llm_integration.difficulty_adapter import DifficultyAdapter
 
-from ..models import Answer, QuizSessionQuestion
+from ..models import Answer, GenerationJob, Question, QuizSessionQuestion
 from ..utils.constants import QUESTION_WAIT_MAX_SECONDS, QUESTION_WAIT_POLL_SECONDS
 from ..utils.helpers import build_question_payload, get_used_question_refs
 from .background_generation_service import BackgroundGenerationService
@@ -25,6 +24,7 @@ def select_next_session_question(session, answered_question_ids, answered_texts,
         .exclude(question__question_text__in=answered_texts)
         .exclude(question__content_hash__in=used_hashes)
         .select_related('question')
+        .defer(*Question.heavy_related_fields('question'), 'question__explanation')
         .order_by('order')
         .first()
     )
@@ -90,29 +90,20 @@ def _maybe_pregenerate_next_level(session):
         target_level
     )
 
-    def async_pregenerate():
-        try:
-            bg_generator.generate_adaptive_questions_sync(
-                session=session,
-                new_difficulty_level=target_level,
-                count=questions_to_generate
-            )
-        except (DatabaseError, RuntimeError, TypeError, ValueError) as e:
-            logger.error("Async pre-generation failed: %s", e)
-
-    thread = threading.Thread(target=async_pregenerate, daemon=True)
-    thread.start()
+    bg_generator.schedule_pregeneration(
+        session_id=session.id,
+        difficulty_level=target_level,
+        count=questions_to_generate
+    )
 
 
 def _maybe_generate_initial_questions(session):
+    # The generation ledger caps this at the session's free slots, so it does not
+    # call the LLM again for questions a background job already has in flight.
     try:
-        current_in_session = QuizSessionQuestion.objects.filter(
-            session=session
-        ).count()
-        remaining_slots = max(0, session.questions_count - current_in_session)
-        if remaining_slots > 0:
-            to_generate = min(2, remaining_slots)
-            bg_generator.generate_initial_questions_sync(session, count=to_generate)
+        bg_generator.generate_initial_questions_sync(
+            session, count=2, kind=GenerationJob.KIND_SHORTFALL
+        )
     except (DatabaseError, RuntimeError, TypeError, ValueError) as e:
         logger.error(
             "Immediate fallback generation failed for session %s: %s",
@@ -1,12 +1,18 @@
+import logging
+
 from llm_integration.question_generator import QuestionGenerator
 from llm_integration.difficulty_adapter import DifficultyAdapter
+from llm_integration.resilience import ProviderUnavailable
+from llm_integration.telemetry import note_added, note_generated, note_rejection
 
-from ..models import QuizSessionQuestion
-from ..utils.constants import GENERATION_BUFFER_MIN_EXTRA, GENERATION_BUFFER_RATIO
+from ..models import Question, QuizSessionQuestion
 from ..utils.helpers import get_used_hashes
+from .acceptance_estimator import adaptive_buffer_count, static_buffer_count
 from .question_service import QuestionService
 from .cleanup_service import cleanup_rejected_question
 
+logger = logging.getLogger(__name__)
+
 
 class QuestionGenerationService:
     def __init__(self):
@@ -14,10 +20,14 @@ class QuestionGenerationService:
         self.difficulty_adapter = DifficultyAdapter()
         self.question_service = QuestionService()
 
-    def compute_buffer_count(self, target_count):
-        return max(
-            target_count + GENERATION_BUFFER_MIN_EXTRA,
-            int(target_count * GENERATION_BUFFER_RATIO),
+    def compute_buffer_count(self, target_count, session=None, difficulty_text=None):
+        if session is None:
+            return static_buffer_count(target_count)
+        return adaptive_buffer_count(
+            target_count,
+            session.topic,
+            difficulty_text,
+            session.knowledge_level,
         )
 
     def get_used_hashes(self, session):
@@ -39,14 +49,57 @@ class QuestionGenerationService:
         count,
         existing_questions,
     ):
-        return self.generator.generate_multiple_questions(
-            topic=session.topic,
-            difficulty=difficulty_text,
-            count=count,
-            subtopic=session.subtopic,
-            knowledge_level=session.knowledge_level,
-            existing_questions=existing_questions,
+        try:
+            questions_data = self.generator.generate_multiple_questions(
+                topic=session.topic,
+                difficulty=difficulty_text,
+                count=count,
+                subtopic=session.subtopic,
+                knowledge_level=session.knowledge_level,
+                existing_questions=existing_questions,
+            )
+        except ProviderUnavailable as e:
+            bank = self.bank_questions_data(session, difficulty_text, count, existing_questions)
+            if not bank:
+                raise
+            note_generated(len(bank), bank_fallback=True)
+            logger.warning(
+                "LLM unavailable (%s), serving %s bank questions for session %s",
+                e,
+                len(bank),
+                session.id,
+            )
+            return bank
+
+        note_generated(len(questions_data))
+        return questions_data
+
+    def bank_questions_data(self, session, difficulty_text, count, existing_questions=None):
+        # Same topic, subtopic, level and difficulty produce the same content hash, so
+        # add_question_from_data reuses these rows instead of creating new ones.
+        questions = (
+            Question.objects.filter(
+                topic=session.topic,
+                subtopic=session.subtopic,
+                knowledge_level=session.knowledge_level,
+                difficulty_level=difficulty_text,
+            )
+            .exclude(question_sessions__session=session)
+            .exclude(answers__user_id=session.user_id)
+            .exclude(question_text__in=existing_questions or [])
+            .order_by('times_used', 'id')
+            .values('question_text', 'correct_answer', 'wrong_answer_1', 'wrong_answer_2',
+                    'wrong_answer_3', 'explanation')[:count]
         )
+        return [
+            {
+                'question': row['question_text'],
+                'correct_answer': row['correct_answer'],
+                'wrong_answers': [row['wrong_answer_1'], row['wrong_answer_2'], row['wrong_answer_3']],
+                'explanation': row['explanation'],
+            }
+            for row in questions
+        ]
 
     def add_question_from_data(
         self,
@@ -56,7 +109,7 @@ class QuestionGenerationService:
         order,
         used_hashes,
     ):
-        question, _is_new = self.question_service.find_or_create_global_question(
+        question, is_new = self.question_service.find_or_create_global_question(
             topic=session.topic,
             question_data=q_data,
             difficulty_text=difficulty_text,
@@ -66,6 +119,7 @@ class QuestionGenerationService:
         )
 
         if question.content_hash in used_hashes:
+            note_rejection("session_duplicate")
             cleanup_rejected_question(question, reason="hash_used_in_session")
             return None, order
 
@@ -80,4 +134,5 @@ class QuestionGenerationService:
             return None, order
 
         used_hashes.add(question.content_hash)
+        note_added(deduplicated=not is_new)
         return question, order + 1
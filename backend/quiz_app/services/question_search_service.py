@@ -0,0 +1,26 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, FloatField, Value
+
+from ..utils.constants import QUESTION_SEARCH_CONFIG, QUESTION_SEARCH_MAX_TERMS
+
+_SEARCH_TERM_RE = re.compile(r"[^\W_]+")
+
+
+def build_search_query(term):
+    words = _SEARCH_TERM_RE.findall(term or "")[:QUESTION_SEARCH_MAX_TERMS]
+    if not words:
+        return None
+    # Prefix match every word so inflected Polish forms ("fotosynte") still hit.
+    raw_query = " & ".join(f"{word}:*" for word in words)
+    return SearchQuery(raw_query, config=QUESTION_SEARCH_CONFIG, search_type="raw")
+
+
+def search_questions(queryset, term):
+    query = build_search_query(term)
+    if query is None:
+        return queryset.annotate(_search_rank=Value(0.0, output_field=FloatField())).none()
+    return queryset.filter(search_vector=query).annotate(
+        _search_rank=SearchRank(F("search_vector"), query)
+    )
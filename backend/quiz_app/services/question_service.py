@@ -3,13 +3,15 @@ import logging
 import numpy as np
 from django.core.exceptions import MultipleObjectsReturned
 from django.db import DatabaseError
-from llm_integration.embeddings_service import EmbeddingsService
-from ..models import Question, QuizSessionQuestion, Answer
+from llm_integration.embeddings_service import get_embeddings_service
+from llm_integration.telemetry import note_rejection
+from ..models import Question, QuizSessionQuestion, Answer, Topic
 from ..utils.deduplicator import UniversalDeduplicator
 from .cleanup_service import cleanup_rejected_question
+from .topic_suggest_service import topic_index
 
 logger = logging.getLogger(__name__)
-embeddings_service = EmbeddingsService()
+embeddings_service = get_embeddings_service()
 deduplicator = UniversalDeduplicator()
 
 
@@ -37,8 +39,8 @@ class QuestionService:
         ]
 
     def _get_candidate_questions(self, topic, difficulty_text, knowledge_level):
-        return Question.objects.filter(
-            topic=topic,
+        return Question.objects.with_embeddings().filter(
+            canonical_topic__normalized_name=Topic.normalize_name(topic),
             difficulty_level=difficulty_text,
             knowledge_level=knowledge_level,
         ).exclude(embedding_vector__isnull=True)[:100]
@@ -46,7 +48,9 @@ class QuestionService:
     def _get_session_questions(self, session):
         return QuizSessionQuestion.objects.filter(
             session=session
-        ).select_related('question')
+        ).select_related('question').defer(
+            *Question.heavy_related_fields('question'), 'question__explanation'
+        )
 
     def _is_hash_used_in_session(self, session, content_hash):
         existing_by_hash = QuizSessionQuestion.objects.filter(
@@ -192,6 +196,7 @@ class QuestionService:
             else:
                 logger.debug(f"Created question {question.id}")
 
+            topic_index.record_question(question.canonical_topic)
             return question, True
 
         except KeyError as e:
@@ -206,6 +211,7 @@ class QuestionService:
             logger.debug(
                 f"Question hash {question.content_hash} already used in session {session.id}"
             )
+            note_rejection("session_duplicate")
             cleanup_rejected_question(question, reason="hash_used_in_session")
             return None
 
@@ -242,6 +248,7 @@ class QuestionService:
                                         f"Question {question.id} is duplicate of {sq.question.id}, "
                                         f"reason: {reason}, confidence: {confidence :.2f}"
                                     )
+                                    note_rejection("session_similar")
                                     cleanup_rejected_question(
                                         question, reason="similar_in_session"
                                     )
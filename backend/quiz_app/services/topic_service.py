@@ -0,0 +1,25 @@
+from django.db.models import Q
+
+from ..models import Topic
+
+
+def matching_topics(term):
+    normalized_term = Topic.normalize_name(term)
+    if not normalized_term:
+        return Topic.objects.none()
+
+    exact = Topic.objects.filter(normalized_name=normalized_term)
+    if exact.exists():
+        return exact
+
+    return Topic.objects.filter(
+        Q(normalized_name__contains=normalized_term)
+        | Q(normalized_name__trigram_word_similar=normalized_term)
+    )
+
+
+def filter_by_topic(queryset, term, field='canonical_topic'):
+    if not term:
+        return queryset
+    topic_ids = matching_topics(term).values('id')
+    return queryset.filter(**{f'{field}__in': topic_ids})
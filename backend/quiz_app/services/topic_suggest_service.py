@@ -0,0 +1,146 @@
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from itertools import islice
+
+from django.db import DatabaseError
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from ..models import Question, QuizSession, Topic
+from ..utils.constants import (
+    TOPIC_INDEX_REFRESH_SECONDS,
+    TOPIC_SUGGEST_BANK_WEIGHT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TopicPrefixIndex:
+
+    def __init__(self, refresh_seconds=TOPIC_INDEX_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._entries = []
+        self._topics = {}
+        self._loaded_at = None
+
+    def suggest(self, prefix, limit):
+        self._ensure_loaded()
+        normalized_prefix = Topic.normalize_name(prefix)
+        if not normalized_prefix:
+            return []
+
+        with self._lock:
+            start = bisect_left(self._entries, (normalized_prefix,))
+            matched = set()
+            for token, topic_key in islice(self._entries, start, None):
+                if not token.startswith(normalized_prefix):
+                    break
+                matched.add(topic_key)
+            best = heapq.nlargest(
+                limit,
+                matched,
+                key=lambda key: (self._weight(self._topics[key]), key),
+            )
+            return [dict(self._topics[key]) for key in best]
+
+    def record_session(self, topic):
+        self._bump(topic, 'sessions_count')
+
+    def record_question(self, topic):
+        self._bump(topic, 'questions_count')
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def _weight(self, item):
+        return item['sessions_count'] + item['questions_count'] * TOPIC_SUGGEST_BANK_WEIGHT
+
+    def _bump(self, topic, counter):
+        if topic is None or self._loaded_at is None:
+            return
+        with self._lock:
+            item = self._topics.get(topic.normalized_name)
+            if item is None:
+                item = self._add(topic.normalized_name, topic.name, 0, 0)
+            item[counter] += 1
+
+    def _add(self, topic_key, name, sessions_count, questions_count):
+        item = {
+            'topic': name,
+            'sessions_count': sessions_count,
+            'questions_count': questions_count,
+        }
+        self._topics[topic_key] = item
+        for token in self._tokens(topic_key):
+            insort(self._entries, (token, topic_key))
+        return item
+
+    def _tokens(self, topic_key):
+        words = topic_key.split(' ')
+        return {' '.join(words[i:]) for i in range(len(words))}
+
+    def _fresh(self):
+        loaded_at = self._loaded_at
+        return loaded_at is not None and time.monotonic() - loaded_at < self.refresh_seconds
+
+    def _ensure_loaded(self):
+        if self._fresh():
+            return
+        # One rebuild at a time: others keep serving the stale index, or wait for the first build.
+        if not self._refresh_lock.acquire(blocking=self._loaded_at is None):
+            return
+        try:
+            if not self._fresh():
+                self._rebuild()
+        finally:
+            self._refresh_lock.release()
+
+    def _rebuild(self):
+        try:
+            rows = list(
+                Topic.objects.annotate(
+                    sessions_total=_count_per_topic(QuizSession),
+                    questions_total=_count_per_topic(Question),
+                ).values_list('normalized_name', 'name', 'sessions_total', 'questions_total')
+            )
+        except DatabaseError as e:
+            logger.warning("Topic index refresh failed: %s", e)
+            return
+
+        topics = {}
+        entries = []
+        for topic_key, name, sessions_total, questions_total in rows:
+            topics[topic_key] = {
+                'topic': name,
+                'sessions_count': sessions_total,
+                'questions_count': questions_total,
+            }
+            entries.extend((token, topic_key) for token in self._tokens(topic_key))
+        entries.sort()
+
+        with self._lock:
+            self._topics = topics
+            self._entries = entries
+            self._loaded_at = time.monotonic()
+        logger.debug("Topic index rebuilt with %s topics", len(topics))
+
+
+def _count_per_topic(model):
+    # A correlated count per table avoids the sessions x questions join of two reverse FKs.
+    counts = (
+        model.objects.filter(canonical_topic=OuterRef('pk'))
+        .order_by()
+        .values('canonical_topic')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+topic_index = TopicPrefixIndex()
@@ -0,0 +1,66 @@
+import logging
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from cache_manager import CacheVersionService
+from .models import Question, QuizSession
+from .services.history_service import invalidate_question_snapshots
+from .utils.constants import HISTORY_VERSION_SCOPE, LEADERBOARD_VERSION_SCOPE, QUESTIONS_VERSION_SCOPE
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_QUESTION_FIELDS = {
+    'question_text',
+    'correct_answer',
+    'wrong_answer_1',
+    'wrong_answer_2',
+    'wrong_answer_3',
+    'explanation',
+}
+
+
+@receiver(post_save, sender=Question)
+def invalidate_snapshots_on_question_edit(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return
+    if update_fields is not None and not SNAPSHOT_QUESTION_FIELDS & set(update_fields):
+        return
+    invalidated = invalidate_question_snapshots(instance)
+    if invalidated:
+        logger.debug("Invalidated %s quiz snapshots after editing question %s", invalidated, instance.id)
+
+
+# Answer statistics reach the library through its ETag time bucket instead.
+QUESTION_STATS_FIELDS = {
+    'total_answers',
+    'correct_answers_count',
+    'times_used',
+    'success_rate',
+    'embedding_vector',
+}
+
+
+@receiver(post_save, sender=Question)
+def bump_questions_version_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if created and not instance.total_answers:
+        return
+    if update_fields is not None and set(update_fields) <= QUESTION_STATS_FIELDS:
+        return
+    CacheVersionService.bump_version(QUESTIONS_VERSION_SCOPE)
+
+
+@receiver(post_delete, sender=Question)
+def bump_questions_version_on_delete(sender, instance, **kwargs):
+    # Unanswered questions never appear in the library.
+    if instance.total_answers:
+        CacheVersionService.bump_version(QUESTIONS_VERSION_SCOPE)
+
+
+@receiver(post_save, sender=QuizSession)
+@receiver(post_delete, sender=QuizSession)
+def bump_session_versions(sender, instance, **kwargs):
+    scopes = [HISTORY_VERSION_SCOPE.format(user_id=instance.user_id)]
+    if instance.is_completed or kwargs.get('signal') is post_delete:
+        scopes.append(LEADERBOARD_VERSION_SCOPE)
+    CacheVersionService.bump_versions(scopes)
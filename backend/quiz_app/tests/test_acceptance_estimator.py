@@ -0,0 +1,128 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from llm_integration.config import LLMConfig
+from llm_integration.rate_governor import RateGovernor
+from quiz_app.models import GenerationUsageDaily, QuizSession
+from quiz_app.services.acceptance_estimator import (
+    acceptance_key,
+    acceptance_rate,
+    load_estimate,
+    observe_acceptance,
+    size_for_target,
+)
+from quiz_app.services.background_generation_service import BackgroundGenerationService
+
+User = get_user_model()
+
+
+class AcceptanceEstimatorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='acceptance_user@example.com',
+            username='acceptance_user',
+            password='Secret123!'
+        )
+        self.session = QuizSession.objects.create(
+            user=self.user,
+            topic='Algebra',
+            initial_difficulty='hard',
+            current_difficulty=8.0,
+            questions_count=10,
+            knowledge_level='high_school',
+        )
+        self.service = BackgroundGenerationService()
+        self.core = self.service.core
+
+    def _buffer(self, target):
+        return self.core.compute_buffer_count(target, self.session, 'trudny')
+
+    def _observe(self, accepted, trials, times):
+        for _ in range(times):
+            observe_acceptance('Algebra', 'trudny', 'high_school', accepted, trials)
+
+    def test_cold_start_uses_static_ratio(self):
+        self.assertEqual((self._buffer(3), self._buffer(5)), (4, 6))
+        self.assertEqual(self.core.compute_buffer_count(5), 6)
+
+    def test_strict_topics_ask_for_more_and_easy_topics_for_less(self):
+        self._observe(accepted=3, trials=6, times=10)
+        strict = self._buffer(5)
+
+        cache.clear()
+        self._observe(accepted=6, trials=6, times=10)
+        easy = self._buffer(5)
+
+        self.assertEqual((strict, easy), (10, 5))
+        self.assertEqual(size_for_target(3, 0.7), 6)
+
+    def test_buffers_fit_in_one_model_response(self):
+        with patch.object(LLMConfig, 'OPENAI_MAX_OUTPUT_TOKENS', 2800):
+            self.assertEqual(LLMConfig.max_questions_per_call(), 8)
+            self.assertEqual((size_for_target(5, 0.3), size_for_target(9, 0.3)), (8, 9))
+            self.assertEqual(self._buffer(7), 8)
+
+        self.assertEqual(LLMConfig.get_openai_params_multiple(3)['max_tokens'], 2000)
+        self.assertEqual(LLMConfig.get_openai_params_multiple(10)['max_tokens'], 3500)
+        self.assertEqual(LLMConfig.get_openai_params_multiple(20)['max_tokens'], 4096)
+
+    def test_estimate_follows_recent_calls(self):
+        self._observe(accepted=6, trials=6, times=10)
+        before = acceptance_rate(load_estimate('Algebra', 'trudny', 'high_school'))
+        self._observe(accepted=2, trials=6, times=3)
+        after = acceptance_rate(load_estimate('Algebra', 'trudny', 'high_school'))
+
+        self.assertGreater(before, 0.95)
+        self.assertLess(after, 0.75)
+
+    def test_cold_cache_is_seeded_from_daily_rollups(self):
+        GenerationUsageDaily.objects.create(
+            day=timezone.localdate(),
+            topic='Algebra',
+            difficulty_level='trudny',
+            knowledge_level='high_school',
+            user=self.user,
+            calls=40,
+            requested=240,
+            returned=240,
+            added=120,
+            unused=0,
+        )
+
+        estimate = load_estimate('Algebra', 'trudny', 'high_school')
+
+        self.assertEqual(estimate, {'accepted': 12.5, 'trials': 25.0})
+        self.assertEqual(self._buffer(5), 10)
+
+    def test_generation_calls_feed_the_estimate(self):
+        generator = self.core.generator
+        generator.governor = RateGovernor(rpm=0, tpm=0)
+        generator.client = MagicMock()
+        invalid = {"question": "Ile to jest 2 + 2?", "correct_answer": "4", "wrong_answers": ["3"], "explanation": "x"}
+        valid = {
+            "question": "Ile wynosi pierwiastek z 81?",
+            "correct_answer": "9",
+            "wrong_answers": ["8", "7", "6"],
+            "explanation": "9 * 9 = 81.",
+        }
+        generator.client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(
+                content=json.dumps({"questions": [invalid, invalid, invalid, valid, invalid, invalid]})
+            ))],
+            usage=SimpleNamespace(total_tokens=100, prompt_tokens=80, completion_tokens=20),
+        )
+
+        self.service.generate_adaptive_questions_sync(self.session, 'trudny', count=5)
+
+        self.assertEqual(
+            cache.get(acceptance_key('Algebra', 'trudny', 'high_school')),
+            {'accepted': 1.0, 'trials': 6.0},
+        )
+        self.assertEqual(self._buffer(5), 10)
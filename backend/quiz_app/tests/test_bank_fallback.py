@@ -0,0 +1,86 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from llm_integration.question_generator import QuestionGenerator
+from llm_integration.rate_governor import RateLimitExceeded
+from llm_integration.resilience import BREAKER_KEY
+from quiz_app.models import Question, QuizSession, QuizSessionQuestion
+
+User = get_user_model()
+
+
+class BankOnlyModeTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='bank_user@example.com',
+            username='bank_user',
+            password='Secret123!'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.bank = [
+            Question.objects.create(
+                topic='Muzyka',
+                knowledge_level='high_school',
+                difficulty_level='średni',
+                question_text=f'Kto skomponował utwór numer {number}?',
+                correct_answer='Chopin',
+                wrong_answer_1='Mozart',
+                wrong_answer_2='Bach',
+                wrong_answer_3='Liszt',
+                explanation='Utwór skomponował Chopin.',
+                times_used=number
+            )
+            for number in range(5)
+        ]
+
+    def tearDown(self):
+        cache.delete(BREAKER_KEY)
+
+    def test_start_quiz_serves_bank_questions_when_provider_is_unavailable(self):
+        response = self.client.post(
+            '/api/quiz/start/',
+            {'topic': 'Muzyka', 'difficulty': 'medium', 'questions_count': 5},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        session = QuizSession.objects.get(pk=response.data['session_id'])
+        self.assertEqual(
+            list(QuizSessionQuestion.objects.filter(session=session).values_list('question_id', flat=True)),
+            [question.id for question in self.bank[:3]]
+        )
+        self.assertEqual(Question.objects.count(), 5)
+        self.assertTrue(session.generation_jobs.exists())
+
+    def test_rate_limit_queue_rejection_serves_bank_questions(self):
+        with patch.object(
+            QuestionGenerator,
+            'generate_multiple_questions',
+            side_effect=RateLimitExceeded('LLM rate limit queue is 90.0s long'),
+        ):
+            response = self.client.post(
+                '/api/quiz/start/',
+                {'topic': 'Muzyka', 'difficulty': 'medium', 'questions_count': 5},
+                format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        session = QuizSession.objects.get(pk=response.data['session_id'])
+        self.assertEqual(QuizSessionQuestion.objects.filter(session=session).count(), 3)
+        self.assertEqual(Question.objects.count(), 5)
+
+    def test_empty_bank_still_fails_fast(self):
+        Question.objects.all().delete()
+
+        response = self.client.post(
+            '/api/quiz/start/',
+            {'topic': 'Muzyka', 'difficulty': 'medium', 'questions_count': 5},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertFalse(QuizSession.objects.exists())
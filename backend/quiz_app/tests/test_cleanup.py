@@ -0,0 +1,227 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from quiz_app.models import Answer, Question, QuizSession, QuizSessionQuestion
+from quiz_app.services.cleanup_service import (
+    cleanup_rejected_question,
+    delete_orphaned_questions,
+    orphaned_questions,
+    rollback_session,
+    rollback_sessions,
+)
+
+User = get_user_model()
+
+
+class OrphanCleanupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='cleanup_user@example.com',
+            username='cleanup_user',
+            password='Secret123!'
+        )
+        self.active = QuizSession.objects.create(
+            user=self.user,
+            topic='Geografia',
+            initial_difficulty='medium',
+            current_difficulty=5.0
+        )
+        self.completed = QuizSession.objects.create(
+            user=self.user,
+            topic='Geografia',
+            initial_difficulty='medium',
+            current_difficulty=5.0,
+            is_completed=True,
+            ended_at=timezone.now()
+        )
+
+    def _question(self, number, **extra):
+        return Question.objects.create(
+            topic='Geografia',
+            question_text=f'Pytanie geograficzne numer {number}?',
+            correct_answer='A',
+            wrong_answer_1='B',
+            wrong_answer_2='C',
+            wrong_answer_3='D',
+            explanation='Wyjaśnienie.',
+            **extra
+        )
+
+    def test_bulk_delete_skips_answered_and_actively_used_questions(self):
+        orphans = [self._question(i) for i in range(5)]
+        QuizSessionQuestion.objects.create(session=self.completed, question=orphans[0], order=1)
+        in_active = self._question(10)
+        QuizSessionQuestion.objects.create(session=self.active, question=in_active, order=1)
+        answered = self._question(11, total_answers=1)
+
+        self.assertEqual(orphaned_questions().count(), 5)
+        with CaptureQueriesContext(connection) as ctx:
+            deleted = delete_orphaned_questions(batch_size=2)
+
+        self.assertEqual(deleted, 5)
+        statements = [q['sql'] for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len(statements), 3)
+        self.assertEqual(
+            set(Question.objects.values_list('id', flat=True)),
+            {in_active.id, answered.id}
+        )
+        self.assertFalse(QuizSessionQuestion.objects.filter(session=self.completed).exists())
+
+    def test_questions_with_answer_rows_are_not_orphans(self):
+        # Stale counter: the answer exists but total_answers was never bumped.
+        stale = self._question(1)
+        QuizSessionQuestion.objects.create(session=self.completed, question=stale, order=1)
+        Answer.objects.create(
+            question=stale, user=self.user, session=self.completed,
+            selected_answer='A', is_correct=True, response_time=2.0
+        )
+        QuizSession.objects.filter(pk=self.completed.pk).update(answers_count=1, total_response_time=2.0)
+
+        self.assertEqual(delete_orphaned_questions(), 0)
+        self.assertTrue(Answer.objects.filter(question=stale).exists())
+        self.completed.refresh_from_db()
+        self.assertEqual((self.completed.answers_count, self.completed.total_response_time), (1, 2.0))
+
+    def test_explicit_ids_are_chunked_and_filtered(self):
+        orphans = [self._question(i) for i in range(3)]
+        keep = self._question(20)
+        QuizSessionQuestion.objects.create(session=self.active, question=keep, order=1)
+
+        deleted = delete_orphaned_questions([q.id for q in orphans] + [keep.id], batch_size=2)
+
+        self.assertEqual(deleted, 3)
+        self.assertEqual(list(Question.objects.values_list('id', flat=True)), [keep.id])
+
+    def test_cleanup_rejected_question_reports_result(self):
+        orphan = self._question(1)
+        used = self._question(2)
+        QuizSessionQuestion.objects.create(session=self.active, question=used, order=1)
+
+        self.assertTrue(cleanup_rejected_question(orphan))
+        self.assertFalse(cleanup_rejected_question(used))
+        self.assertTrue(Question.objects.filter(pk=used.pk).exists())
+
+    def test_rollback_removes_session_orphans(self):
+        question = self._question(1)
+        QuizSessionQuestion.objects.create(session=self.active, question=question, order=1)
+
+        rollback_session(self.active)
+
+        self.assertFalse(Question.objects.filter(pk=question.pk).exists())
+
+    def test_command_respects_age_and_dry_run(self):
+        old = self._question(1)
+        self._question(2)
+        Question.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=2))
+
+        out = StringIO()
+        call_command('cleanup_orphaned_questions', '--dry-run', stdout=out)
+        self.assertIn('To delete: 1 questions', out.getvalue())
+        self.assertEqual(Question.objects.count(), 2)
+
+        call_command('cleanup_orphaned_questions', '--batch-size', '10', stdout=StringIO())
+        self.assertFalse(Question.objects.filter(pk=old.pk).exists())
+        self.assertEqual(Question.objects.count(), 1)
+
+
+class SessionRollbackTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='rollback_user@example.com',
+            username='rollback_user',
+            password='Secret123!'
+        )
+        self.questions = [
+            Question.objects.create(
+                topic='Historia',
+                question_text=f'Pytanie historyczne numer {number}?',
+                correct_answer='1410',
+                wrong_answer_1='1409',
+                wrong_answer_2='1411',
+                wrong_answer_3='1385',
+                explanation='Wyjaśnienie.',
+                total_answers=10,
+                correct_answers_count=6,
+                times_used=10
+            )
+            for number in range(2)
+        ]
+        profile = self.user.profile
+        profile.total_questions_answered = 20
+        profile.total_correct_answers = 12
+        profile.save(update_fields=['total_questions_answered', 'total_correct_answers'])
+
+    def _abandoned_session(self, answers):
+        session = QuizSession.objects.create(
+            user=self.user,
+            topic='Historia',
+            initial_difficulty='medium',
+            current_difficulty=5.0
+        )
+        QuizSession.objects.filter(pk=session.pk).update(started_at=timezone.now() - timedelta(hours=3))
+        for order, (question, is_correct) in enumerate(zip(self.questions, answers), start=1):
+            QuizSessionQuestion.objects.create(session=session, question=question, order=order)
+            Answer.objects.create(
+                question=question, user=self.user, session=session,
+                selected_answer='1410' if is_correct else '1409',
+                is_correct=is_correct, response_time=2.0
+            )
+        return session
+
+    def test_grouped_rollback_recomputes_question_and_profile_stats(self):
+        sessions = [self._abandoned_session([True, False]), self._abandoned_session([True])]
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = rollback_sessions([s.id for s in sessions])
+
+        self.assertEqual(result['sessions'], 2)
+        self.assertEqual(result['answers'], 3)
+        self.assertEqual(result['questions'], 2)
+        updates = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+
+        first, second = Question.objects.order_by('id')
+        self.assertEqual(
+            (first.total_answers, first.correct_answers_count, first.times_used),
+            (8, 4, 8)
+        )
+        self.assertEqual(first.success_rate, Question.compute_success_rate(4, 8))
+        self.assertEqual((second.total_answers, second.correct_answers_count), (9, 6))
+        self.assertEqual(second.success_rate, Question.compute_success_rate(6, 9))
+        profile = self.user.profile.__class__.objects.get(user=self.user)
+        self.assertEqual((profile.total_questions_answered, profile.total_correct_answers), (17, 10))
+        self.assertFalse(QuizSession.objects.filter(user=self.user).exists())
+
+    def test_rollback_floors_counters_at_zero(self):
+        session = self._abandoned_session([True, True])
+        Question.objects.filter(pk=self.questions[0].pk).update(total_answers=2, correct_answers_count=0)
+
+        rollback_session(session)
+
+        question = Question.objects.get(pk=self.questions[0].pk)
+        self.assertEqual((question.total_answers, question.correct_answers_count), (1, 0))
+        self.assertEqual(question.success_rate, 0.0)
+
+    def test_command_rolls_back_stale_sessions_in_batches(self):
+        stale = [self._abandoned_session([False]) for _ in range(3)]
+        fresh = QuizSession.objects.create(
+            user=self.user,
+            topic='Historia',
+            initial_difficulty='medium',
+            current_difficulty=5.0
+        )
+
+        out = StringIO()
+        call_command('cleanup_abandoned_sessions', '--batch-size', '2', stdout=out)
+
+        self.assertIn('Deleted 3 sessions', out.getvalue())
+        self.assertEqual(list(QuizSession.objects.values_list('id', flat=True)), [fresh.id])
+        self.assertFalse(Answer.objects.filter(session_id__in=[s.id for s in stale]).exists())
+        self.assertEqual(Question.objects.get(pk=self.questions[0].pk).total_answers, 7)
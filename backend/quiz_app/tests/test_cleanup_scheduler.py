@@ -0,0 +1,143 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from quiz_app.models import Answer, CleanupCursor, Question, QuizSession, QuizSessionQuestion
+from quiz_app.services.cleanup_scheduler import CleanupScheduler, cleanup_metrics
+
+User = get_user_model()
+
+
+class CleanupFixturesMixin:
+    def _user(self, name='scheduler_user'):
+        return User.objects.create_user(
+            email=f'{name}@example.com',
+            username=name,
+            password='Secret123!'
+        )
+
+    def _question(self, number, age=timedelta(days=2), **extra):
+        question = Question.objects.create(
+            topic='Chemia',
+            question_text=f'Pytanie chemiczne numer {number}?',
+            correct_answer='A',
+            wrong_answer_1='B',
+            wrong_answer_2='C',
+            wrong_answer_3='D',
+            explanation='Wyjaśnienie.',
+            **extra
+        )
+        Question.objects.filter(pk=question.pk).update(created_at=timezone.now() - age)
+        return question
+
+    def _abandoned_session(self, user, question=None):
+        session = QuizSession.objects.create(
+            user=user,
+            topic='Chemia',
+            initial_difficulty='medium',
+            current_difficulty=5.0
+        )
+        QuizSession.objects.filter(pk=session.pk).update(started_at=timezone.now() - timedelta(hours=3))
+        if question is not None:
+            QuizSessionQuestion.objects.create(session=session, question=question, order=1)
+            Answer.objects.create(
+                question=question, user=user, session=session,
+                selected_answer='A', is_correct=True, response_time=1.0
+            )
+        return session
+
+
+class CleanupSchedulerTests(CleanupFixturesMixin, TestCase):
+    def setUp(self):
+        self.user = self._user()
+
+    def test_single_pass_processes_chunks_and_records_metrics(self):
+        answered = self._question(0, total_answers=5, correct_answers_count=5)
+        for _ in range(3):
+            self._abandoned_session(self.user)
+        self._abandoned_session(self.user, answered)
+        orphans = [self._question(i) for i in range(1, 26)]
+        fresh = self._question(99, age=timedelta())
+
+        CleanupScheduler(chunk_size=10, rows_per_second=0).run(once=True)
+
+        self.assertFalse(QuizSession.objects.exists())
+        self.assertFalse(Question.objects.filter(id__in=[q.id for q in orphans]).exists())
+        self.assertEqual(
+            set(Question.objects.values_list('id', flat=True)), {answered.id, fresh.id}
+        )
+        self.assertEqual(Question.objects.get(pk=answered.pk).total_answers, 4)
+
+        cursors = {c.task: c for c in CleanupCursor.objects.all()}
+        self.assertEqual(cursors['abandoned_sessions'].processed_total, 4)
+        self.assertEqual(cursors['orphaned_questions'].processed_total, 25)
+        self.assertEqual(cursors['generation_jobs'].processed_total, 0)
+        for cursor in cursors.values():
+            self.assertEqual(cursor.passes_completed, 1)
+            self.assertEqual(cursor.last_id, 0)
+        self.assertGreater(cursors['orphaned_questions'].rows_per_second, 0)
+
+    def test_resumes_from_persisted_cursor(self):
+        orphans = [self._question(i) for i in range(4)]
+        CleanupCursor.objects.create(task='orphaned_questions', last_id=orphans[1].id, chunk_size=10)
+
+        rows, _, state = CleanupScheduler(tasks=['orphaned_questions']).run_chunk('orphaned_questions')
+
+        self.assertEqual((rows, state), (2, 'pass_done'))
+        self.assertEqual(
+            list(Question.objects.order_by('id').values_list('id', flat=True)),
+            [orphans[0].id, orphans[1].id]
+        )
+
+    def test_chunk_advances_cursor_and_shrinks_when_over_lock_budget(self):
+        orphans = [self._question(i) for i in range(30)]
+        scheduler = CleanupScheduler(tasks=['orphaned_questions'], chunk_size=20, max_lock_ms=200)
+
+        with mock.patch('quiz_app.services.cleanup_scheduler.time.monotonic', side_effect=[0.0, 0.5]):
+            rows, elapsed, state = scheduler.run_chunk('orphaned_questions')
+
+        cursor = CleanupCursor.objects.get(task='orphaned_questions')
+        self.assertEqual((rows, state), (20, 'chunk'))
+        self.assertEqual(cursor.last_id, orphans[19].id)
+        self.assertEqual(cursor.chunk_size, 10)
+        self.assertEqual(cursor.last_chunk_ms, 500.0)
+
+    def test_pacing_sleeps_to_rows_per_second(self):
+        scheduler = CleanupScheduler(rows_per_second=100)
+        with mock.patch.object(scheduler._stopping, 'wait') as wait:
+            scheduler._pace(50, 0.1)
+        wait.assert_called_once()
+        self.assertAlmostEqual(wait.call_args[0][0], 0.4)
+
+    def test_unknown_task_is_rejected(self):
+        with self.assertRaises(ValueError):
+            CleanupScheduler(tasks=['vacuum_everything'])
+
+
+class CleanupStatusApiTests(CleanupFixturesMixin, APITestCase):
+    def test_admin_sees_progress_and_backlog(self):
+        admin = self._user('scheduler_admin')
+        admin.profile.role = 'admin'
+        admin.profile.save(update_fields=['role'])
+        self._question(1)
+        CleanupCursor.objects.create(task='orphaned_questions', processed_total=7, rows_per_second=120.5)
+        self.client.force_authenticate(user=admin)
+
+        response = self.client.get('/api/quiz/admin/cleanup/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        tasks = {entry['task']: entry for entry in response.data['tasks']}
+        self.assertEqual(tasks['orphaned_questions']['processed_total'], 7)
+        self.assertEqual(tasks['orphaned_questions']['backlog'], 1)
+        self.assertEqual(tasks['abandoned_sessions']['processed_total'], 0)
+        self.assertEqual(len(cleanup_metrics(include_backlog=False)), 4)
+
+    def test_regular_user_is_forbidden(self):
+        self.client.force_authenticate(user=self._user())
+        response = self.client.get('/api/quiz/admin/cleanup/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
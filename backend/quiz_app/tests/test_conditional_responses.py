@@ -0,0 +1,132 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from quiz_app.models import Question, QuizSession
+
+User = get_user_model()
+
+
+class ConditionalResponseTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='etag_user@example.com',
+            username='etag_user',
+            password='Secret123!'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _revalidate(self, url, response, params=None):
+        return self.client.get(url, params or {}, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_library_returns_304_until_a_question_changes(self):
+        question = Question.objects.create(
+            topic='Chemia',
+            question_text='Jaki symbol ma złoto?',
+            correct_answer='Au',
+            wrong_answer_1='Ag',
+            wrong_answer_2='Zn',
+            wrong_answer_3='Fe',
+            explanation='Złoto to aurum.',
+            total_answers=1
+        )
+
+        first = self.client.get('/api/quiz/questions/', {'page': 1})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first['Cache-Control'], 'private, max-age=30')
+
+        unchanged = self._revalidate('/api/quiz/questions/', first, {'page': 1})
+        self.assertEqual(unchanged.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(unchanged['ETag'], first['ETag'])
+
+        other_filter = self._revalidate('/api/quiz/questions/', first, {'page': 2})
+        self.assertEqual(other_filter.status_code, status.HTTP_200_OK)
+
+        question.update_stats(True)
+        question.explanation = 'Symbol Au pochodzi od łacińskiego aurum.'
+        question.save()
+
+        changed = self._revalidate('/api/quiz/questions/', first, {'page': 1})
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+
+    def test_library_ignores_answer_statistics_until_the_bucket_rolls(self):
+        question = Question.objects.create(
+            topic='Chemia',
+            question_text='Jaki symbol ma srebro?',
+            correct_answer='Ag',
+            wrong_answer_1='Au',
+            wrong_answer_2='Zn',
+            wrong_answer_3='Fe',
+            explanation='Srebro to argentum.',
+            total_answers=1
+        )
+
+        with patch('quiz_app.utils.conditional.time.time', return_value=1_000_000):
+            first = self.client.get('/api/quiz/questions/')
+            Question.objects.create(
+                topic='Chemia',
+                question_text='Jaki symbol ma miedź?',
+                correct_answer='Cu',
+                wrong_answer_1='Co',
+                wrong_answer_2='Cr',
+                wrong_answer_3='Ca',
+            )
+            question.update_stats(False)
+            question.save(update_fields=['times_used'])
+            unchanged = self._revalidate('/api/quiz/questions/', first)
+        self.assertEqual(unchanged.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with patch('quiz_app.utils.conditional.time.time', return_value=1_000_000 + 3600):
+            rolled = self._revalidate('/api/quiz/questions/', first)
+        self.assertEqual(rolled.status_code, status.HTTP_200_OK)
+
+    def test_history_revalidates_after_session_completion(self):
+        first = self.client.get('/api/quiz/history/')
+        self.assertEqual(first['Cache-Control'], 'private, no-cache')
+        self.assertEqual(self._revalidate('/api/quiz/history/', first).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        QuizSession.objects.create(
+            user=self.user,
+            topic='Chemia',
+            initial_difficulty='medium',
+            current_difficulty=5.0,
+            is_completed=True,
+            ended_at=timezone.now()
+        )
+
+        changed = self._revalidate('/api/quiz/history/', first)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(changed.data['count'], 1)
+
+    def test_etags_are_scoped_per_user(self):
+        other = User.objects.create_user(
+            email='etag_other@example.com',
+            username='etag_other',
+            password='Secret123!'
+        )
+        first = self.client.get('/api/quiz/history/')
+
+        self.client.force_authenticate(user=other)
+        response = self._revalidate('/api/quiz/history/', first)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_current_user_revalidates_after_profile_change(self):
+        first = self.client.get('/api/users/me/')
+        self.assertEqual(self._revalidate('/api/users/me/', first).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.user.profile.highest_streak = 7
+        self.user.profile.save()
+
+        changed = self._revalidate('/api/users/me/', first)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+
+    def test_leaderboard_sets_cache_control_and_validator(self):
+        first = self.client.get('/api/quiz/leaderboard/global/')
+        self.assertEqual(first['Cache-Control'], 'private, max-age=60')
+        self.assertEqual(
+            self._revalidate('/api/quiz/leaderboard/global/', first).status_code,
+            status.HTTP_304_NOT_MODIFIED
+        )
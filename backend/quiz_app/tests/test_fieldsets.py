@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from quiz_app.models import Question, QuizSession
+
+User = get_user_model()
+
+
+class SparseFieldsetTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='fields_user@example.com',
+            username='fields_user',
+            password='Secret123!'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.question = Question.objects.create(
+            topic='Biologia',
+            question_text='Który organ pompuje krew?',
+            correct_answer='Serce',
+            wrong_answer_1='Płuca',
+            wrong_answer_2='Wątroba',
+            wrong_answer_3='Nerki',
+            explanation='Serce tłoczy krew do naczyń krwionośnych.',
+            total_answers=4,
+            correct_answers_count=3
+        )
+        QuizSession.objects.create(
+            user=self.user,
+            topic='Biologia',
+            initial_difficulty='medium',
+            current_difficulty=5.0,
+            is_completed=True,
+            total_questions=4,
+            correct_answers=3,
+            ended_at=timezone.now()
+        )
+
+    def _select_sql(self, url, params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, ' '.join(q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT'))
+
+    def test_library_fields_trim_projection_and_body(self):
+        response, sql = self._select_sql('/api/quiz/questions/', {'fields': 'id,question_text'})
+
+        self.assertEqual(response.data['results'], [
+            {'id': self.question.id, 'question_text': self.question.question_text}
+        ])
+        self.assertNotIn('"explanation"', sql)
+        self.assertNotIn('"embedding_vector"', sql)
+
+    def test_library_exclude_keeps_other_fields(self):
+        response = self.client.get('/api/quiz/questions/', {'exclude': 'explanation,stats'})
+
+        item = response.data['results'][0]
+        self.assertNotIn('explanation', item)
+        self.assertNotIn('stats', item)
+        self.assertEqual(item['correct_answer'], 'Serce')
+
+    def test_library_without_params_returns_full_items(self):
+        item = self.client.get('/api/quiz/questions/').data['results'][0]
+
+        self.assertEqual(item['stats']['wrong_answers'], 1)
+        self.assertEqual(item['difficulty_level'], 'średni')
+        self.assertIn('explanation', item)
+
+    def test_history_fields_trim_projection_and_body(self):
+        response, sql = self._select_sql('/api/quiz/history/', {'fields': 'id,accuracy,unknown'})
+
+        self.assertEqual(set(response.data['results'][0]), {'id', 'accuracy'})
+        self.assertEqual(response.data['results'][0]['accuracy'], 75.0)
+        self.assertNotIn('"username"', sql)
+
+    def test_leaderboard_exclude_skips_profile_join_and_response_time_subquery(self):
+        response, sql = self._select_sql(
+            '/api/quiz/leaderboard/global/',
+            {'exclude': 'email,avatar_url,avg_response_time'}
+        )
+
+        entry = response.data['leaderboard'][0]
+        self.assertEqual(entry['username'], 'fields_user')
+        self.assertNotIn('email', entry)
+        self.assertNotIn('avatar_url', entry)
+        self.assertNotIn('users_userprofile', sql)
+        self.assertNotIn('"response_time"', sql)
+
+        response, sql = self._select_sql('/api/quiz/leaderboard/global/', {})
+        full = response.data['leaderboard'][0]
+        self.assertEqual(full['email'], 'fields_user@example.com')
+        self.assertIn('avg_response_time', full)
+        self.assertIn('users_userprofile', sql)
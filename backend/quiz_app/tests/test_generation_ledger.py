@@ -0,0 +1,217 @@
+import threading
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from cache_manager import CacheLease, LeaseUnavailable
+from quiz_app.models import Question, QuizSession, QuizSessionQuestion
+from quiz_app.services.answer_service import _cleanup_old_level_questions
+from quiz_app.services.background_generation_service import BackgroundGenerationService
+from quiz_app.services.generation_ledger import (
+    generation_ledger_state,
+    generation_slots,
+    release_generation,
+    reserve_generation,
+)
+
+User = get_user_model()
+
+
+class CacheLeaseTests(TestCase):
+    def test_lease_is_exclusive_until_released(self):
+        first = CacheLease('ledger-test', wait=0)
+        second = CacheLease('ledger-test', wait=0)
+
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+        with self.assertRaises(LeaseUnavailable):
+            with second:
+                pass
+
+        first.release()
+        with second:
+            self.assertIsNotNone(second.token)
+        self.assertTrue(first.acquire())
+        first.release()
+
+    def test_release_keeps_lease_taken_over_by_another_holder(self):
+        stale = CacheLease('ledger-takeover', wait=0)
+        self.assertTrue(stale.acquire())
+        stale.token = 'expired-token'
+
+        stale.release()
+
+        self.assertFalse(CacheLease('ledger-takeover', wait=0).acquire())
+
+    def test_redis_release_compares_and_deletes_in_one_script(self):
+        class FakeRedis:
+            def __init__(self):
+                self.data = {}
+                self.scripts = []
+
+            def set(self, key, value, nx=False, ex=None):
+                if nx and key in self.data:
+                    return None
+                self.data[key] = value
+                return True
+
+            def eval(self, script, numkeys, key, token):
+                self.scripts.append((script, numkeys, key, token))
+                if self.data.get(key) == token:
+                    del self.data[key]
+                    return 1
+                return 0
+
+        redis = FakeRedis()
+        with patch('cache_manager.lease_service._redis_connection', return_value=redis):
+            stale = CacheLease('ledger-redis', wait=0)
+            self.assertTrue(stale.acquire())
+            key = cache.make_key('lease:ledger-redis')
+            self.assertEqual(redis.data, {key: stale.token})
+
+            stale_token = stale.token
+            redis.data[key] = 'new-holder'
+            stale.release()
+            self.assertEqual(redis.data, {key: 'new-holder'})
+            self.assertEqual(redis.scripts[0][1:], (1, key, stale_token))
+
+            current = CacheLease('ledger-redis', wait=0)
+            del redis.data[key]
+            self.assertTrue(current.acquire())
+            current.release()
+            self.assertEqual(redis.data, {})
+
+
+class LedgerFixtureMixin:
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='ledger_user@example.com',
+            username='ledger_user',
+            password='Secret123!'
+        )
+        self.session = QuizSession.objects.create(
+            user=self.user,
+            topic='Chemia',
+            initial_difficulty='medium',
+            current_difficulty=5.0,
+            questions_count=6
+        )
+        self._link(0)
+
+    def _link(self, order, difficulty_level='średni'):
+        question = Question.objects.create(
+            topic='Chemia',
+            question_text=f'Pytanie chemiczne numer {order}?',
+            correct_answer='Au',
+            wrong_answer_1='Ag',
+            wrong_answer_2='Fe',
+            wrong_answer_3='Cu',
+            explanation='Złoto to aurum.',
+            difficulty_level=difficulty_level,
+        )
+        QuizSessionQuestion.objects.create(session=self.session, question=question, order=order)
+        return question
+
+    def _write(self, slots, count):
+        for _ in range(count):
+            self._link(slots.order)
+            slots.added += 1
+
+
+class GenerationLedgerTests(LedgerFixtureMixin, TestCase):
+
+    def test_reservations_share_target_and_order_range(self):
+        first = reserve_generation(self.session, 3)
+        second = reserve_generation(self.session, 3)
+        third = reserve_generation(self.session, 3)
+
+        self.assertEqual((first.count, first.start_order), (3, 1))
+        self.assertEqual((second.count, second.start_order), (2, 4))
+        self.assertEqual(third.count, 0)
+        self.assertEqual(
+            generation_ledger_state(self.session),
+            {'target': 6, 'committed': 1, 'in_flight': 5, 'next_order': 6}
+        )
+
+        self._write(first, 2)
+        self.assertEqual(generation_ledger_state(self.session)['in_flight'], 3)
+        self.assertEqual(release_generation(self.session, first), 3)
+        state = generation_ledger_state(self.session)
+        self.assertEqual((state['committed'], state['in_flight']), (3, 2))
+        self.assertEqual(reserve_generation(self.session, 3).count, 1)
+
+    def test_expired_reservations_are_reclaimed(self):
+        with patch('quiz_app.services.generation_ledger.GENERATION_RESERVATION_TTL_SECONDS', -1):
+            reserve_generation(self.session, 5)
+
+        self.assertEqual(generation_ledger_state(self.session)['in_flight'], 0)
+        self.assertEqual(reserve_generation(self.session, 5).count, 5)
+
+    def test_generators_fill_only_their_reserved_slots(self):
+        service = BackgroundGenerationService()
+        other = reserve_generation(self.session, 3)
+
+        with patch.object(service.core, 'generate_questions_data', return_value=[{'question': 'q'}] * 6) as gen, \
+                patch.object(service.core, 'add_question_from_data',
+                             side_effect=lambda **kw: (self._link(kw['order']), kw['order'] + 1)) as add:
+            self.assertEqual(service.generate_adaptive_questions_sync(self.session, 'trudny', count=5), 2)
+            self.assertEqual(service.generate_adaptive_questions_sync(self.session, 'trudny', count=5), 0)
+
+        gen.assert_called_once()
+        self.assertEqual([call.kwargs['order'] for call in add.call_args_list], [4, 5])
+        with generation_slots(self.session, 1) as slots:
+            self.assertEqual(slots.count, 0)
+        self._write(other, 3)
+        self.assertEqual(release_generation(self.session, other), 6)
+
+    def test_level_change_cleanup_frees_ledger_slots(self):
+        with generation_slots(self.session, 5) as slots:
+            self._write(slots, 2)
+            for _ in range(3):
+                question = self._link(slots.order, difficulty_level='łatwy')
+                slots.added += 1
+        self.assertEqual(generation_ledger_state(self.session)['committed'], 6)
+        self.assertEqual(reserve_generation(self.session, 3).count, 0)
+
+        _cleanup_old_level_questions(self.session, 'łatwy', [question.id])
+
+        self.assertEqual(generation_ledger_state(self.session)['committed'], 4)
+        slots = reserve_generation(self.session, 3)
+        self.assertEqual((slots.count, slots.start_order), (2, 6))
+
+    def test_release_without_lease_keeps_ledger(self):
+        slots = reserve_generation(self.session, 2)
+        self._write(slots, 1)
+
+        with patch('quiz_app.services.generation_ledger.GENERATION_LEASE_WAIT_SECONDS', 0), \
+                CacheLease('generation_ledger:{}'.format(self.session.id), wait=0):
+            self.assertIsNone(release_generation(self.session, slots))
+
+        self.assertEqual(
+            generation_ledger_state(self.session),
+            {'target': 6, 'committed': 1, 'in_flight': 1, 'next_order': 3}
+        )
+
+
+class GenerationLedgerConcurrencyTests(LedgerFixtureMixin, TransactionTestCase):
+    # Committed rows, so every thread's own connection counts the same session.
+
+    def test_concurrent_generators_never_exceed_target(self):
+        granted = []
+
+        def reserve():
+            try:
+                granted.append(reserve_generation(self.session, 2).count)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=reserve) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(granted), 5)
@@ -0,0 +1,290 @@
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from openai import PermissionDeniedError
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from quiz_app.models import GenerationJob, QuizSession
+from quiz_app.services.answer_service import _schedule_level_generation
+from quiz_app.services.background_generation_service import BackgroundGenerationService
+from quiz_app.services.generation_queue import (
+    GenerationPreempted,
+    claim_generation_jobs,
+    enqueue_generation_job,
+    generation_queue_stats,
+    inline_generation_job,
+    requeue_stale_generation_jobs,
+)
+from quiz_app.services.generation_worker import GenerationWorkerPool
+
+User = get_user_model()
+
+
+class GenerationQueueTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='queue_user@example.com',
+            username='queue_user',
+            password='Secret123!'
+        )
+        self.session = QuizSession.objects.create(
+            user=self.user,
+            topic='Astronomia',
+            initial_difficulty='medium',
+            current_difficulty=5.0,
+            questions_count=10
+        )
+
+    def test_remaining_generation_is_queued_instead_of_threaded(self):
+        job = BackgroundGenerationService().generate_remaining_questions_async(
+            session_id=self.session.id, total_needed=10, already_generated=3
+        )
+
+        self.assertEqual(job.kind, GenerationJob.KIND_FILL_SESSION)
+        self.assertEqual(job.payload, {'count': 7, 'start_order': 3})
+        self.assertEqual(job.status, GenerationJob.STATUS_QUEUED)
+
+    def test_queued_job_is_reused_with_latest_payload(self):
+        first = enqueue_generation_job(GenerationJob.KIND_LEVEL_CHANGE, self.session.id,
+                                       difficulty_level='łatwy', needed=4)
+        second = enqueue_generation_job(GenerationJob.KIND_LEVEL_CHANGE, self.session.id,
+                                        difficulty_level='trudny', needed=5)
+
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(GenerationJob.objects.get().payload, {'difficulty_level': 'trudny', 'needed': 5})
+
+    def test_queue_is_bounded(self):
+        other = QuizSession.objects.create(
+            user=self.user, topic='Astronomia', initial_difficulty='medium', current_difficulty=5.0
+        )
+        with patch('quiz_app.services.generation_queue.GENERATION_QUEUE_MAX_DEPTH', 1):
+            self.assertIsNotNone(enqueue_generation_job(GenerationJob.KIND_FILL_SESSION, self.session.id))
+            self.assertIsNone(enqueue_generation_job(GenerationJob.KIND_FILL_SESSION, other.id))
+        self.assertEqual(GenerationJob.objects.count(), 1)
+
+    def test_level_change_and_pregeneration_are_queued(self):
+        _schedule_level_generation(self.session, 'trudny', 6, BackgroundGenerationService())
+        BackgroundGenerationService().schedule_pregeneration(self.session.id, 'łatwy', 2)
+
+        self.assertEqual(
+            set(GenerationJob.objects.values_list('kind', flat=True)),
+            {GenerationJob.KIND_LEVEL_CHANGE, GenerationJob.KIND_PREGENERATE_LEVEL}
+        )
+
+    @patch.object(BackgroundGenerationService, 'generate_session_questions', return_value=7)
+    def test_worker_runs_handler_and_reports_latency(self, mock_handler):
+        enqueue_generation_job(GenerationJob.KIND_FILL_SESSION, self.session.id, count=7, start_order=3)
+
+        processed = GenerationWorkerPool(workers=1, name='test').run_pending()
+
+        self.assertEqual(processed, 1)
+        mock_handler.assert_called_once()
+        self.assertEqual(mock_handler.call_args.args[0].id, self.session.id)
+        self.assertEqual(mock_handler.call_args.kwargs, {'count': 7, 'start_order': 3})
+        job = GenerationJob.objects.get()
+        self.assertEqual((job.status, job.attempts, job.worker), (GenerationJob.STATUS_DONE, 1, 'test'))
+
+        stats = generation_queue_stats()
+        self.assertEqual((stats['depth'], stats['completed']), (0, 1))
+        self.assertIsNotNone(stats['wait_ms']['p95'])
+
+    @patch.object(BackgroundGenerationService, 'generate_level_questions', side_effect=RuntimeError('LLM down'))
+    def test_failed_job_retries_with_backoff_then_fails(self, mock_handler):
+        enqueue_generation_job(GenerationJob.KIND_LEVEL_CHANGE, self.session.id,
+                               difficulty_level='trudny', needed=3)
+        pool = GenerationWorkerPool(workers=1, name='test')
+
+        pool.run_pending()
+        job = GenerationJob.objects.get()
+        self.assertEqual((job.status, job.attempts), (GenerationJob.STATUS_QUEUED, 1))
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertEqual(claim_generation_jobs('test'), [])
+
+        for _ in range(job.max_attempts - 1):
+            GenerationJob.objects.update(run_after=timezone.now())
+            pool.run_pending()
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (GenerationJob.STATUS_FAILED, 3))
+        self.assertEqual(job.last_error, 'LLM down')
+        self.assertEqual(mock_handler.call_count, 3)
+
+    def test_openai_error_in_handler_is_retried(self):
+        enqueue_generation_job(GenerationJob.KIND_FILL_SESSION, self.session.id, count=2, start_order=0)
+        error = PermissionDeniedError('quota', response=MagicMock(status_code=403), body=None)
+
+        with patch.object(BackgroundGenerationService, 'generate_session_questions', side_effect=error):
+            self.assertEqual(GenerationWorkerPool(workers=1, name='test').run_pending(), 1)
+
+        job = GenerationJob.objects.get()
+        self.assertEqual((job.status, job.last_error), (GenerationJob.STATUS_QUEUED, 'quota'))
+
+    def test_worker_thread_survives_unexpected_handler_errors(self):
+        job = enqueue_generation_job(GenerationJob.KIND_FILL_SESSION, self.session.id, count=2, start_order=0)
+        claim_generation_jobs('test/1')
+        job.refresh_from_db()
+        pool = GenerationWorkerPool(workers=1, name='test', poll_seconds=0)
+        claims = [[job], [job], []]
+
+        def claim(worker):
+            if len(claims) == 1:
+                pool.stop()
+            return claims.pop(0)
+
+        with patch('quiz_app.services.generation_worker.claim_generation_jobs', side_effect=claim), \
+                patch('quiz_app.services.generation_worker.close_old_connections'), \
+                patch.object(pool, 'run_job', side_effect=AttributeError('broken handler')) as run_job, \
+                self.assertLogs('quiz_app.services.generation_worker', 'ERROR'):
+            pool._work(1)
+
+        self.assertEqual(run_job.call_count, 2)
+        job.refresh_from_db()
+        self.assertEqual(job.last_error, 'broken handler')
+
+    def test_jobs_lost_by_dead_worker_are_requeued(self):
+        job = enqueue_generation_job(GenerationJob.KIND_FILL_SESSION, self.session.id, count=1, start_order=0)
+        claim_generation_jobs('dead-worker')
+        GenerationJob.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(requeue_stale_generation_jobs(), (1, 0))
+        self.assertEqual(GenerationJob.objects.get().status, GenerationJob.STATUS_QUEUED)
+
+
+class GenerationPriorityTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='priority_user@example.com',
+            username='priority_user',
+            password='Secret123!'
+        )
+        self.sessions = [
+            QuizSession.objects.create(
+                user=self.user,
+                topic='Astronomia',
+                initial_difficulty='medium',
+                current_difficulty=5.0,
+                questions_count=10
+            )
+            for _ in range(3)
+        ]
+
+    def _enqueue_all_classes(self):
+        enqueue_generation_job(GenerationJob.KIND_FILL_SESSION, self.sessions[0].id, count=5, start_order=0)
+        enqueue_generation_job(GenerationJob.KIND_PREGENERATE_LEVEL, self.sessions[1].id,
+                               difficulty_level='łatwy', count=2)
+        enqueue_generation_job(GenerationJob.KIND_LEVEL_CHANGE, self.sessions[2].id,
+                               difficulty_level='trudny', needed=3)
+
+    def test_jobs_are_claimed_by_priority_class(self):
+        self._enqueue_all_classes()
+
+        jobs = claim_generation_jobs('test', limit=3)
+
+        self.assertEqual(
+            [job.kind for job in jobs],
+            [GenerationJob.KIND_LEVEL_CHANGE, GenerationJob.KIND_PREGENERATE_LEVEL,
+             GenerationJob.KIND_FILL_SESSION]
+        )
+
+    def test_speculative_classes_wait_while_session_start_runs(self):
+        self._enqueue_all_classes()
+
+        with inline_generation_job(GenerationJob.KIND_SESSION_START, self.sessions[0].id, count=3):
+            jobs = claim_generation_jobs('test', limit=3)
+            self.assertEqual([job.kind for job in jobs], [GenerationJob.KIND_LEVEL_CHANGE])
+            self.assertEqual(
+                generation_queue_stats()['throttled_classes'],
+                ['background_fill', 'pregenerate']
+            )
+
+        self.assertEqual(len(claim_generation_jobs('test', limit=3)), 2)
+
+    def test_running_limit_per_class(self):
+        enqueue_generation_job(GenerationJob.KIND_FILL_SESSION, self.sessions[0].id, count=5, start_order=0)
+        enqueue_generation_job(GenerationJob.KIND_FILL_SESSION, self.sessions[1].id, count=5, start_order=0)
+
+        with patch('quiz_app.services.generation_queue.GENERATION_MAX_RUNNING_BY_PRIORITY', {4: 1}):
+            self.assertEqual(len(claim_generation_jobs('test')), 1)
+            self.assertEqual(claim_generation_jobs('test'), [])
+
+    @patch.object(BackgroundGenerationService, 'generate_session_questions',
+                  side_effect=GenerationPreempted('urgent work'))
+    def test_preempted_job_is_requeued_without_using_an_attempt(self, mock_handler):
+        enqueue_generation_job(GenerationJob.KIND_FILL_SESSION, self.sessions[0].id, count=5, start_order=0)
+
+        GenerationWorkerPool(workers=1, name='test').run_pending()
+
+        job = GenerationJob.objects.get()
+        self.assertEqual((job.status, job.attempts), (GenerationJob.STATUS_QUEUED, 0))
+        self.assertGreater(job.run_after, timezone.now())
+
+    def test_background_fill_yields_between_batches(self):
+        service = BackgroundGenerationService()
+        with inline_generation_job(GenerationJob.KIND_SHORTFALL, self.sessions[1].id, count=2), \
+                patch.object(service.core, 'generate_questions_data') as mock_generate:
+            with self.assertRaises(GenerationPreempted):
+                service.generate_session_questions(self.sessions[0], count=5, start_order=0)
+        mock_generate.assert_not_called()
+
+    def test_inline_jobs_report_per_class_latency(self):
+        with inline_generation_job(GenerationJob.KIND_SESSION_START, self.sessions[0].id, count=3):
+            pass
+        with self.assertRaises(RuntimeError):
+            with inline_generation_job(GenerationJob.KIND_SHORTFALL, self.sessions[1].id, count=2):
+                raise RuntimeError('LLM down')
+
+        classes = generation_queue_stats()['classes']
+        self.assertEqual(classes['session_start']['completed'], 1)
+        self.assertIsNotNone(classes['session_start']['latency_ms']['p95'])
+        self.assertEqual(classes['shortfall']['failed'], 1)
+        self.assertEqual(classes['background_fill']['completed'], 0)
+        self.assertFalse(generation_queue_stats()['urgent_active'])
+
+
+class GenerationQueueApiTests(APITestCase):
+    @patch('quiz_app.views.quiz_view.BackgroundGenerationService.generate_initial_questions_sync')
+    def test_start_quiz_queues_remaining_questions(self, mock_initial):
+        user = User.objects.create_user(
+            email='queue_api@example.com',
+            username='queue_api',
+            password='Secret123!'
+        )
+        user.profile.role = 'admin'
+        user.profile.save(update_fields=['role'])
+        self.client.force_authenticate(user=user)
+        mock_initial.return_value = [object(), object(), object()]
+
+        response = self.client.post(
+            '/api/quiz/start/',
+            {'topic': 'Astronomia', 'difficulty': 'medium', 'questions_count': 10},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        job = GenerationJob.objects.get(session_id=response.data['session_id'])
+        self.assertEqual(job.payload, {'count': 7, 'start_order': 3})
+
+        response = self.client.get('/api/quiz/admin/generation-queue/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['depth'], 1)
+        self.assertEqual(response.data['queued_by_kind'], {GenerationJob.KIND_FILL_SESSION: 1})
+
+    def test_llm_governor_status_is_admin_only(self):
+        user = User.objects.create_user(
+            email='governor_api@example.com',
+            username='governor_api',
+            password='Secret123!'
+        )
+        self.client.force_authenticate(user=user)
+        self.assertEqual(self.client.get('/api/quiz/admin/llm-governor/').status_code, status.HTTP_403_FORBIDDEN)
+
+        user.profile.role = 'admin'
+        user.profile.save(update_fields=['role'])
+        response = self.client.get('/api/quiz/admin/llm-governor/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('rpm_utilization', response.data)
+        self.assertIn('current_wait_seconds', response.data)
@@ -0,0 +1,144 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from llm_integration.rate_governor import RateGovernor
+from quiz_app.models import GenerationCall, GenerationUsageDaily, Question, QuizSession, QuizSessionQuestion
+from quiz_app.services.answer_service import _cleanup_old_level_questions
+from quiz_app.services.background_generation_service import BackgroundGenerationService
+from quiz_app.services.generation_telemetry import purge_generation_calls_chunk
+
+User = get_user_model()
+
+
+def _question(number):
+    return {
+        "question": f"Ktore miasto jest stolica panstwa numer {number}?",
+        "correct_answer": f"Miasto {number}",
+        "wrong_answers": [f"Wies {number}", f"Osada {number}", f"Grod {number}"],
+        "explanation": f"Poprawna odpowiedz to Miasto {number}.",
+    }
+
+
+class GenerationTelemetryTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='telemetry_user@example.com',
+            username='telemetry_user',
+            password='Secret123!'
+        )
+        self.session = QuizSession.objects.create(
+            user=self.user,
+            topic='Geografia',
+            initial_difficulty='easy',
+            current_difficulty=2.0,
+            questions_count=10
+        )
+        self.service = BackgroundGenerationService()
+        generator = self.service.core.generator
+        generator.governor = RateGovernor(rpm=0, tpm=0)
+        generator.client = MagicMock()
+        self.create = generator.client.chat.completions.create
+
+    def _respond(self, questions, prompt_tokens=800, completion_tokens=400):
+        self.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps({"questions": questions})))],
+            usage=SimpleNamespace(
+                total_tokens=prompt_tokens + completion_tokens,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=0),
+            ),
+        )
+
+    def test_call_records_tokens_and_rejection_funnel(self):
+        invalid = {**_question(9), "wrong_answers": ["a", "b"]}
+        self._respond([_question(1), _question(1), invalid, _question(2), _question(3), _question(4)])
+
+        created = self.service.generate_initial_questions_sync(self.session, count=2)
+
+        self.assertEqual(len(created), 2)
+        call = GenerationCall.objects.get()
+        self.assertEqual((call.user_id, call.topic, call.requests), (self.user.id, 'Geografia', 1))
+        self.assertEqual((call.prompt_tokens, call.completion_tokens), (800, 400))
+        self.assertEqual((call.requested, call.returned, call.valid, call.added), (3, 6, 5, 2))
+        self.assertEqual(call.rejected_validation, 1)
+        self.assertEqual(call.rejected_session_duplicate, 1)
+        self.assertEqual(call.unused, 2)
+        self.assertEqual(call.cost_usd, Decimal('0.001000'))
+
+        daily = GenerationUsageDaily.objects.get()
+        self.assertEqual((daily.calls, daily.prompt_tokens, daily.added), (1, 800, 2))
+
+    def test_rollup_accumulates_and_calls_are_append_only(self):
+        self._respond([_question(1), _question(2), _question(3)])
+        self.service.generate_initial_questions_sync(self.session, count=1)
+        self._respond([_question(4), _question(5), _question(6)])
+        self.service.generate_initial_questions_sync(self.session, count=1)
+
+        daily = GenerationUsageDaily.objects.get()
+        self.assertEqual((daily.calls, daily.requests, daily.prompt_tokens, daily.added), (2, 2, 1600, 2))
+
+        call = GenerationCall.objects.first()
+        call.added = 10
+        with self.assertRaises(ValueError):
+            call.save()
+
+    def test_level_cleanup_is_recorded_as_discarded_questions(self):
+        for order in range(3):
+            question = Question.objects.create(
+                topic='Geografia',
+                difficulty_level='łatwy',
+                question_text=f'Jak nazywa sie rzeka numer {order}?',
+                correct_answer='Wisla',
+                wrong_answer_1='Odra',
+                wrong_answer_2='Warta',
+                wrong_answer_3='Bug',
+                explanation='To Wisla.'
+            )
+            QuizSessionQuestion.objects.create(session=self.session, question=question, order=order)
+
+        _cleanup_old_level_questions(self.session, 'łatwy', answered_question_ids=[])
+
+        call = GenerationCall.objects.get()
+        self.assertEqual((call.kind, call.rejected_level_cleanup, call.requests), (GenerationCall.KIND_LEVEL_CLEANUP, 3, 0))
+        self.assertEqual(GenerationUsageDaily.objects.get().rejected_level_cleanup, 3)
+
+    def test_purge_keeps_daily_rollups(self):
+        self._respond([_question(1), _question(2), _question(3)])
+        self.service.generate_initial_questions_sync(self.session, count=1)
+
+        purged = purge_generation_calls_chunk(100, created_before=timezone.now() + timedelta(seconds=1))
+
+        self.assertEqual(len(purged), 1)
+        self.assertFalse(GenerationCall.objects.exists())
+        self.assertEqual(GenerationUsageDaily.objects.get().calls, 1)
+
+    def test_usage_report_groups_cost_by_topic_and_user(self):
+        self._respond([_question(1), _question(2), _question(3)])
+        self.service.generate_initial_questions_sync(self.session, count=1)
+
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get('/api/quiz/admin/llm-usage/').status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.profile.role = 'admin'
+        self.user.profile.save(update_fields=['role'])
+        by_topic = self.client.get('/api/quiz/admin/llm-usage/?days=1')
+        by_user = self.client.get('/api/quiz/admin/llm-usage/?group=user')
+
+        self.assertEqual(by_topic.status_code, status.HTTP_200_OK)
+        self.assertEqual(by_topic.data['groups'][0]['topic'], 'Geografia')
+        self.assertEqual(by_topic.data['groups'][0]['cost_usd'], 0.001)
+        self.assertEqual(by_topic.data['totals']['prompt_tokens'], 800)
+        self.assertEqual(len(by_topic.data['daily']), 1)
+        self.assertEqual(by_user.data['groups'][0]['user__username'], 'telemetry_user')
+        self.assertEqual(by_user.data['groups'][0]['rejections']['validation'], 0)
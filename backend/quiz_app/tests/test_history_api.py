@@ -0,0 +1,199 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from quiz_app.models import Answer, Question, QuizSession, QuizSessionSnapshot
+from quiz_app.services.history_service import snapshot_completed_session
+
+User = get_user_model()
+
+
+class QuizHistoryApiTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='history_user@example.com',
+            username='history_user',
+            password='Secret123!'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _session(self, **settings):
+        return QuizSession.objects.create(
+            user=self.user,
+            topic='Geografia',
+            initial_difficulty='medium',
+            current_difficulty=5.0,
+            is_completed=True,
+            ended_at=timezone.now(),
+            **settings
+        )
+
+    def test_is_custom_is_stored_from_session_settings(self):
+        default = self._session()
+        custom = self._session(questions_count=15)
+
+        self.assertFalse(default.is_custom)
+        self.assertTrue(custom.is_custom)
+
+        default.time_per_question = 45
+        default.save(update_fields=['time_per_question'])
+        default.refresh_from_db()
+        self.assertTrue(default.is_custom)
+
+    def test_history_filters_on_is_custom(self):
+        default = self._session()
+        custom = self._session(use_adaptive_difficulty=False)
+
+        response = self.client.get('/api/quiz/history/', {'is_custom': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data['results']], [custom.id])
+        self.assertTrue(response.data['results'][0]['is_custom'])
+
+        response = self.client.get('/api/quiz/history/', {'is_custom': 'false'})
+        self.assertEqual([item['id'] for item in response.data['results']], [default.id])
+        self.assertFalse(response.data['results'][0]['is_custom'])
+
+    def test_history_reads_denormalized_response_totals(self):
+        session = self._session()
+        question = Question.objects.create(
+            topic='Geografia',
+            question_text='Jaka jest stolica Francji?',
+            correct_answer='Paryż',
+            wrong_answer_1='Lyon',
+            wrong_answer_2='Nicea',
+            wrong_answer_3='Marsylia',
+            explanation='Stolicą Francji jest Paryż.'
+        )
+        Answer.objects.create(
+            question=question, user=self.user, session=session,
+            selected_answer='Paryż', is_correct=True, response_time=2.25
+        )
+        session.record_answer(2.25)
+        session.record_answer(1.5)
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/quiz/history/')
+        self.assertEqual(response.data['results'][0]['total_response_time'], 3.75)
+        self.assertEqual(response.data['results'][0]['answers_count'], 2)
+
+    def test_backfill_session_totals_recomputes_from_answers(self):
+        session = self._session()
+        question = Question.objects.create(
+            topic='Geografia',
+            question_text='Która rzeka jest najdłuższa w Polsce?',
+            correct_answer='Wisła',
+            wrong_answer_1='Odra',
+            wrong_answer_2='Warta',
+            wrong_answer_3='Bug',
+            explanation='Wisła jest najdłuższą rzeką Polski.'
+        )
+        Answer.objects.create(
+            question=question, user=self.user, session=session,
+            selected_answer='Odra', is_correct=False, response_time=4.5
+        )
+
+        call_command('backfill_session_totals', stdout=StringIO())
+
+        session.refresh_from_db()
+        self.assertEqual(session.answers_count, 1)
+        self.assertEqual(session.total_response_time, 4.5)
+
+
+class QuizDetailsSnapshotTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='snapshot_user@example.com',
+            username='snapshot_user',
+            password='Secret123!'
+        )
+        self.admin = User.objects.create_user(
+            email='snapshot_admin@example.com',
+            username='snapshot_admin',
+            password='Secret123!'
+        )
+        self.admin.profile.role = 'admin'
+        self.admin.profile.save(update_fields=['role'])
+        self.client.force_authenticate(user=self.user)
+
+        self.session = QuizSession.objects.create(
+            user=self.user,
+            topic='Astronomia',
+            initial_difficulty='medium',
+            current_difficulty=5.0,
+            is_completed=True,
+            total_questions=1,
+            correct_answers=1,
+            ended_at=timezone.now()
+        )
+        self.question = Question.objects.create(
+            topic='Astronomia',
+            question_text='Która planeta jest najbliżej Słońca?',
+            correct_answer='Merkury',
+            wrong_answer_1='Wenus',
+            wrong_answer_2='Mars',
+            wrong_answer_3='Ziemia',
+            explanation='Merkury krąży najbliżej Słońca.'
+        )
+        Answer.objects.create(
+            question=self.question, user=self.user, session=self.session,
+            selected_answer='Merkury', is_correct=True, response_time=3.2
+        )
+        snapshot_completed_session(self.session)
+
+    def _details(self, **headers):
+        return self.client.get(f'/api/quiz/details/{self.session.id}/', **headers)
+
+    def test_completed_session_is_served_from_snapshot_with_etag(self):
+        self.assertTrue(QuizSessionSnapshot.objects.filter(session=self.session).exists())
+
+        with self.assertNumQueries(1):
+            response = self._details()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['answers'][0]['question_text'], self.question.question_text)
+        self.assertEqual(response.data['session']['total_response_time'], 3.2)
+        self.assertIsNone(response.data['session']['user_info'])
+
+        cached = self._details(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_admin_question_edit_invalidates_snapshot(self):
+        etag = self._details()['ETag']
+
+        self.client.force_authenticate(user=self.admin)
+        self.client.patch(
+            f'/api/quiz/admin/questions/{self.question.id}/update/',
+            {'explanation': 'Merkury jest pierwszą planetą Układu Słonecznego.'},
+            format='json'
+        )
+        self.assertFalse(QuizSessionSnapshot.objects.filter(session=self.session).exists())
+
+        self.client.force_authenticate(user=self.user)
+        response = self._details(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['answers'][0]['explanation'],
+            'Merkury jest pierwszą planetą Układu Słonecznego.'
+        )
+
+    def test_admin_view_adds_user_info_with_separate_etag(self):
+        owner_etag = self._details()['ETag']
+
+        self.client.force_authenticate(user=self.admin)
+        response = self._details()
+        self.assertEqual(response.data['session']['user_info']['username'], 'snapshot_user')
+        self.assertNotEqual(response['ETag'], owner_etag)
+
+    def test_admin_etag_changes_with_owner_username(self):
+        self.client.force_authenticate(user=self.admin)
+        first = self._details()
+
+        self.user.username = 'renamed_snapshot_user'
+        self.user.save()
+
+        response = self._details(HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['session']['user_info']['username'], 'renamed_snapshot_user')
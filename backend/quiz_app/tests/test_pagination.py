@@ -0,0 +1,121 @@
+import base64
+import json
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from quiz_app.models import Question, QuizSession
+
+User = get_user_model()
+
+
+class CursorPaginationApiTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='cursor_user@example.com',
+            username='cursor_user',
+            password='Secret123!'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _sessions(self, count):
+        started_at = timezone.now()
+        sessions = []
+        for _ in range(count):
+            session = QuizSession.objects.create(
+                user=self.user,
+                topic='Historia',
+                initial_difficulty='medium',
+                current_difficulty=5.0,
+                is_completed=True,
+                ended_at=started_at
+            )
+            sessions.append(session)
+        # Identical started_at values make the id tie-breaker do the work.
+        QuizSession.objects.filter(id__in=[s.id for s in sessions]).update(started_at=started_at)
+        return sorted(s.id for s in sessions)[::-1]
+
+    def test_history_cursor_walks_forward_and_back_without_gaps(self):
+        expected = self._sessions(5)
+
+        seen = []
+        pages = []
+        params = {'cursor': '', 'page_size': 2}
+        while True:
+            response = self.client.get('/api/quiz/history/', params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIsNone(response.data['count'])
+            pages.append(response.data)
+            seen.extend(item['id'] for item in response.data['results'])
+            if not response.data['next_cursor']:
+                break
+            params['cursor'] = response.data['next_cursor']
+
+        self.assertEqual(seen, expected)
+        self.assertFalse(pages[0]['previous'])
+        self.assertTrue(pages[-1]['previous'])
+
+        back = self.client.get(
+            '/api/quiz/history/',
+            {'cursor': pages[-1]['previous_cursor'], 'page_size': 2}
+        )
+        self.assertEqual([item['id'] for item in back.data['results']], expected[2:4])
+        self.assertTrue(back.data['next'])
+
+    def test_history_cursor_reports_exact_and_estimated_counts(self):
+        self._sessions(3)
+
+        exact = self.client.get('/api/quiz/history/', {'cursor': '', 'count': 'exact'})
+        self.assertEqual(exact.data['count'], 3)
+
+        estimate = self.client.get('/api/quiz/history/', {'cursor': '', 'count': 'estimate'})
+        self.assertIsInstance(estimate.data['count'], int)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        expected = self._sessions(2)
+
+        response = self.client.get('/api/quiz/history/', {'cursor': 'not-a-cursor'})
+        self.assertEqual([item['id'] for item in response.data['results']], expected)
+
+    def test_tampered_cursor_values_fall_back_to_first_page(self):
+        expected = self._sessions(2)
+
+        for values in (['garbage', 1], [{'x': 1}, 1], ['2024-01-01T00:00:00+00:00', 'abc'], [None, 1]):
+            cursor = base64.urlsafe_b64encode(json.dumps({'v': values}).encode()).decode().rstrip('=')
+            response = self.client.get('/api/quiz/history/', {'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual([item['id'] for item in response.data['results']], expected)
+
+    def test_page_number_api_is_unchanged_without_cursor(self):
+        self._sessions(3)
+
+        response = self.client.get('/api/quiz/history/', {'page': 2, 'page_size': 2})
+        self.assertEqual(response.data['count'], 3)
+        self.assertNotIn('next_cursor', response.data)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_library_cursor_pagination(self):
+        ids = []
+        for i in range(3):
+            question = Question.objects.create(
+                topic='Chemia',
+                question_text=f'Ile protonów ma pierwiastek numer {i + 1}?',
+                correct_answer=str(i + 1),
+                wrong_answer_1='10',
+                wrong_answer_2='20',
+                wrong_answer_3='30',
+                total_answers=1
+            )
+            ids.append(question.id)
+
+        first = self.client.get('/api/quiz/questions/', {'cursor': '', 'page_size': 2})
+        self.assertEqual([item['id'] for item in first.data['results']], ids[::-1][:2])
+
+        second = self.client.get(
+            '/api/quiz/questions/',
+            {'cursor': first.data['next_cursor'], 'page_size': 2}
+        )
+        self.assertEqual([item['id'] for item in second.data['results']], ids[:1])
+        self.assertIsNone(second.data['next_cursor'])
@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from quiz_app.models import Answer, Question, QuizSession
+from quiz_app.services.cleanup_service import rollback_session
+
+User = get_user_model()
+
+
+class QuestionManagerDeferTests(TestCase):
+    def setUp(self):
+        self.question = Question.objects.create(
+            topic='Informatyka',
+            question_text='Ile bitów ma bajt?',
+            correct_answer='8',
+            wrong_answer_1='4',
+            wrong_answer_2='16',
+            wrong_answer_3='2',
+            explanation='Bajt składa się z ośmiu bitów.',
+            embedding_vector=[0.1, 0.2, 0.3]
+        )
+
+    def test_default_queryset_defers_embeddings(self):
+        question = Question.objects.get(pk=self.question.pk)
+
+        self.assertEqual(question.get_deferred_fields(), {'embedding_vector', 'search_vector'})
+        with CaptureQueriesContext(connection) as ctx:
+            list(Question.objects.all())
+        self.assertNotIn('"embedding_vector"', ctx.captured_queries[0]['sql'])
+
+    def test_with_embeddings_opts_in_for_dedup(self):
+        question = Question.objects.with_embeddings().get(pk=self.question.pk)
+
+        self.assertEqual(question.get_deferred_fields(), {'search_vector'})
+        with self.assertNumQueries(0):
+            self.assertEqual(question.embedding_vector, [0.1, 0.2, 0.3])
+
+    def test_without_explanations_defers_explanation(self):
+        question = Question.objects.without_explanations().get(pk=self.question.pk)
+
+        self.assertIn('explanation', question.get_deferred_fields())
+        self.assertEqual(question.explanation, 'Bajt składa się z ośmiu bitów.')
+
+    def test_saving_deferred_instance_keeps_embedding(self):
+        question = Question.objects.get(pk=self.question.pk)
+        question.explanation = 'Jeden bajt to osiem bitów.'
+        question.save()
+
+        self.assertEqual(
+            Question.objects.with_embeddings().get(pk=self.question.pk).embedding_vector,
+            [0.1, 0.2, 0.3]
+        )
+
+    def test_rollback_does_not_load_embeddings(self):
+        user = User.objects.create_user(
+            email='defer_user@example.com',
+            username='defer_user',
+            password='Secret123!'
+        )
+        session = QuizSession.objects.create(
+            user=user,
+            topic='Informatyka',
+            initial_difficulty='medium',
+            current_difficulty=5.0,
+            ended_at=timezone.now()
+        )
+        Answer.objects.create(
+            question=self.question, user=user, session=session,
+            selected_answer='8', is_correct=True, response_time=1.0
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            rollback_session(session)
+        self.assertFalse(any('"embedding_vector"' in q['sql'] for q in ctx.captured_queries))
@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from quiz_app.models import Question
+
+User = get_user_model()
+
+
+class QuestionSearchApiTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email='search_admin@example.com',
+            username='search_admin',
+            password='Secret123!'
+        )
+        self.admin.profile.role = 'admin'
+        self.admin.profile.save(update_fields=['role'])
+        self.client.force_authenticate(user=self.admin)
+
+    def _question(self, question_text, explanation='', correct_answer='Tak'):
+        return Question.objects.create(
+            topic='Biologia',
+            question_text=question_text,
+            correct_answer=correct_answer,
+            wrong_answer_1='Nie',
+            wrong_answer_2='Może',
+            wrong_answer_3='Nigdy',
+            explanation=explanation,
+            total_answers=1,
+        )
+
+    def test_library_search_folds_diacritics_and_matches_prefixes(self):
+        match = self._question('Gdzie zachodzi fotosynteza w komórce roślinnej?')
+        self._question('Ile nóg ma pająk?')
+
+        response = self.client.get('/api/quiz/questions/', {'search': 'KOMOR fotosyn'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data['results']], [match.id])
+
+    def test_library_search_ranks_question_text_above_explanation(self):
+        in_explanation = self._question(
+            'Który organ odpowiada za oddychanie?',
+            explanation='Płuca nie biorą udziału w fotosyntezie.'
+        )
+        in_question = self._question('Czym jest fotosynteza?')
+        in_answer = self._question('Jaki proces zachodzi w chloroplastach?', correct_answer='Fotosynteza')
+
+        response = self.client.get('/api/quiz/questions/', {'search': 'fotosyntez'})
+        self.assertEqual(
+            [item['id'] for item in response.data['results']],
+            [in_question.id, in_answer.id, in_explanation.id]
+        )
+
+    def test_search_vector_follows_question_edits(self):
+        question = self._question('Jaki jest wzór chemiczny wody?')
+
+        self.client.patch(
+            f'/api/quiz/admin/questions/{question.id}/update/',
+            {'question_text': 'Jaki jest wzór chemiczny metanu?'},
+            format='json'
+        )
+
+        response = self.client.get('/api/quiz/admin/questions/', {'search': 'metan'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data['questions']], [question.id])
+
+        response = self.client.get('/api/quiz/admin/questions/', {'search': 'wody'})
+        self.assertEqual(response.data['pagination']['total_count'], 0)
+
+    def test_search_without_words_returns_nothing(self):
+        self._question('Czym jest fotosynteza?')
+
+        response = self.client.get('/api/quiz/questions/', {'search': '?!'})
+        self.assertEqual(response.data['count'], 0)
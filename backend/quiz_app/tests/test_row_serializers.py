@@ -0,0 +1,123 @@
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from quiz_app.models import Answer, Question, QuizSession
+from quiz_app.serializers import AnswerDetailSerializer, QuizSessionSerializer
+from quiz_app.serializers.question_serializer import AdminQuestionSerializer
+from quiz_app.serializers.row_serializers import (
+    admin_question_rows,
+    answer_detail_rows,
+    serialize_admin_question_rows,
+    serialize_answer_detail_rows,
+    serialize_session_rows,
+    session_rows,
+)
+
+User = get_user_model()
+
+
+class RowSerializerParityTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='rows_user@example.com',
+            username='rows_user',
+            password='Secret123!'
+        )
+        self.completed = QuizSession.objects.create(
+            user=self.user,
+            topic='Fizyka',
+            subtopic='Optyka',
+            initial_difficulty='hard',
+            current_difficulty=7.5,
+            is_completed=True,
+            total_questions=3,
+            correct_answers=2,
+            ended_at=timezone.now()
+        )
+        self.active = QuizSession.objects.create(
+            user=self.user,
+            topic='Fizyka',
+            initial_difficulty='Łatwy',
+            current_difficulty=2.0
+        )
+        self.completed.record_answer(1.255)
+        self.question = Question.objects.create(
+            topic='Fizyka',
+            question_text='Jaka jest prędkość światła w próżni?',
+            correct_answer='ok. 300 000 km/s',
+            wrong_answer_1='ok. 150 000 km/s',
+            wrong_answer_2='ok. 30 000 km/s',
+            wrong_answer_3='ok. 3 000 km/s',
+            explanation='Światło w próżni porusza się z prędkością ok. 299 792 km/s.',
+            created_by=self.user,
+            edited_at=timezone.now()
+        )
+        self.orphan = Question.objects.create(
+            topic='Fizyka',
+            subtopic=None,
+            knowledge_level=None,
+            question_text='Jaka jest jednostka siły w układzie SI?',
+            correct_answer='Niuton',
+            wrong_answer_1='Dżul',
+            wrong_answer_2='Wat',
+            wrong_answer_3='Pascal',
+            explanation='Siłę mierzymy w niutonach.'
+        )
+        self.question.update_stats(True)
+
+    def test_session_rows_match_serializer(self):
+        qs = QuizSession.objects.filter(user=self.user).order_by('id')
+        self.assertEqual(
+            serialize_session_rows(session_rows(qs)),
+            QuizSessionSerializer(qs.select_related('user'), many=True).data
+        )
+
+    def test_answer_detail_rows_match_serializer(self):
+        for is_correct, response_time in ((True, 2.5), (False, 4)):
+            Answer.objects.create(
+                question=self.question if is_correct else self.orphan,
+                user=self.user,
+                session=self.completed,
+                selected_answer='Niuton' if is_correct else 'Wat',
+                is_correct=is_correct,
+                response_time=response_time,
+                difficulty_at_answer=6
+            )
+        qs = Answer.objects.filter(session=self.completed).order_by('answered_at')
+        self.assertEqual(
+            serialize_answer_detail_rows(answer_detail_rows(qs)),
+            AnswerDetailSerializer(qs.select_related('question'), many=True).data
+        )
+
+    def test_admin_question_rows_match_serializer(self):
+        qs = Question.objects.order_by('id')
+        self.assertEqual(
+            serialize_admin_question_rows(admin_question_rows(qs)),
+            AdminQuestionSerializer(qs.select_related('created_by'), many=True).data
+        )
+
+    def test_admin_list_serves_rows_with_cursor_and_search(self):
+        admin = User.objects.create_user(
+            email='rows_admin@example.com',
+            username='rows_admin',
+            password='Secret123!'
+        )
+        admin.profile.role = 'admin'
+        admin.profile.save(update_fields=['role'])
+        self.client.force_authenticate(user=admin)
+
+        response = self.client.get('/api/quiz/admin/questions/', {'cursor': '', 'page_size': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['questions'][0]['id'], self.orphan.id)
+        self.assertIsNone(response.data['questions'][0]['created_by'])
+
+        response = self.client.get(
+            '/api/quiz/admin/questions/',
+            {'cursor': response.data['pagination']['next_cursor'], 'page_size': 1}
+        )
+        self.assertEqual(response.data['questions'][0]['created_by'], 'rows_user@example.com')
+
+        response = self.client.get('/api/quiz/admin/questions/', {'search': 'prędkość'})
+        self.assertEqual([item['id'] for item in response.data['questions']], [self.question.id])
@@ -109,3 +109,35 @@ class ScoringAndStatsTests(APITestCase):
         self.assertEqual(profile.total_quizzes_played, 1)
         self.assertEqual(profile.total_questions_answered, 1)
         self.assertEqual(profile.total_correct_answers, 1)
+
+    def test_update_stats_maintains_stored_success_rate(self):
+        question = self._question(1)
+
+        question.update_stats(True)
+        question.update_stats(False)
+        question.update_stats(False)
+
+        question.refresh_from_db()
+        self.assertEqual(question.total_answers, 3)
+        self.assertEqual(question.times_used, 3)
+        self.assertEqual(question.success_rate, 33.3)
+
+    def test_library_filters_and_sorts_on_stored_columns(self):
+        easy = self._question(1)
+        easy.difficulty_level = 'łatwy'
+        easy.save()
+        hard = self._question(2)
+        hard.difficulty_level = 'trudny'
+        hard.save()
+        self.assertEqual((easy.difficulty_rank, hard.difficulty_rank), (1, 3))
+
+        easy.update_stats(True)
+        hard.update_stats(True)
+        hard.update_stats(False)
+
+        response = self.client.get('/api/quiz/questions/', {'order_by': 'success_rate'})
+        self.assertEqual([item['id'] for item in response.data['results']], [hard.id, easy.id])
+        self.assertEqual(response.data['results'][0]['stats']['accuracy'], 50.0)
+
+        response = self.client.get('/api/quiz/questions/', {'difficulty': 'hard,latwy', 'success_max': 60})
+        self.assertEqual([item['id'] for item in response.data['results']], [hard.id])
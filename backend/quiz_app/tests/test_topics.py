@@ -0,0 +1,195 @@
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from quiz_app.models import Question, QuizSession, Topic
+from quiz_app.services.topic_suggest_service import TopicPrefixIndex, topic_index
+
+User = get_user_model()
+
+
+class CanonicalTopicTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='topics_user@example.com',
+            username='topics_user',
+            password='Secret123!'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _session(self, topic):
+        return QuizSession.objects.create(
+            user=self.user,
+            topic=topic,
+            initial_difficulty='medium',
+            current_difficulty=5.0,
+            is_completed=True,
+            total_questions=2,
+            correct_answers=1,
+            ended_at=timezone.now()
+        )
+
+    def test_normalize_name_folds_case_whitespace_and_diacritics(self):
+        self.assertEqual(Topic.normalize_name('  Język   Polski '), 'jezyk polski')
+        self.assertEqual(Topic.normalize_name('ŻÓŁW'), 'zolw')
+
+    def test_sessions_with_variant_spelling_share_one_topic(self):
+        first = self._session('Matematyka')
+        second = self._session('matematyka ')
+
+        self.assertIsNotNone(first.canonical_topic_id)
+        self.assertEqual(first.canonical_topic_id, second.canonical_topic_id)
+        self.assertEqual(Topic.objects.count(), 1)
+
+    def test_changing_topic_re_resolves_canonical_topic(self):
+        session = QuizSession.objects.get(pk=self._session('Matematyka').pk)
+        session.topic = 'Fizyka'
+        session.save()
+
+        question = Question.objects.create(
+            topic='Chemia',
+            question_text='Jaki jest symbol chemiczny tlenu?',
+            correct_answer='O',
+            wrong_answer_1='Ox',
+            wrong_answer_2='T',
+            wrong_answer_3='Tl',
+            explanation='Tlen to O.'
+        )
+        question = Question.objects.get(pk=question.pk)
+        question.topic = 'Biologia'
+        question.save(update_fields=['topic'])
+
+        session.refresh_from_db()
+        question.refresh_from_db()
+        self.assertEqual(session.canonical_topic.normalized_name, 'fizyka')
+        self.assertEqual(question.canonical_topic.normalized_name, 'biologia')
+
+        with self.assertNumQueries(1):
+            session.save()
+
+    def test_history_topic_filter_matches_normalized_and_partial_terms(self):
+        self._session('Matematyka')
+        self._session('matematyka ')
+        self._session('Historia Polski')
+
+        exact = self.client.get('/api/quiz/history/', {'topic': 'MATEMATYKA'})
+        self.assertEqual(exact.status_code, status.HTTP_200_OK)
+        self.assertEqual(exact.data['count'], 2)
+
+        partial = self.client.get('/api/quiz/history/', {'topic': 'histor'})
+        self.assertEqual(partial.data['count'], 1)
+
+    def test_topic_leaderboard_merges_topic_variants(self):
+        self._session('Geografia')
+        self._session('geografia')
+
+        response = self.client.get('/api/quiz/leaderboard/topic/', {'topic': 'Geografia'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['leaderboard']), 1)
+        self.assertEqual(response.data['leaderboard'][0]['total_quizzes'], 2)
+
+
+class TopicSuggestApiTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='suggest_user@example.com',
+            username='suggest_user',
+            password='Secret123!'
+        )
+        self.client.force_authenticate(user=self.user)
+        topic_index.invalidate()
+        self.addCleanup(topic_index.invalidate)
+
+    def _session(self, topic):
+        return QuizSession.objects.create(
+            user=self.user,
+            topic=topic,
+            initial_difficulty='medium',
+            current_difficulty=5.0
+        )
+
+    def test_suggest_orders_prefix_matches_by_popularity(self):
+        self._session('Matematyka dyskretna')
+        for _ in range(3):
+            self._session('Matematyka')
+        self._session('Historia')
+
+        response = self.client.get('/api/quiz/topics/suggest/', {'q': 'mat'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        topics = [item['topic'] for item in response.data['results']]
+        self.assertEqual(topics, ['Matematyka', 'Matematyka dyskretna'])
+        self.assertEqual(response.data['results'][0]['sessions_count'], 3)
+
+    def test_suggest_matches_later_words_and_folds_diacritics(self):
+        self._session('Język polski')
+
+        response = self.client.get('/api/quiz/topics/suggest/', {'q': 'POL'})
+        self.assertEqual([item['topic'] for item in response.data['results']], ['Język polski'])
+
+        response = self.client.get('/api/quiz/topics/suggest/', {'q': 'jez'})
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_suggest_counts_bank_size_and_session_starts_incrementally(self):
+        Question.objects.create(
+            topic='Fizyka',
+            question_text='Jaka jest jednostka siły w układzie SI?',
+            correct_answer='Niuton',
+            wrong_answer_1='Dżul',
+            wrong_answer_2='Wat',
+            wrong_answer_3='Paskal',
+            explanation='Jednostką siły jest Niuton.'
+        )
+        first = self.client.get('/api/quiz/topics/suggest/', {'q': 'fiz'})
+        self.assertEqual(first.data['results'][0]['questions_count'], 1)
+        self.assertEqual(first.data['results'][0]['sessions_count'], 0)
+
+        topic_index.record_session(self._session('fizyka').canonical_topic)
+
+        second = self.client.get('/api/quiz/topics/suggest/', {'q': 'fiz'})
+        self.assertEqual(second.data['results'][0]['sessions_count'], 1)
+
+    def test_rebuild_counts_sessions_and_questions_in_one_query(self):
+        for _ in range(2):
+            self._session('Astronomia')
+        Question.objects.create(
+            topic='Astronomia',
+            question_text='Jak nazywa się najbliższa Ziemi gwiazda?',
+            correct_answer='Słońce',
+            wrong_answer_1='Syriusz',
+            wrong_answer_2='Wega',
+            wrong_answer_3='Proxima Centauri',
+            explanation='Najbliższą gwiazdą jest Słońce.'
+        )
+        index = TopicPrefixIndex()
+
+        with self.assertNumQueries(1):
+            results = index.suggest('astro', 5)
+
+        self.assertEqual(results, [{'topic': 'Astronomia', 'sessions_count': 2, 'questions_count': 1}])
+
+    def test_concurrent_requests_share_one_rebuild(self):
+        index = TopicPrefixIndex()
+        rebuilds = []
+
+        def slow_rebuild():
+            rebuilds.append(1)
+            time.sleep(0.1)
+            index._loaded_at = time.monotonic()
+
+        index._rebuild = slow_rebuild
+        threads = [threading.Thread(target=index._ensure_loaded) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(rebuilds), 1)
+
+    def test_suggest_returns_empty_results_without_query(self):
+        response = self.client.get('/api/quiz/topics/suggest/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [])
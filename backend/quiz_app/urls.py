@@ -3,8 +3,18 @@ from .views.quiz_view import start_quiz, end_quiz, cancel_quiz
 from .views.question_view import get_question, questions_library
 from .views.answer_view import submit_answer
 from .views.history_view import quiz_history, quiz_details, quiz_api_root
+from .views.topic_view import suggest_topics
 from .views import admin_questions_view as admin_questions
 from .views import leaderboard_view as leaderboard
+from .views.maintenance_view import (
+    cleanup_status,
+    generation_queue_status,
+    llm_coalescing_status,
+    llm_governor_status,
+    llm_output_status,
+    llm_resilience_status,
+    llm_usage_report,
+)
 
 urlpatterns = [
 
@@ -17,6 +27,7 @@ urlpatterns = [
     path('history/', quiz_history, name='quiz-history'),
     path('details/<int:session_id>/', quiz_details, name='quiz-details'),
     path('questions/', questions_library, name='questions-library'),
+    path('topics/suggest/', suggest_topics, name='suggest-topics'),
 
     path('leaderboard/global/', leaderboard.global_leaderboard, name='leaderboard-global'),
     path('leaderboard/topic/', leaderboard.topic_leaderboard, name='leaderboard-topic'),
@@ -28,4 +39,11 @@ urlpatterns = [
     path('admin/questions/<int:question_id>/', admin_questions.get_question_detail, name='admin-question-detail'),
     path('admin/questions/<int:question_id>/update/', admin_questions.update_question, name='admin-update-question'),
     path('admin/questions/<int:question_id>/delete/', admin_questions.delete_question, name='admin-delete-question'),
+    path('admin/cleanup/', cleanup_status, name='admin-cleanup-status'),
+    path('admin/generation-queue/', generation_queue_status, name='admin-generation-queue'),
+    path('admin/llm-governor/', llm_governor_status, name='admin-llm-governor'),
+    path('admin/llm-resilience/', llm_resilience_status, name='admin-llm-resilience'),
+    path('admin/llm-output/', llm_output_status, name='admin-llm-output'),
+    path('admin/llm-usage/', llm_usage_report, name='admin-llm-usage'),
+    path('admin/llm-coalescing/', llm_coalescing_status, name='admin-llm-coalescing'),
 ]
@@ -1,4 +1,4 @@
 from .helpers import build_question_payload
-from .pagination import paginate_queryset
+from .pagination import paginate_keyset, paginate_queryset, uses_cursor_pagination
 
-__all__ = ['build_question_payload', 'paginate_queryset']
+__all__ = ['build_question_payload', 'paginate_keyset', 'paginate_queryset', 'uses_cursor_pagination']
@@ -0,0 +1,62 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.utils.cache import patch_vary_headers
+from rest_framework import status
+from rest_framework.response import Response
+
+from cache_manager import CacheVersionService
+
+
+def etag_matches(request, etag):
+    header = request.headers.get('If-None-Match', '')
+    if not header:
+        return False
+    candidates = {candidate.strip().removeprefix('W/') for candidate in header.split(',')}
+    return '*' in candidates or etag in candidates
+
+
+def set_validators(response, etag, cache_control):
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control
+    patch_vary_headers(response, ('Authorization',))
+    return response
+
+
+def not_modified_response(etag, cache_control):
+    return set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, cache_control)
+
+
+def build_versioned_etag(request, scopes, time_bucket=None):
+    user_id = getattr(request.user, 'id', None)
+    parts = [
+        f'{scope}={CacheVersionService.get_version(scope.format(user_id=user_id))}'
+        for scope in scopes
+    ]
+    parts.append(request.get_full_path())
+    parts.append(str(user_id))
+    if time_bucket:
+        parts.append(str(int(time.time() // time_bucket)))
+    return '"{}"'.format(hashlib.sha256('|'.join(parts).encode()).hexdigest()[:32])
+
+
+def conditional_view(scopes, cache_control='private, no-cache', time_bucket=None):
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+
+            etag = build_versioned_etag(request, scopes, time_bucket)
+            if etag_matches(request, etag):
+                return not_modified_response(etag, cache_control)
+
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                set_validators(response, etag, cache_control)
+            return response
+
+        return wrapper
+
+    return decorator
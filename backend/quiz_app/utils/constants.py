@@ -19,6 +19,12 @@ DIFFICULTY_VALUE_MAP = {
     "hard": 8.0,
 }
 
+DIFFICULTY_RANK_MAP = {
+    "easy": 1,
+    "medium": 2,
+    "hard": 3,
+}
+
 DIFFICULTY_ALIAS_MAP = {
     "łatwy": "easy",
     "latwy": "easy",
@@ -34,5 +40,57 @@ SYNC_QUESTION_COUNT = 3
 BACKGROUND_BATCH_SIZE = 5
 GENERATION_BUFFER_RATIO = 1.1
 GENERATION_BUFFER_MIN_EXTRA = 1
+GENERATION_BUFFER_MAX_RATIO = 2.0
+GENERATION_ACCEPTANCE_CONFIDENCE = 0.9
+GENERATION_ACCEPTANCE_DECAY = 0.8
+GENERATION_ACCEPTANCE_MIN_TRIALS = 5
+GENERATION_ACCEPTANCE_PRIOR_RATE = 0.9
+GENERATION_ACCEPTANCE_PRIOR_TRIALS = 4
+GENERATION_ACCEPTANCE_SEED_DAYS = 14
+GENERATION_ACCEPTANCE_TTL_SECONDS = 7 * 24 * 3600
+
+GENERATION_WORKERS = 4
+GENERATION_QUEUE_MAX_DEPTH = 500
+GENERATION_JOB_MAX_ATTEMPTS = 3
+GENERATION_JOB_BACKOFF_SECONDS = 5
+GENERATION_JOB_POLL_SECONDS = 1.0
+GENERATION_JOB_STALE_SECONDS = 600
+GENERATION_JOB_RETENTION_HOURS = 24
+GENERATION_CALL_RETENTION_DAYS = 30
+GENERATION_QUEUE_STATS_WINDOW_MINUTES = 60
+GENERATION_URGENT_PRIORITY = 1
+GENERATION_THROTTLED_PRIORITY = 3
+GENERATION_URGENT_WINDOW_SECONDS = 60
+GENERATION_MAX_RUNNING_BY_PRIORITY = {3: 2, 4: 2}
+GENERATION_PREEMPT_DELAY_SECONDS = 2
+GENERATION_LEDGER_TTL_SECONDS = 3600
+GENERATION_RESERVATION_TTL_SECONDS = 300
+GENERATION_LEASE_TTL_SECONDS = 5
+GENERATION_LEASE_WAIT_SECONDS = 2.0
 QUESTION_WAIT_MAX_SECONDS = 2
 QUESTION_WAIT_POLL_SECONDS = 0.2
+
+TOPIC_SUGGEST_DEFAULT_LIMIT = 8
+TOPIC_SUGGEST_MAX_LIMIT = 20
+TOPIC_SUGGEST_BANK_WEIGHT = 0.2
+TOPIC_INDEX_REFRESH_SECONDS = 600
+
+QUESTION_SEARCH_CONFIG = "quiz_polish"
+QUESTION_SEARCH_MAX_TERMS = 8
+
+CLEANUP_DELETE_BATCH_SIZE = 1000
+CLEANUP_SESSION_BATCH_SIZE = 2000
+CLEANUP_SESSION_AGE_MINUTES = 60
+CLEANUP_ORPHAN_AGE_HOURS = 24
+CLEANUP_SCHEDULER_CHUNK_SIZE = 500
+CLEANUP_SCHEDULER_MIN_CHUNK_SIZE = 10
+CLEANUP_SCHEDULER_ROWS_PER_SECOND = 1000
+CLEANUP_SCHEDULER_MAX_LOCK_MS = 200
+CLEANUP_SCHEDULER_IDLE_SECONDS = 60
+
+QUESTIONS_VERSION_SCOPE = "questions"
+HISTORY_VERSION_SCOPE = "history:{user_id}"
+LEADERBOARD_VERSION_SCOPE = "leaderboard"
+USER_VERSION_SCOPE = "user:{user_id}"
+LEADERBOARD_ETAG_BUCKET_SECONDS = 300
+QUESTIONS_LIBRARY_ETAG_BUCKET_SECONDS = 120
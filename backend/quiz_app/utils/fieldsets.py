@@ -0,0 +1,37 @@
+from .pagination import _get_request_params
+
+
+def _split_param(value):
+    return {part.strip() for part in (value or '').split(',') if part.strip()}
+
+
+def parse_fieldset(request, available):
+    params = _get_request_params(request)
+    requested = _split_param(params.get('fields'))
+    excluded = _split_param(params.get('exclude'))
+    if not requested and not excluded:
+        return None
+
+    selected = [name for name in available if name in requested] if requested else []
+    if not selected:
+        selected = list(available)
+    return frozenset(name for name in selected if name not in excluded)
+
+
+def fieldset_columns(fields, column_map, required=()):
+    if fields is None:
+        return None
+    columns = list(required)
+    for name, name_columns in column_map.items():
+        if name not in fields:
+            continue
+        for column in name_columns:
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+def trim_fields(data, fields):
+    if fields is None:
+        return data
+    return {key: value for key, value in data.items() if key in fields}
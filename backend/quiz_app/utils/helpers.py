@@ -62,3 +62,11 @@ def get_used_hashes(session):
         session=session
     ).values_list('question__content_hash', flat=True)
     return set(session_hashes) | set(answer_hashes)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
@@ -1,4 +1,28 @@
+import base64
+import json
+import logging
+from typing import List, NamedTuple, Optional
+
+from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+
+class CursorPage(NamedTuple):
+    object_list: List
+    page_size: int
+    next_cursor: Optional[str]
+    previous_cursor: Optional[str]
+    count: Optional[int]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
 
 
 def _get_request_params(request):
@@ -8,18 +32,133 @@ def _get_request_params(request):
     return params
 
 
-def paginate_queryset(request, queryset, default_size=20, max_size=None):
-    params = _get_request_params(request)
-    try:
-        page = int(params.get('page', 1))
-    except (TypeError, ValueError):
-        page = 1
+def _get_page_size(params, default_size, max_size):
     try:
         page_size = int(params.get('page_size', default_size))
     except (TypeError, ValueError):
         page_size = default_size
     if max_size is not None:
         page_size = min(page_size, max_size)
+    return page_size
+
+
+def paginate_queryset(request, queryset, default_size=20, max_size=None):
+    params = _get_request_params(request)
+    try:
+        page = int(params.get('page', 1))
+    except (TypeError, ValueError):
+        page = 1
+    page_size = _get_page_size(params, default_size, max_size)
     paginator = Paginator(queryset, page_size)
     page_obj = paginator.get_page(page)
     return paginator, page_obj, page_size
+
+
+def uses_cursor_pagination(request):
+    return 'cursor' in _get_request_params(request)
+
+
+def _encode_cursor(obj, ordering, reverse):
+    values = []
+    for field in ordering:
+        name = field.lstrip('-')
+        value = obj[name] if isinstance(obj, dict) else getattr(obj, name)
+        values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+    payload = json.dumps({'v': values, 'r': reverse}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor, ordering):
+    if not cursor:
+        return None, False
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        values = payload['v']
+        reverse = bool(payload.get('r', False))
+    except (ValueError, TypeError, KeyError, UnicodeDecodeError):
+        return None, False
+    if not isinstance(values, list) or len(values) != len(ordering):
+        return None, False
+    return values, reverse
+
+
+def _coerce_cursor_values(model, ordering, values):
+    # Cursors come from the client, so every value goes through its field first.
+    try:
+        coerced = [
+            model._meta.get_field(field.lstrip('-')).to_python(value)
+            for field, value in zip(ordering, values)
+        ]
+    except (ValidationError, TypeError, ValueError):
+        return None
+    if any(value is None for value in coerced):
+        return None
+    return coerced
+
+
+def _keyset_filter(ordering, values, reverse):
+    condition = Q()
+    for index, field in enumerate(ordering):
+        descending = field.startswith('-') != reverse
+        lookup = f"{field.lstrip('-')}__{'lt' if descending else 'gt'}"
+        equal = {
+            previous.lstrip('-'): values[position]
+            for position, previous in enumerate(ordering[:index])
+        }
+        condition |= Q(**equal, **{lookup: values[index]})
+    return condition
+
+
+def _reverse_ordering(ordering):
+    return [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+
+
+def estimate_count(queryset):
+    try:
+        sql, sql_params = queryset.query.sql_with_params()
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', sql_params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    except (DatabaseError, KeyError, IndexError, TypeError, ValueError) as e:
+        logger.warning("Row estimate failed, falling back to COUNT(*): %s", e)
+        return queryset.count()
+
+
+def paginate_keyset(request, queryset, ordering, default_size=20, max_size=None):
+    params = _get_request_params(request)
+    page_size = max(_get_page_size(params, default_size, max_size), 1)
+    values, reverse = _decode_cursor(params.get('cursor'), ordering)
+    if values is not None:
+        values = _coerce_cursor_values(queryset.model, ordering, values)
+        if values is None:
+            reverse = False
+
+    count_mode = params.get('count')
+    count = None
+    if count_mode == 'exact':
+        count = queryset.count()
+    elif count_mode == 'estimate':
+        count = estimate_count(queryset)
+
+    page_qs = queryset.order_by(*(_reverse_ordering(ordering) if reverse else ordering))
+    if values is not None:
+        page_qs = page_qs.filter(_keyset_filter(ordering, values, reverse))
+
+    rows = list(page_qs[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if reverse:
+        rows.reverse()
+
+    if reverse:
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, values is not None
+    next_cursor = _encode_cursor(rows[-1], ordering, False) if rows and has_next else None
+    previous_cursor = _encode_cursor(rows[0], ordering, True) if rows and has_previous else None
+
+    return CursorPage(rows, page_size, next_cursor, previous_cursor, count)
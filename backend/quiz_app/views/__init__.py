@@ -13,8 +13,18 @@ from .leaderboard_view import (
     topic_leaderboard,
     user_ranking,
 )
+from .maintenance_view import (
+    cleanup_status,
+    generation_queue_status,
+    llm_coalescing_status,
+    llm_governor_status,
+    llm_output_status,
+    llm_resilience_status,
+    llm_usage_report,
+)
 from .question_view import get_question, questions_library
 from .quiz_view import cancel_quiz, end_quiz, start_quiz
+from .topic_view import suggest_topics
 
 __all__ = [
     "start_quiz",
@@ -36,4 +46,12 @@ __all__ = [
     "update_question",
     "delete_question",
     "question_stats",
+    "cleanup_status",
+    "generation_queue_status",
+    "llm_coalescing_status",
+    "llm_governor_status",
+    "llm_output_status",
+    "llm_resilience_status",
+    "llm_usage_report",
+    "suggest_topics",
 ]
@@ -1,4 +1,4 @@
-from django.db.models import Q, Count, Avg
+from django.db.models import Count, Avg
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
@@ -6,19 +6,19 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from users.permissions import IsAdminUser
-from ..models import Question, QuizSessionQuestion, Answer
+from ..models import Question, QuizSessionQuestion
 from ..serializers.question_serializer import AdminQuestionSerializer
-from ..utils.pagination import paginate_queryset
+from ..serializers.row_serializers import admin_question_rows, serialize_admin_question_rows
+from ..services.cleanup_service import delete_question_answers
+from ..services.question_search_service import search_questions
+from ..services.topic_service import filter_by_topic
+from ..utils.pagination import paginate_keyset, paginate_queryset, uses_cursor_pagination
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdminUser])
 def list_questions(request):
-    questions = (
-        Question.objects.all()
-        .select_related('created_by')
-        .order_by('-created_at')
-    )
+    questions = Question.objects.order_by('-created_at')
 
     search = request.query_params.get('search', '').strip()
     topic = request.query_params.get('topic', '').strip()
@@ -26,14 +26,10 @@ def list_questions(request):
     knowledge_level = request.query_params.get('knowledge_level', '').strip()
 
     if search:
-        questions = questions.filter(
-            Q(question_text__icontains=search)
-            | Q(correct_answer__icontains=search)
-            | Q(explanation__icontains=search)
-        )
+        questions = search_questions(questions, search).order_by('-_search_rank', '-created_at')
 
     if topic:
-        questions = questions.filter(topic__icontains=topic)
+        questions = filter_by_topic(questions, topic)
 
     if difficulty:
         questions = questions.filter(difficulty_level=difficulty)
@@ -41,11 +37,27 @@ def list_questions(request):
     if knowledge_level:
         questions = questions.filter(knowledge_level=knowledge_level)
 
+    if not search and uses_cursor_pagination(request):
+        page = paginate_keyset(
+            request, admin_question_rows(questions), ['-created_at', '-id'], default_size=20, max_size=100
+        )
+        return Response({
+            'questions': serialize_admin_question_rows(page.object_list),
+            'pagination': {
+                'total_count': page.count,
+                'page_size': page.page_size,
+                'has_next': page.has_next(),
+                'has_previous': page.has_previous(),
+                'next_cursor': page.next_cursor,
+                'previous_cursor': page.previous_cursor,
+            }
+        })
+
     paginator, page_obj, page_size = paginate_queryset(
-        request, questions, default_size=20, max_size=100
+        request, admin_question_rows(questions), default_size=20, max_size=100
     )
 
-    questions_data = AdminQuestionSerializer(page_obj, many=True).data
+    questions_data = serialize_admin_question_rows(page_obj)
 
     return Response({
         'questions': questions_data,
@@ -109,7 +121,7 @@ def delete_question(request, question_id):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    Answer.objects.filter(question=question).delete()
+    delete_question_answers(question)
     QuizSessionQuestion.objects.filter(question=question).delete()
 
     question_text = question.question_text[:50]
@@ -15,6 +15,7 @@ from ..services.answer_service import (
     update_profile_stats_on_completion,
 )
 from ..services.cleanup_service import cleanup_unused_session_questions
+from ..services.history_service import snapshot_completed_session
 
 logger = logging.getLogger(__name__)
 
@@ -112,6 +113,8 @@ def submit_answer(request):
                     'difficulty_at_answer': session.current_difficulty
                 }
             )
+            if created:
+                session.record_answer(answer.response_time)
     except IntegrityError:
         answer = Answer.objects.filter(
             question=question,
@@ -172,6 +175,7 @@ def submit_answer(request):
         cleanup_unused_session_questions(session)
 
         update_profile_stats_on_completion(request.user)
+        snapshot_completed_session(session)
 
         logger.info(f"Quiz {session.id} completed")
 
@@ -1,7 +1,5 @@
 import logging
 
-from django.db.models import FloatField, Sum, Value
-from django.db.models.functions import Coalesce
 from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
@@ -10,54 +8,35 @@ from rest_framework.response import Response
 from ..models import QuizSession
 from ..permissions import IsQuizOwnerOrAdmin
 from ..serializers import QuizSessionSerializer
-from ..utils.constants import (
-    DEFAULT_QUESTIONS_COUNT,
-    DEFAULT_TIME_PER_QUESTION,
-    DEFAULT_USE_ADAPTIVE_DIFFICULTY,
-)
-from ..utils.pagination import paginate_queryset
+from ..serializers.row_serializers import SESSION_FIELD_BUILDERS, serialize_session_rows, session_rows
+from ..utils.conditional import conditional_view, etag_matches, not_modified_response, set_validators
+from ..utils.constants import HISTORY_VERSION_SCOPE
+from ..utils.fieldsets import parse_fieldset
+from ..utils.pagination import paginate_keyset, paginate_queryset, uses_cursor_pagination
 from ..services.history_service import build_quiz_details_payload
+from ..services.topic_service import filter_by_topic
 
 logger = logging.getLogger(__name__)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_view([HISTORY_VERSION_SCOPE])
 def quiz_history(request):
-    qs = (
-        QuizSession.objects.filter(user=request.user, is_completed=True)
-        .annotate(
-            total_response_time=Coalesce(
-                Sum('answers__response_time'),
-                Value(0.0),
-                output_field=FloatField()
-            )
-        )
-    )
+    qs = QuizSession.objects.filter(user=request.user, is_completed=True).select_related('user')
 
     topic = request.GET.get('topic')
     difficulty = request.GET.get('difficulty')
     is_custom = request.GET.get('is_custom')
 
     if topic:
-        qs = qs.filter(topic__icontains=topic)
+        qs = filter_by_topic(qs, topic)
 
     if difficulty in ['easy', 'medium', 'hard']:
         qs = qs.filter(initial_difficulty=difficulty)
 
     if is_custom in ['true', 'false']:
-        ids = []
-        for s in qs.only(
-            'id', 'questions_count', 'time_per_question', 'use_adaptive_difficulty'
-        ):
-            custom = (
-                s.questions_count != DEFAULT_QUESTIONS_COUNT
-                or s.time_per_question != DEFAULT_TIME_PER_QUESTION
-                or s.use_adaptive_difficulty != DEFAULT_USE_ADAPTIVE_DIFFICULTY
-            )
-            if (is_custom == 'true' and custom) or (is_custom == 'false' and not custom):
-                ids.append(s.id)
-        qs = qs.filter(id__in=ids)
+        qs = qs.filter(is_custom=(is_custom == 'true'))
 
     order_by = request.GET.get('order_by', '-started_at')
     allowed = [
@@ -69,11 +48,24 @@ def quiz_history(request):
     if order_by in allowed:
         qs = qs.order_by(order_by)
 
+    fields = parse_fieldset(request, SESSION_FIELD_BUILDERS)
+
+    if order_by == '-started_at' and uses_cursor_pagination(request):
+        page = paginate_keyset(request, session_rows(qs, fields), ['-started_at', '-id'], default_size=10)
+        return Response({
+            'results': serialize_session_rows(page.object_list, fields),
+            'count': page.count,
+            'next': page.has_next(),
+            'previous': page.has_previous(),
+            'next_cursor': page.next_cursor,
+            'previous_cursor': page.previous_cursor,
+        })
+
     paginator, page_obj, page_size = paginate_queryset(
-        request, qs, default_size=10
+        request, session_rows(qs, fields), default_size=10
     )
 
-    data = QuizSessionSerializer(page_obj.object_list, many=True).data
+    data = serialize_session_rows(page_obj.object_list, fields)
 
     return Response({
         'results': data,
@@ -95,8 +87,11 @@ def quiz_details(request, session_id):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        payload = build_quiz_details_payload(session, request.user)
-        return Response(payload)
+        payload, etag = build_quiz_details_payload(session, request.user)
+        etag = f'"{etag}"'
+        if etag_matches(request, etag):
+            return not_modified_response(etag, 'private, no-cache')
+        return set_validators(Response(payload), etag, 'private, no-cache')
 
     except QuizSession.DoesNotExist:
         return Response(
@@ -112,7 +107,11 @@ class QuizSessionViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         return QuizSession.objects.filter(
             user=self.request.user
-        ).order_by('-started_at')
+        ).select_related('user').order_by('-started_at')
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(serialize_session_rows(session_rows(queryset)))
 
 
 @api_view(['GET'])
@@ -128,6 +127,7 @@ def quiz_api_root(request):
             'quiz_history': '/api/quiz/history/',
             'quiz_details': '/api/quiz/details/<session_id>/',
             'questions_library': '/api/quiz/questions/',
+            'suggest_topics': '/api/quiz/topics/suggest/',
         }
     })
 
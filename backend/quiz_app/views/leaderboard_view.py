@@ -3,24 +3,37 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from ..services.leaderboard_service import (
+    LEADERBOARD_ENTRY_FIELDS,
     get_global_leaderboard,
     get_topic_leaderboard,
     get_user_ranking,
     get_leaderboard_stats,
 )
+from ..utils.conditional import conditional_view
+from ..utils.constants import LEADERBOARD_ETAG_BUCKET_SECONDS, LEADERBOARD_VERSION_SCOPE
+from ..utils.fieldsets import parse_fieldset
+
+leaderboard_conditional = conditional_view(
+    [LEADERBOARD_VERSION_SCOPE],
+    cache_control="private, max-age=60",
+    time_bucket=LEADERBOARD_ETAG_BUCKET_SECONDS,
+)
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@leaderboard_conditional
 def global_leaderboard(request):
     period = request.GET.get("period", "all")
     limit = int(request.GET.get("limit", 50))
-    payload = get_global_leaderboard(request, period, limit)
+    fields = parse_fieldset(request, LEADERBOARD_ENTRY_FIELDS)
+    payload = get_global_leaderboard(request, period, limit, fields)
     return Response(payload)
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@leaderboard_conditional
 def topic_leaderboard(request):
     topic = request.GET.get("topic")
     limit = int(request.GET.get("limit", 50))
@@ -28,12 +41,14 @@ def topic_leaderboard(request):
     if not topic:
         return Response({"error": "Topic parameter is required"}, status=400)
 
-    payload = get_topic_leaderboard(request, topic, limit)
+    fields = parse_fieldset(request, LEADERBOARD_ENTRY_FIELDS)
+    payload = get_topic_leaderboard(request, topic, limit, fields)
     return Response(payload)
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@leaderboard_conditional
 def user_ranking(request):
     user = request.user
     payload = get_user_ranking(user)
@@ -42,6 +57,7 @@ def user_ranking(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@leaderboard_conditional
 def leaderboard_stats(request):
     payload = get_leaderboard_stats(request)
     return Response(payload)
@@ -0,0 +1,61 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from llm_integration.rate_governor import RateGovernor
+from llm_integration.prompt_budget import prompt_stats
+from llm_integration.resilience import resilience_stats
+from llm_integration.single_flight import coalescing_stats
+from llm_integration.structured_output import output_stats
+from users.permissions import IsAdminUser
+from ..services.cleanup_scheduler import cleanup_metrics
+from ..services.generation_queue import generation_queue_stats
+from ..services.generation_telemetry import generation_usage_report
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def cleanup_status(request):
+    include_backlog = request.query_params.get('backlog', 'true').lower() != 'false'
+    return Response({'tasks': cleanup_metrics(include_backlog=include_backlog)})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def generation_queue_status(request):
+    return Response(generation_queue_stats())
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def llm_governor_status(request):
+    return Response(RateGovernor().stats())
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def llm_resilience_status(request):
+    return Response(resilience_stats())
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def llm_output_status(request):
+    return Response({**output_stats(), 'prompts': prompt_stats()})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def llm_coalescing_status(request):
+    return Response(coalescing_stats())
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def llm_usage_report(request):
+    try:
+        days = min(max(int(request.query_params.get('days', 7)), 1), 366)
+    except ValueError:
+        days = 7
+    group_by = request.query_params.get('group', 'topic')
+    return Response(generation_usage_report(days=days, group_by=group_by))
@@ -3,13 +3,57 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Case, When, Value, IntegerField, FloatField, F, ExpressionWrapper
-from django.db.models.functions import Coalesce
+from django.db.models import Q
 
 from ..models import QuizSession, Question
 from ..services.question_delivery_service import get_next_question_payload
-from ..utils.constants import DIFFICULTY_ALIAS_MAP, DIFFICULTY_NAME_MAP
-from ..utils.pagination import paginate_queryset
+from ..services.question_search_service import search_questions
+from ..services.topic_service import filter_by_topic
+from ..utils.conditional import conditional_view
+from ..utils.constants import (
+    DIFFICULTY_ALIAS_MAP,
+    DIFFICULTY_NAME_MAP,
+    DIFFICULTY_RANK_MAP,
+    QUESTIONS_LIBRARY_ETAG_BUCKET_SECONDS,
+    QUESTIONS_VERSION_SCOPE,
+)
+from ..utils.fieldsets import fieldset_columns, parse_fieldset, trim_fields
+from ..utils.pagination import paginate_keyset, paginate_queryset, uses_cursor_pagination
+
+
+def _library_difficulty_name(label):
+    name = (label or "").strip().lower()
+    normalized = DIFFICULTY_ALIAS_MAP.get(name, name)
+    return DIFFICULTY_NAME_MAP.get(normalized, label or "średni")
+
+
+def _library_stats(q):
+    return {
+        'total_answers': q.total_answers,
+        'correct_answers': getattr(q, 'correct_answers_count', None),
+        'wrong_answers': (q.total_answers - getattr(q, 'correct_answers_count', 0))
+        if q.total_answers is not None and getattr(q, 'correct_answers_count', None) is not None else None,
+        'accuracy': q.success_rate,
+        'times_used': getattr(q, 'times_used', 0),
+    }
+
+
+LIBRARY_FIELD_BUILDERS = {
+    'id': (('id',), lambda q: q.id),
+    'question_text': (('question_text',), lambda q: q.question_text),
+    'topic': (('topic',), lambda q: q.topic),
+    'knowledge_level': (('knowledge_level',), lambda q: q.knowledge_level),
+    'difficulty_level': (('difficulty_level',), lambda q: _library_difficulty_name(q.difficulty_level)),
+    'correct_answer': (('correct_answer',), lambda q: q.correct_answer),
+    'wrong_answer_1': (('wrong_answer_1',), lambda q: q.wrong_answer_1),
+    'wrong_answer_2': (('wrong_answer_2',), lambda q: q.wrong_answer_2),
+    'wrong_answer_3': (('wrong_answer_3',), lambda q: q.wrong_answer_3),
+    'explanation': (('explanation',), lambda q: q.explanation),
+    'created_at': (('created_at',), lambda q: q.created_at),
+    'stats': (('total_answers', 'correct_answers_count', 'success_rate', 'times_used'), _library_stats),
+}
+
+LIBRARY_FIELD_COLUMNS = {name: columns for name, (columns, _build) in LIBRARY_FIELD_BUILDERS.items()}
 
 
 @api_view(['GET'])
@@ -29,48 +73,22 @@ def get_question(request, session_id):
             {'error': error},
             status=status.HTTP_404_NOT_FOUND
         )
-    return Response(payload)
+    return Response(trim_fields(payload, parse_fieldset(request, payload.keys())))
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_view(
+    [QUESTIONS_VERSION_SCOPE],
+    cache_control='private, max-age=30',
+    time_bucket=QUESTIONS_LIBRARY_ETAG_BUCKET_SECONDS,
+)
 def questions_library(request):
     def normalize_diff_token(token: str):
         t = (token or "").strip().lower()
         return DIFFICULTY_ALIAS_MAP.get(t)
 
-    rank_map = {"easy": 1, "medium": 2, "hard": 3}
-    rank_by_token = {
-        token: rank_map[mapped]
-        for token, mapped in DIFFICULTY_ALIAS_MAP.items()
-        if mapped in rank_map
-    }
-
-    difficulty_rank = Case(
-        *[
-            When(difficulty_level__iexact=token, then=Value(rank))
-            for token, rank in rank_by_token.items()
-        ],
-        default=Value(2),
-        output_field=IntegerField()
-    )
-
-    safe_total = Case(
-        When(total_answers__gt=0, then=F('total_answers')),
-        default=Value(1),
-        output_field=FloatField()
-    )
-    success_rate_expr = ExpressionWrapper(
-        100.0 * Coalesce(F('correct_answers_count'), Value(0.0)) / safe_total,
-        output_field=FloatField()
-    )
-
-    qs = Question.objects.all().annotate(
-        _difficulty_rank=difficulty_rank,
-        _success_rate=success_rate_expr
-    )
-
-    qs = qs.filter(total_answers__gt=0)
+    qs = Question.objects.filter(total_answers__gt=0)
 
     topic = request.GET.get('topic')
     search = request.GET.get('search')
@@ -78,29 +96,16 @@ def questions_library(request):
     knowledge_level = request.GET.get('knowledge_level')
 
     if topic:
-        qs = qs.filter(topic__icontains=topic)
+        qs = filter_by_topic(qs, topic)
 
     if search:
-        qs = qs.filter(
-            Q(question_text__icontains=search) |
-            Q(correct_answer__icontains=search) |
-            Q(wrong_answer_1__icontains=search) |
-            Q(wrong_answer_2__icontains=search) |
-            Q(wrong_answer_3__icontains=search) |
-            Q(explanation__icontains=search)
-        )
+        qs = search_questions(qs, search)
 
     if diff_param:
         tokens = [normalize_diff_token(t) for t in diff_param.split(",")]
-        wanted = {t for t in tokens if t}
+        wanted = {DIFFICULTY_RANK_MAP[t] for t in tokens if t in DIFFICULTY_RANK_MAP}
         if wanted:
-            qf = Q()
-            for canonical in wanted:
-                qf |= Q(difficulty_level__iexact=canonical)
-                for token, mapped in DIFFICULTY_ALIAS_MAP.items():
-                    if mapped == canonical:
-                        qf |= Q(difficulty_level__iexact=token)
-            qs = qs.filter(qf)
+            qs = qs.filter(difficulty_rank__in=wanted)
 
     if knowledge_level:
         qs = qs.filter(knowledge_level=knowledge_level)
@@ -109,9 +114,9 @@ def questions_library(request):
     smax = request.GET.get('success_max')
     try:
         if smin not in (None, ''):
-            qs = qs.filter(_success_rate__gte=float(smin))
+            qs = qs.filter(success_rate__gte=float(smin))
         if smax not in (None, ''):
-            qs = qs.filter(_success_rate__lte=float(smax))
+            qs = qs.filter(success_rate__lte=float(smax))
     except ValueError:
         pass
 
@@ -132,47 +137,50 @@ def questions_library(request):
         else:
             qs = qs.filter(Q(explanation__isnull=True) | Q(explanation__exact=''))
 
-    order_by = request.GET.get('order_by', '-created_at')
+    order_by = request.GET.get('order_by', 'relevance' if search else '-created_at')
     mapping = {
-        'created_at': 'created_at',
-        '-created_at': '-created_at',
-        'success_rate': '_success_rate',
-        '-success_rate': '-_success_rate',
+        'created_at': ('created_at',),
+        '-created_at': ('-created_at',),
+        'success_rate': ('success_rate', 'id'),
+        '-success_rate': ('-success_rate', '-id'),
     }
-    qs = qs.order_by(mapping.get(order_by, '-created_at'))
-
-    paginator, page_obj, page_size = paginate_queryset(
-        request, qs, default_size=20
-    )
-
-    def normalized_name(label):
-        name = (label or "").strip().lower()
-        normalized = DIFFICULTY_ALIAS_MAP.get(name, name)
-        return DIFFICULTY_NAME_MAP.get(normalized, label or "średni")
-
-    results = []
-    for q in page_obj.object_list:
-        results.append({
-            'id': q.id,
-            'question_text': q.question_text,
-            'topic': q.topic,
-            'knowledge_level': q.knowledge_level,
-            'difficulty_level': normalized_name(q.difficulty_level),
-            'correct_answer': q.correct_answer,
-            'wrong_answer_1': q.wrong_answer_1,
-            'wrong_answer_2': q.wrong_answer_2,
-            'wrong_answer_3': q.wrong_answer_3,
-            'explanation': q.explanation,
-            'created_at': q.created_at,
-            'stats': {
-                'total_answers': q.total_answers,
-                'correct_answers': getattr(q, 'correct_answers_count', None),
-                'wrong_answers': (q.total_answers - getattr(q, 'correct_answers_count', 0))
-                if q.total_answers is not None and getattr(q, 'correct_answers_count', None) is not None else None,
-                'accuracy': getattr(q, 'success_rate', None) if getattr(q, 'success_rate', None) is not None else round(
-                    getattr(q, '_success_rate', 0.0), 2),
-                'times_used': getattr(q, 'times_used', 0),
-            }
+    if search:
+        mapping['relevance'] = ('-_search_rank', '-created_at')
+    ordering = mapping.get(order_by, mapping['-created_at'])
+    qs = qs.order_by(*ordering)
+
+    fields = parse_fieldset(request, LIBRARY_FIELD_BUILDERS)
+    qs = qs.only(*fieldset_columns(
+        LIBRARY_FIELD_BUILDERS.keys() if fields is None else fields,
+        LIBRARY_FIELD_COLUMNS,
+        required=('id', 'created_at'),
+    ))
+
+    cursor_page = None
+    if ordering == mapping['-created_at'] and uses_cursor_pagination(request):
+        cursor_page = paginate_keyset(request, qs, ['-created_at', '-id'], default_size=20)
+        page_items = cursor_page.object_list
+    else:
+        paginator, page_obj, page_size = paginate_queryset(
+            request, qs, default_size=20
+        )
+        page_items = page_obj.object_list
+
+    results = [
+        {
+            name: build(q)
+            for name, (_columns, build) in LIBRARY_FIELD_BUILDERS.items()
+            if fields is None or name in fields
+        }
+        for q in page_items
+    ]
+
+    if cursor_page is not None:
+        return Response({
+            'count': cursor_page.count,
+            'results': results,
+            'next_cursor': cursor_page.next_cursor,
+            'previous_cursor': cursor_page.previous_cursor,
         })
 
     return Response({
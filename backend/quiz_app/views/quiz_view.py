@@ -14,6 +14,8 @@ from llm_integration.difficulty_adapter import DifficultyAdapter
 from ..models import QuizSession
 from ..services.background_generation_service import BackgroundGenerationService
 from ..services.cleanup_service import rollback_session
+from ..services.history_service import snapshot_completed_session
+from ..services.topic_suggest_service import topic_index
 from ..utils.constants import (
     DEFAULT_QUESTIONS_COUNT,
     DEFAULT_TIME_PER_QUESTION,
@@ -97,6 +99,7 @@ def start_quiz(request):
         session.id,
         request.user.id
     )
+    topic_index.record_session(session.canonical_topic)
 
     bg_generator = BackgroundGenerationService()
 
@@ -190,6 +193,7 @@ def end_quiz(request, session_id):
     session.ended_at = timezone.now()
     session.is_completed = True
     session.save()
+    snapshot_completed_session(session)
 
     return Response({
         'message': 'Quiz ended successfully',
@@ -0,0 +1,24 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from ..services.topic_suggest_service import topic_index
+from ..utils.constants import TOPIC_SUGGEST_DEFAULT_LIMIT, TOPIC_SUGGEST_MAX_LIMIT
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def suggest_topics(request):
+    query = (request.GET.get('q') or '').strip()
+    try:
+        limit = int(request.GET.get('limit', TOPIC_SUGGEST_DEFAULT_LIMIT))
+    except (TypeError, ValueError):
+        limit = TOPIC_SUGGEST_DEFAULT_LIMIT
+    limit = min(max(limit, 1), TOPIC_SUGGEST_MAX_LIMIT)
+
+    results = topic_index.suggest(query, limit) if query else []
+
+    return Response({
+        'query': query,
+        'results': results,
+    })
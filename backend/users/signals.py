@@ -3,6 +3,8 @@ from django.contrib.auth import get_user_model
 from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
 from django.dispatch import receiver
 
+from cache_manager import CacheVersionService
+from quiz_app.utils.constants import HISTORY_VERSION_SCOPE, LEADERBOARD_VERSION_SCOPE, USER_VERSION_SCOPE
 from .models import UserProfile
 
 logger = logging.getLogger(__name__)
@@ -80,3 +82,13 @@ def delete_old_avatar_on_change(sender, instance, **kwargs):
 def delete_avatar_on_profile_delete(sender, instance, **kwargs):
     if instance.avatar:
         instance.avatar.delete(save=False)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def bump_profile_response_versions(sender, instance, **kwargs):
+    CacheVersionService.bump_versions([
+        USER_VERSION_SCOPE.format(user_id=instance.user_id),
+        HISTORY_VERSION_SCOPE.format(user_id=instance.user_id),
+        LEADERBOARD_VERSION_SCOPE,
+    ])
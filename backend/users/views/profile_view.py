@@ -6,12 +6,15 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from django.contrib.auth import get_user_model
 from ..serializers.user_serializer import UserSerializer, UpdateProfileSerializer
 from ..serializers.profile_serializer import ChangePasswordSerializer, AvatarSerializer, UpdateProfileSettingsSerializer
+from quiz_app.utils.conditional import conditional_view
+from quiz_app.utils.constants import USER_VERSION_SCOPE
 
 User = get_user_model()
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_view([USER_VERSION_SCOPE])
 def get_current_user(request):
     serializer = UserSerializer(request.user, context={'request': request})
     return Response(serializer.data)
@@ -158,6 +158,7 @@ export default function QuestionsLibrary() {
                 <option value="created_at">Najstarsze</option>
                 <option value="-success_rate">Skuteczność ↓</option>
                 <option value="success_rate">Skuteczność ↑</option>
+                <option value="relevance">Trafność wyszukiwania</option>
               </select>
             </div>
 
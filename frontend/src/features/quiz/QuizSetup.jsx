@@ -2,6 +2,7 @@ import {useState, useEffect} from 'react';
 import {useNavigate, useLocation} from 'react-router-dom';
 import MainLayout from '../../layouts/MainLayout';
 import useCurrentUser from '../../hooks/useCurrentUser';
+import {suggestTopics} from '../../services/api';
 import {
     PREDEFINED_TOPICS, TOPIC_SUBTOPICS, KNOWLEDGE_LEVELS, DIFFICULTY_LEVELS, QUIZ_DEFAULTS
 } from '../../services/constants';
@@ -17,6 +18,7 @@ export default function QuizSetup() {
     const loading = false;
     const [error, setError] = useState('');
     const [showAdvanced, setShowAdvanced] = useState(false);
+    const [topicSuggestions, setTopicSuggestions] = useState([]);
 
     const [questionsCount, setQuestionsCount] = useState(replayParams?.questionsCount ?? QUIZ_DEFAULTS.QUESTIONS_COUNT);
     const [timePerQuestion, setTimePerQuestion] = useState(replayParams?.timePerQuestion ?? QUIZ_DEFAULTS.TIME_PER_QUESTION);
@@ -37,6 +39,27 @@ export default function QuizSetup() {
         }
     }, [replayParams?.knowledgeLevel, user]);
 
+    useEffect(() => {
+        const query = topic.trim();
+        if (query.length < 2) {
+            setTopicSuggestions([]);
+            return undefined;
+        }
+        let cancelled = false;
+        const timer = setTimeout(async () => {
+            try {
+                const data = await suggestTopics(query);
+                if (!cancelled) setTopicSuggestions(data.results || []);
+            } catch {
+                if (!cancelled) setTopicSuggestions([]);
+            }
+        }, 200);
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [topic]);
+
     const handleSubmit = async (e) => {
         e.preventDefault();
         if (!topic.trim()) {
@@ -101,7 +124,13 @@ export default function QuizSetup() {
                                             placeholder="Wprowadź własny temat lub wybierz poniżej"
                                             className="ui-input flex-1 text-base dark:placeholder:text-slate-400"
                                             disabled={loading}
+                                            list="topic-suggestions"
                                         />
+                                        <datalist id="topic-suggestions">
+                                            {topicSuggestions.map((item) => (
+                                                <option key={item.topic} value={item.topic}/>
+                                            ))}
+                                        </datalist>
                                         <button
                                             type="button"
                                             onClick={() => {
@@ -107,7 +107,9 @@ export const startQuiz = async (topic, difficulty, questionsCount, timePerQuesti
 };
 
 export const getQuestion = async (sessionId) => {
-    const response = await api.get(`/quiz/question/${sessionId}/`);
+    const response = await api.get(`/quiz/question/${sessionId}/`, {
+        params: { exclude: 'answers' }
+    });
     return response.data;
 };
 
@@ -140,6 +142,13 @@ export const getQuestionsLibrary = async (params = {}) => {
     return response.data;
 };
 
+export const suggestTopics = async (query, limit = 8) => {
+    const response = await api.get('/quiz/topics/suggest/', {
+        params: { q: query, limit }
+    });
+    return response.data;
+};
+
 
 
 export const getGlobalLeaderboard = async (period = 'all', limit = 50) => {